@@ -0,0 +1,237 @@
+import numpy as np
+
+
+class Dual:
+    """
+    Dual number for forward mode automatic differentiation: a value, and its
+    partial derivatives with respect to named inputs.
+
+    Arithmetic on dual numbers (and on dual numbers and floats) applies the
+    chain rule to the partials, so running the arithmetic of a cost model on
+    inputs made with variable() returns the costs along with their exact
+    partial derivatives, in a single pass. Values and partials may be floats
+    or NumPy arrays (one element per scenario).
+
+    Comparisons compare the values, so the if statements of the cost models
+    select a branch as they do for floats. The partials of the result are
+    those of the branch taken: at a breakpoint, they are the one-sided
+    derivatives from the side the breakpoint belongs to (e.g. from below for
+    a branch on size > 15, at 15 MW). Step functions (np.ceil, np.floor,
+    np.rint, np.trunc and round()) have partials of 0.
+
+    The NumPy ufuncs supported by dual numbers are listed in _ufuncs. Dual
+    numbers are not hashable, and are not converted to floats implicitly (use
+    value).
+
+    Example
+    -------
+    size = Dual.variable(100, 'size')
+    cost = 1736.7 * (size * 1000) ** 0.728
+    cost.value, cost.partial('size')
+    """
+
+    __hash__ = None
+
+    def __init__(self, value, partials=None):
+        """
+        Parameters
+        ----------
+        value : float or numpy.ndarray
+            Value of the number.
+
+        partials : dict, optional
+            Partial derivatives of the number, by name of input. Partials that
+            are left out are 0.
+        """
+        self.value = value
+        self.partials = partials if partials is not None else dict()
+
+    @classmethod
+    def variable(cls, value, name):
+        """
+        Returns the input name, of the given value (its partial derivative with
+        respect to itself is 1).
+        """
+        return cls(value, {name: 1.0})
+
+    @classmethod
+    def lift(cls, x):
+        """
+        Returns x if it is a dual number, and x as a constant otherwise.
+        """
+        return x if isinstance(x, Dual) else cls(x)
+
+    def partial(self, name):
+        """
+        Returns the partial derivative with respect to the input name.
+        """
+        return self.partials.get(name, 0.0)
+
+    def __repr__(self):
+        return 'Dual({!r}, {!r})'.format(self.value, self.partials)
+
+    # Chain rule:
+
+    def _unary(self, value, derivative):
+        """
+        Returns f(self), where value is f(self.value) and derivative is
+        f'(self.value).
+        """
+        return Dual(value, {name: derivative * partial
+                            for name, partial in self.partials.items()})
+
+    @staticmethod
+    def _binary(value, x, dx, y, dy):
+        """
+        Returns f(x, y), where value is f(x.value, y.value), and dx and dy are
+        the partial derivatives of f with respect to x and y (x and y are dual
+        numbers or constants).
+        """
+        partials = dict()
+        for operand, derivative in [(x, dx), (y, dy)]:
+            if not isinstance(operand, Dual):
+                continue
+            for name, partial in operand.partials.items():
+                term = derivative * partial
+                partials[name] = partials[name] + term if name in partials else term
+
+        return Dual(value, partials)
+
+    @staticmethod
+    def _value_of(x):
+        return x.value if isinstance(x, Dual) else x
+
+    @classmethod
+    def where(cls, condition, x, y):
+        """
+        Dual number counterpart of np.where(): selects the values and partials
+        of x where condition is true, and those of y elsewhere.
+        """
+        if isinstance(condition, (bool, np.bool_)):
+            return cls.lift(x if condition else y)
+
+        x, y = cls.lift(x), cls.lift(y)
+        partials = {name: np.where(condition, x.partial(name), y.partial(name))
+                    for name in set(x.partials).union(y.partials)}
+        return cls(np.where(condition, x.value, y.value), partials)
+
+    # Arithmetic:
+
+    def __neg__(self):
+        return self._unary(-self.value, -1.0)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return self._unary(abs(self.value), np.sign(self.value))
+
+    def __add__(self, other):
+        return self._binary(self.value + self._value_of(other), self, 1.0, other, 1.0)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return self._binary(self.value - self._value_of(other), self, 1.0, other, -1.0)
+
+    def __rsub__(self, other):
+        return self._binary(other - self.value, self, -1.0, other, 1.0)
+
+    def __mul__(self, other):
+        other_value = self._value_of(other)
+        return self._binary(self.value * other_value, self, other_value, other, self.value)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        other_value = self._value_of(other)
+        return self._binary(self.value / other_value, self, 1.0 / other_value,
+                            other, -self.value / (other_value * other_value))
+
+    def __rtruediv__(self, other):
+        return self._binary(other / self.value, self,
+                            -other / (self.value * self.value), other, 1.0 / self.value)
+
+    def __pow__(self, exponent):
+        return self._power(self, exponent)
+
+    def __rpow__(self, base):
+        return self._power(base, self)
+
+    @classmethod
+    def _power(cls, base, exponent):
+        base_value = cls._value_of(base)
+        exponent_value = cls._value_of(exponent)
+        # np.float_power() (unlike the ** of floats) returns inf for 0 raised to
+        # a negative power, as the cost models expect of the branches they do
+        # not take:
+        value = np.float_power(base_value, exponent_value)
+        dbase = exponent_value * np.float_power(base_value, exponent_value - 1)
+        dexponent = value * np.log(base_value) if isinstance(exponent, Dual) else 0.0
+        return cls._binary(value, base, dbase, exponent, dexponent)
+
+    def __round__(self, ndigits=None):
+        if ndigits is None:
+            return Dual(round(self.value))
+        return Dual(round(self.value, ndigits))
+
+    # Comparisons (of the values):
+
+    def __lt__(self, other):
+        return self.value < self._value_of(other)
+
+    def __le__(self, other):
+        return self.value <= self._value_of(other)
+
+    def __gt__(self, other):
+        return self.value > self._value_of(other)
+
+    def __ge__(self, other):
+        return self.value >= self._value_of(other)
+
+    def __eq__(self, other):
+        return self.value == self._value_of(other)
+
+    def __ne__(self, other):
+        return self.value != self._value_of(other)
+
+    # NumPy ufuncs supported by dual numbers, and those among them that are
+    # step functions or comparisons (of the values):
+    _ufuncs = ('add', 'subtract', 'multiply', 'divide', 'true_divide', 'power', 'negative',
+               'sqrt', 'maximum', 'minimum', 'ceil', 'floor', 'rint', 'trunc',
+               'greater', 'greater_equal', 'less', 'less_equal', 'equal', 'not_equal')
+    _step_ufuncs = ('ceil', 'floor', 'rint', 'trunc')
+    _comparison_ufuncs = ('greater', 'greater_equal', 'less', 'less_equal', 'equal',
+                          'not_equal')
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        name = ufunc.__name__
+        if method != '__call__' or kwargs or name not in self._ufuncs:
+            return NotImplemented
+
+        # The operands are lifted so that the operators of Dual are used (the
+        # operators of NumPy scalars and arrays would call this method again):
+        operands = [Dual.lift(x) for x in inputs]
+        if name in self._step_ufuncs:
+            return Dual(ufunc(operands[0].value))
+        if name in self._comparison_ufuncs:
+            return ufunc(operands[0].value, operands[1].value)
+        if name == 'add':
+            return operands[0] + operands[1]
+        if name == 'subtract':
+            return operands[0] - operands[1]
+        if name == 'multiply':
+            return operands[0] * operands[1]
+        if name in ('divide', 'true_divide'):
+            return operands[0] / operands[1]
+        if name == 'power':
+            return self._power(operands[0], operands[1])
+        if name == 'negative':
+            return -operands[0]
+        if name == 'sqrt':
+            return operands[0] ** 0.5
+
+        x, y = operands
+        if name == 'maximum':
+            return Dual.where(x.value >= y.value, x, y)
+        return Dual.where(x.value <= y.value, x, y)
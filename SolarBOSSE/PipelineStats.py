@@ -0,0 +1,129 @@
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+from .TraceHooks import trace_hooks
+
+
+class PipelineStats:
+    """
+    Wall time, CPU time and call counts of the stages of the hybrid BOS
+    pipeline.
+
+    Stages are named by dotted paths, e.g. 'solarbosse.sheet_load' or
+    'solarbosse.module.SitePreparationCost'. Each time a stage runs, its wall
+    time (time.perf_counter()) and the CPU time of the thread running it
+    (time.thread_time()) are added to its totals. Timing a stage costs about a
+    microsecond, so the stages of the pipeline are always timed, in the
+    process wide instance pipeline_stats.
+
+    Stages nest: the time of a stage includes the time of the stages it runs
+    (e.g. 'solarbosse.run' includes the cost modules).
+
+    Stats of several processes (e.g. the workers of run_sweep()) are
+    aggregated with merge().
+
+    Example
+    -------
+    pipeline_stats.reset()
+    run_hybrid_BOS(hybrids_input_dict)
+    print(pipeline_stats.as_dataframe())
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Stage name -> [calls, wall time (s), CPU time (s)]:
+        self._stages = dict()
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Context manager timing the code it wraps as a call of stage name. The
+        call is recorded even if the code raises an exception.
+
+        stage_start and stage_end events are emitted to trace_hooks.
+        """
+        trace_hooks.emit('stage_start', stage=name)
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter() - wall_start
+            self.record(name, wall_time, time.thread_time() - cpu_start)
+            trace_hooks.emit('stage_end', stage=name, wall_time_s=wall_time)
+
+    def timed(self, name):
+        """
+        Decorator timing every call of a function as a call of stage name.
+        """
+        def decorator(function):
+            @functools.wraps(function)
+            def timed_function(*args, **kwargs):
+                with self.stage(name):
+                    return function(*args, **kwargs)
+
+            return timed_function
+
+        return decorator
+
+    def record(self, name, wall_time, cpu_time, calls=1):
+        """
+        Adds calls of stage name, taking wall_time and cpu_time seconds in
+        total.
+        """
+        with self._lock:
+            totals = self._stages.get(name)
+            if totals is None:
+                self._stages[name] = [calls, wall_time, cpu_time]
+            else:
+                totals[0] += calls
+                totals[1] += wall_time
+                totals[2] += cpu_time
+
+    def merge(self, stats):
+        """
+        Adds the totals of stats (a PipelineStats, or a dictionary returned by
+        as_dict(), e.g. by a worker process) to these stats.
+        """
+        if isinstance(stats, PipelineStats):
+            stats = stats.as_dict()
+
+        for name, totals in stats.items():
+            self.record(name, totals['wall_time_s'], totals['cpu_time_s'],
+                        totals['calls'])
+
+    def as_dict(self):
+        """
+        Returns the totals of each stage (in the order the stages first ran), as
+        a picklable dictionary of {'calls', 'wall_time_s', 'cpu_time_s'}.
+        """
+        with self._lock:
+            return {name: {'calls': calls, 'wall_time_s': wall_time,
+                           'cpu_time_s': cpu_time}
+                    for name, (calls, wall_time, cpu_time) in self._stages.items()}
+
+    def as_dataframe(self):
+        """
+        Returns the totals of each stage as a DataFrame indexed by stage name,
+        with the mean wall time per call.
+        """
+        stages = pd.DataFrame.from_dict(self.as_dict(), orient='index',
+                                        columns=['calls', 'wall_time_s', 'cpu_time_s'])
+        stages.index.name = 'stage'
+        stages['wall_time_per_call_s'] = stages['wall_time_s'] / stages['calls']
+        return stages
+
+    def reset(self):
+        """
+        Forgets the totals of all stages.
+        """
+        with self._lock:
+            self._stages.clear()
+
+
+# Stats of the stages run in this process:
+pipeline_stats = PipelineStats()
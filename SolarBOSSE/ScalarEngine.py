@@ -0,0 +1,775 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from SolarBOSSE.Dual import Dual
+from SolarBOSSE.excelio.ConstructionEstimatorIndex import ConstructionEstimatorIndex
+
+
+def _ceil(x):
+    return np.ceil(x)
+
+
+def _floor(x):
+    return np.floor(x)
+
+
+def _round(x):
+    # Rounds halves to even, like round():
+    return np.rint(x)
+
+
+def _where(condition, x, y):
+    # Branching on scalars avoids making 0-d arrays, which are slow to compute
+    # with:
+    if isinstance(condition, (bool, np.bool_)):
+        return x if condition else y
+    if isinstance(x, Dual) or isinstance(y, Dual):
+        return Dual.where(condition, x, y)
+    return np.where(condition, x, y)
+
+
+def _maximum(x, y):
+    return np.maximum(x, y)
+
+
+def _value(x):
+    """
+    Returns x as a float if it is a scalar (or a 0-d array), and unchanged
+    otherwise (e.g. arrays and dual numbers).
+    """
+    if isinstance(x, Dual):
+        return x
+    return float(x) if np.ndim(x) == 0 else x
+
+
+def _schedule(quantity, daily_output, time_months):
+    """
+    Returns the number of days taken by a single crew, the number of crews and
+    the construction days (capped at time_months) of an operation, as computed
+    by the cost modules.
+    """
+    days = quantity / daily_output
+    crews = _ceil((days / 30) / time_months)
+    time_construct_days = _where(days > time_months * 30, time_months * 30, days)
+    return days, crews, time_construct_days
+
+
+def _per_diem(workers, crews, time_construct_days, per_diem_rate):
+    return workers * crews * \
+        (time_construct_days + _ceil(time_construct_days / 7)) * per_diem_rate
+
+
+class ScalarEngine:
+    """
+    Pandas free engine computing the total costs of SolarBOSSE.
+
+    The cost modules select and merge rows of the project data sheets every
+    time they run, which takes most of the time of a run. This engine does
+    that once, when it is created: the rates, daily outputs, numbers of workers
+    and prices of the rows each module uses are extracted from a master input
+    dictionary into small tables of floats. totals() then redoes the
+    arithmetic of SitePreparationCost, RackingSystemInstallation,
+    CollectionCost, FoundationCost, InverterTransformerErection,
+    SubstationCost, GridConnectionCost and ManagementCost on those tables,
+    with floats and NumPy only, several hundred times faster than Manager.
+
+    totals() matches Manager to rounding error, including the quirks of the
+    modules (e.g. labor rows whose per diem is aligned with a row of another
+    dataframe). The inputs of totals() may be NumPy arrays, in which case the
+    totals of all the scenarios (broadcast together) are computed at once. They
+    may also be dual numbers (see SolarBOSSE.Dual), in which case the totals
+    are dual numbers holding their partial derivatives with respect to the
+    inputs.
+
+    Unlike the cost modules, which record errors in input_dict['error'], the
+    engine raises them (when it is created, for errors in the project data).
+
+    Example
+    -------
+    engine = ScalarEngine.compile('project_list_50MW')
+    engine.totals(system_size_MW_DC=100)['total_bos_cost']
+    engine.totals(system_size_MW_DC=np.linspace(5, 500, 100))['total_bos_cost']
+    """
+
+    # Inputs of totals(), which default to their values in the master input
+    # dictionary:
+    scalar_inputs = ('system_size_MW_DC', 'dc_ac_ratio', 'site_prep_area_acres_mw_ac',
+                     'switchyard_y_n', 'construction_time_months', 'hour_day',
+                     'construction_estimator_per_diem', 'overtime_multiplier',
+                     'fuel_cost', 'road_width_ft', 'road_thickness_in', 'crane_width',
+                     'module_rating_W', 'module_width_m', 'module_V_oc', 'module_I_SC_DC',
+                     'inverter_rating_kW', 'inverter_max_mppt_V_DC', 'foundation_hole_ft',
+                     'concrete_pad_length_inches', 'concrete_pad_width_inches',
+                     'concrete_pad_depth_inches', 'concrete_pad_excavation_depth_inches',
+                     'interconnect_voltage_kV', 'dist_interconnect_mi')
+
+    # Inputs of totals() that are derived from the other inputs when they are
+    # in neither the inputs nor the master input dictionary (see
+    # SolarBOSSEPipeline.run() and SubstationCost):
+    optional_inputs = ('grid_system_size_MW_DC', 'grid_size_MW_AC', 'substation_rating_MW')
+
+    # Inputs of totals() scaling the rates and prices of the project data of the
+    # master input dictionary (1 by default): the labor rates (of the Labor rows
+    # of construction_estimator, and of crew_price, as the labor cost multiplier
+    # does), the rates of crew_price alone, and the prices of material_price:
+    scale_inputs = ('labor_rate_scale', 'crew_rate_scale', 'material_price_scale')
+
+    # Quantities of materials of the site preparation operations, by unit:
+    road_quantity_units = ('cubic yard', 'embankment cubic yards crane',
+                           'embankment cubic yards road', 'loose cubic yard',
+                           'Each (100000 square feet)')
+
+    # Materials of the concrete pads:
+    pad_materials = ('Steel - rebar', 'Concrete 5000 psi', 'Excavated dirt', 'Backfill')
+
+    _km_to_LF = 3.28084 * 1000
+
+    def __init__(self, master_input_dict):
+        """
+        Parameters
+        ----------
+        master_input_dict : dict
+            Master input dictionary of SolarBOSSE (e.g. the master input
+            template of a SolarBOSSEPipeline), holding the project data sheets
+            and the default values of the inputs of totals().
+        """
+        self.defaults = {key: master_input_dict[key] for key in self.scalar_inputs}
+        for key in self.optional_inputs:
+            self.defaults[key] = master_input_dict.get(key)
+        for key in self.scale_inputs:
+            self.defaults[key] = 1
+
+        index = master_input_dict.get('construction_estimator_index')
+        construction_estimator = master_input_dict['construction_estimator']
+        if index is None or index.construction_estimator is not construction_estimator:
+            index = ConstructionEstimatorIndex(construction_estimator)
+
+        self._site_preparation = self._extract_site_preparation(master_input_dict, index)
+        self._racking = self._extract_racking(master_input_dict, index)
+        self._collection = self._extract_collection(master_input_dict, index)
+        self._foundation = self._extract_foundation(master_input_dict, index)
+        self._erection = self._extract_erection(master_input_dict)
+
+    @classmethod
+    def compile(cls, project_list, project_data=None):
+        """
+        Returns the engine of a project list (see SolarBOSSEPipeline.compile()).
+        """
+        from SolarBOSSE.SolarBOSSEPipeline import SolarBOSSEPipeline
+
+        return cls(SolarBOSSEPipeline.compile(project_list, project_data).master_input_template)
+
+    def totals(self, **inputs):
+        """
+        Returns the total costs of a scenario.
+
+        Parameters
+        ----------
+        inputs
+            Inputs of the scenario (see scalar_inputs, optional_inputs and
+            scale_inputs) that differ from the master input dictionary, as floats,
+            NumPy arrays or dual numbers.
+
+        Returns
+        -------
+        dict
+            The total cost of each module and the total BOS costs, under the
+            keys Manager writes them to (e.g. total_road_cost and
+            total_bos_cost), along with the parts of the management cost. Costs
+            are floats, or arrays if any input is an array. Costs that depend on
+            inputs that are dual numbers are dual numbers.
+        """
+        unknown_inputs = set(inputs).difference(self.scalar_inputs, self.optional_inputs,
+                                                self.scale_inputs)
+        if unknown_inputs:
+            raise TypeError('Unknown inputs: ' + ', '.join(sorted(unknown_inputs)))
+
+        x = dict(self.defaults)
+        x.update(inputs)
+        if x['grid_system_size_MW_DC'] is None:
+            x['grid_system_size_MW_DC'] = x['system_size_MW_DC']
+        if x['grid_size_MW_AC'] is None:
+            x['grid_size_MW_AC'] = x['system_size_MW_DC'] / x['dc_ac_ratio']
+
+        # Costs at the boundaries of branches not taken (e.g. the cost of a
+        # region of 0 MW) may be infinite or NaN:
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            totals = dict()
+            totals['total_road_cost'] = self._site_preparation_cost(x)
+            totals['total_racking_cost_USD'] = self._racking_cost(x)
+            totals['total_collection_cost'] = self._collection_cost(x)
+            totals['total_foundation_cost'] = self._foundation_cost(x)
+            totals['total_erection_cost'] = self._erection_cost(x)
+            totals['total_substation_cost'] = self._substation_cost(x)
+            totals['total_transdist_cost'] = self._grid_connection_cost(x)
+
+            total_bos_cost_before_mgmt = totals['total_road_cost']
+            for key in ['total_racking_cost_USD', 'total_collection_cost',
+                        'total_foundation_cost', 'total_erection_cost',
+                        'total_substation_cost', 'total_transdist_cost']:
+                total_bos_cost_before_mgmt = total_bos_cost_before_mgmt + totals[key]
+            totals['total_bos_cost_before_mgmt'] = total_bos_cost_before_mgmt
+
+            totals.update(self._management_cost(x, total_bos_cost_before_mgmt))
+            totals['total_bos_cost'] = \
+                total_bos_cost_before_mgmt + totals['total_management_cost']
+
+        return {key: _value(cost) for key, cost in totals.items()}
+
+    # Arithmetic of the cost modules:
+
+    @staticmethod
+    def _mobilization_multipliers(x):
+        """
+        Returns the mobilization multipliers of equipment and materials, and of
+        labor.
+        """
+        system_size_MW_DC = x['system_size_MW_DC']
+        return 0.16161 * (system_size_MW_DC ** (-0.135)), \
+            1.245 * (system_size_MW_DC ** (-0.367))
+
+    @staticmethod
+    def _labor_and_equipment(tables, quantities, per_diems, x):
+        """
+        Returns the labor (without management crew) and equipment rental costs
+        of the operations of a module.
+        """
+        labor = 0
+        for slot, rate, operation in tables['labor']:
+            per_diem = per_diems[operation] if operation is not None else 0
+            labor = labor + (quantities[slot] * (rate * x['labor_rate_scale']) *
+                             x['overtime_multiplier'] + per_diem)
+
+        equipment = 0
+        for slot, rate in tables['equipment']:
+            equipment = equipment + quantities[slot] * rate
+
+        return labor, equipment
+
+    def _site_preparation_cost(self, x):
+        tables = self._site_preparation
+        system_size_MW_DC = x['system_size_MW_DC']
+
+        site_prep_area_m2 = \
+            (x['site_prep_area_acres_mw_ac'] * x['dc_ac_ratio'] * system_size_MW_DC) * 4046.86
+        road_length_m = 1.5 * ((site_prep_area_m2 / 1.5) ** 0.5)
+        road_width_m = x['road_width_ft'] * 0.3
+        road_thickness_m = x['road_thickness_in'] * 0.025
+        road_volume_m3 = road_length_m * road_width_m * road_thickness_m + 125
+        material_volume_cubic_yards = road_volume_m3 * 1.30795 * 1.39
+
+        quantities = [site_prep_area_m2 * 0.1 * 1.30795,
+                      (x['crane_width'] + 1.5) * road_length_m * 0.1 * 1.30795,
+                      road_volume_m3 * 1.30795 * _ceil(road_thickness_m / 0.2),
+                      material_volume_cubic_yards,
+                      (site_prep_area_m2 * 10.76391) / 100000]
+
+        road_construction_time = x['construction_time_months'] * 0.20
+        per_diems = []
+        num_days = None
+        for slot, daily_output, workers in tables['operations']:
+            _, crews, time_construct_days = \
+                _schedule(quantities[slot], daily_output, road_construction_time)
+            per_diems.append(_per_diem(workers, crews, time_construct_days,
+                                       x['construction_estimator_per_diem']))
+            num_days = time_construct_days if num_days is None \
+                else _maximum(num_days, time_construct_days)
+
+        crew_rate_scale = x['labor_rate_scale'] * x['crew_rate_scale']
+        management_crew_cost = 0
+        for per_diem_rate, workers, hourly_rate in tables['management_crew']:
+            management_crew_cost = management_crew_cost + \
+                ((per_diem_rate * crew_rate_scale) * workers * num_days +
+                 (hourly_rate * crew_rate_scale) * x['hour_day'] * num_days)
+
+        labor, equipment = self._labor_and_equipment(tables, quantities, per_diems, x)
+        labor = labor + management_crew_cost
+        materials = material_volume_cubic_yards * \
+            (tables['material_price'] * x['material_price_scale'])
+
+        equip_material_multiplier, labor_multiplier = self._mobilization_multipliers(x)
+        mobilization = materials * equip_material_multiplier + \
+            equipment * equip_material_multiplier + labor * labor_multiplier
+
+        return materials + equipment + labor + mobilization
+
+    def _racking_cost(self, x):
+        tables = self._racking
+        system_size_MW_DC = x['system_size_MW_DC']
+
+        rating_per_table_watts = 2 * 8 * x['module_rating_W']
+        discount_multiplier = _where(system_size_MW_DC <= 150,
+                                     1 - ((0.0018 * system_size_MW_DC) - 0.0018),
+                                     1 - ((0.0009 * system_size_MW_DC) + 0.1105))
+        materials = (tables['cost_per_table_usd'] / rating_per_table_watts) * \
+            discount_multiplier * system_size_MW_DC * 1e6
+
+        total_foundation_holes = system_size_MW_DC * 1e6 / rating_per_table_watts * 3
+        quantities = [total_foundation_holes * x['foundation_hole_ft']]
+
+        installation_time = x['construction_time_months'] * 0.6
+        per_diems = []
+        crews_by_operation = []
+        for slot, daily_output, workers in tables['operations']:
+            _, crews, time_construct_days = \
+                _schedule(quantities[slot], daily_output, installation_time)
+            per_diems.append(_per_diem(workers, crews, time_construct_days,
+                                       x['construction_estimator_per_diem']))
+            crews_by_operation.append(crews)
+
+        labor, equipment = self._labor_and_equipment(tables, quantities, per_diems, x)
+
+        equip_material_multiplier, labor_multiplier = self._mobilization_multipliers(x)
+        labor_mobilization = crews_by_operation[tables['mobilization_operation']] * \
+            20000 * labor_multiplier
+        mobilization = materials * equip_material_multiplier + \
+            equipment * equip_material_multiplier + labor_mobilization
+
+        return materials + equipment + labor + mobilization
+
+    def _collection_cost(self, x):
+        system_size_MW_DC = x['system_size_MW_DC']
+        site_prep_area_acres_mw_ac = x['site_prep_area_acres_mw_ac']
+
+        # Projects larger than 150 MW are split in regions of 150 MW, and a
+        # region with the remainder. All the regions have 150 quadrants, and
+        # their area is (mistakenly) based on site_prep_area_acres_mw_ac.
+        large = system_size_MW_DC > 150
+        regions = system_size_MW_DC / 150
+        full_regions = _floor(regions)
+        partial_region_MW = (regions - full_regions) * 150
+        num_quadrants = _where(large, 150, _round(system_size_MW_DC))
+
+        full_region_cost = self._collection_region_cost(
+            x, site_prep_area_acres_mw_ac * 150, num_quadrants)
+
+        has_partial_region = _where(large, partial_region_MW > 0, True)
+        partial_region_acres = _where(
+            large, site_prep_area_acres_mw_ac * partial_region_MW,
+            site_prep_area_acres_mw_ac * x['dc_ac_ratio'] * system_size_MW_DC)
+        partial_region_cost = self._collection_region_cost(
+            x, _where(has_partial_region, partial_region_acres,
+                      site_prep_area_acres_mw_ac * 150), num_quadrants)
+
+        return _where(large, full_regions, 0) * full_region_cost + \
+            _where(has_partial_region, partial_region_cost, 0)
+
+    def _collection_region_cost(self, x, site_prep_area_acres, num_quadrants):
+        """
+        Returns the collection cost of a region (see
+        CollectionCost.run_module_for_150_MW()).
+        """
+        tables = self._collection
+        system_size_MW_DC = x['system_size_MW_DC']
+        m_to_lf = 3.28084
+
+        land_width_m = (site_prep_area_acres * 4046.86 / 1.5) ** 0.5
+        project_length_m = 1.5 * land_width_m
+        quadrant_area_m2 = x['site_prep_area_acres_mw_ac'] * x['dc_ac_ratio'] * \
+            (x['inverter_rating_kW'] / 1000) * 4046.86
+        quadrant_length_m = quadrant_area_m2 / land_width_m
+
+        panel_width_m = x['module_width_m'] + 0.0254
+        number_panels_along_x = _floor((land_width_m / 2) / panel_width_m)
+        single_row_rating_W = 2 * number_panels_along_x * x['module_rating_W']
+        inverter_rating_W = x['inverter_rating_kW'] * 1000 * x['dc_ac_ratio']
+        rows = _floor((inverter_rating_W / 2) / single_row_rating_W)
+
+        modules_per_string = _floor(x['inverter_max_mppt_V_DC'] / x['module_V_oc'])
+        strings_per_row = 2 * _floor(number_panels_along_x / modules_per_string)
+
+        # See distance_to_combiner_box() in CollectionCost:
+        strings_per_sub_row = np.trunc(strings_per_row / 2)
+        distance_to_combiner_box_m = _where(
+            strings_per_sub_row >= 1,
+            strings_per_sub_row ** 2 * (panel_width_m * modules_per_string) +
+            (strings_per_sub_row - 1) * panel_width_m,
+            0.0)
+        source_circuit_wire_length_total_lf = \
+            distance_to_combiner_box_m * rows * 2 * m_to_lf * num_quadrants
+
+        # Output circuits of the rows of a sub quadrant, from the row farthest
+        # from the inverter (sum of 2 * (rows - 1 - row) * row_spacing_m):
+        row_spacing_m = quadrant_length_m / rows
+        output_circuit_length_m = row_spacing_m * rows * (rows - 1)
+        output_circuit_wire_length_total_lf = \
+            output_circuit_length_m * 2 * m_to_lf * num_quadrants
+
+        trench_length_LF = (project_length_m / 1000) * 2 * self._km_to_LF
+
+        # PV wire costs, with volume discounts:
+        discount_multiplier = _where(
+            system_size_MW_DC > 500, 0.50, _where(
+                system_size_MW_DC > 300, 0.70, _where(
+                    system_size_MW_DC > 150, 0.75, _where(
+                        system_size_MW_DC > 50, 0.80, _where(
+                            system_size_MW_DC > 20, 0.90, 1)))))
+        strings_parallel = _where(strings_per_row > 24, 24, strings_per_row)
+        output_circuit_ampacity = 1.25 * x['module_I_SC_DC'] * strings_parallel
+        output_circuit_usd_lf = _where(output_circuit_ampacity >= 175,
+                                       tables['output_circuit_usd_lf_175A'],
+                                       tables['output_circuit_usd_lf_150A'])
+        materials = source_circuit_wire_length_total_lf * \
+            (tables['source_circuit_usd_lf'] * discount_multiplier) + \
+            output_circuit_wire_length_total_lf * (output_circuit_usd_lf * discount_multiplier)
+
+        # Trenching and wiring:
+        collection_construction_time = x['construction_time_months'] * 0.45
+        per_diem_total = 0
+        for days_taken, workers_by_operation in [
+                (trench_length_LF / tables['trenching_labor_daily_output'],
+                 tables['trenching_workers']),
+                (source_circuit_wire_length_total_lf / tables['source_circuit_daily_output'],
+                 tables['source_circuit_workers']),
+                (output_circuit_wire_length_total_lf / tables['output_circuit_daily_output'],
+                 tables['output_circuit_workers'])]:
+            crews = _ceil((days_taken / 30) / collection_construction_time)
+            time_construct_days = _where(days_taken > collection_construction_time * 30,
+                                         collection_construction_time * 30, days_taken)
+            for workers in workers_by_operation:
+                per_diem_total = per_diem_total + \
+                    _per_diem(workers, crews, time_construct_days,
+                              x['construction_estimator_per_diem'])
+
+        equipment = (trench_length_LF / tables['trenching_equipment_daily_output']) * \
+            (tables['trenching_equipment_usd_per_hr'] * x['hour_day'])
+
+        overtime_multiplier = x['overtime_multiplier']
+        labor_rate_scale = x['labor_rate_scale']
+        labor = \
+            (trench_length_LF / tables['trenching_labor_daily_output']) * \
+            ((tables['trenching_labor_usd_per_hr'] * labor_rate_scale) * x['hour_day'] *
+             overtime_multiplier) + \
+            (tables['source_circuit_daily_output'] *
+             (tables['source_wiring_usd_lf'] * labor_rate_scale) * overtime_multiplier) * \
+            (source_circuit_wire_length_total_lf / tables['source_circuit_daily_output']) + \
+            (tables['output_circuit_daily_output'] *
+             (tables['output_wiring_usd_lf'] * labor_rate_scale) * overtime_multiplier) * \
+            (output_circuit_wire_length_total_lf / tables['output_circuit_daily_output']) + \
+            per_diem_total
+
+        equip_material_multiplier, labor_multiplier = self._mobilization_multipliers(x)
+        mobilization = materials * equip_material_multiplier + \
+            equipment * equip_material_multiplier + labor * labor_multiplier
+
+        return equipment + labor + materials + mobilization
+
+    def _foundation_cost(self, x):
+        tables = self._foundation
+
+        pad_volume_m3 = x['concrete_pad_length_inches'] * x['concrete_pad_width_inches'] * \
+            x['concrete_pad_depth_inches'] * (0.0254 ** 3)
+        excavated_volume_m3 = \
+            (x['concrete_pad_excavation_depth_inches'] * 0.0254) * \
+            ((x['concrete_pad_length_inches'] + 10) * 0.0254) * \
+            ((x['concrete_pad_width_inches'] + 10) * 0.0254)
+        number_concrete_pads = x['system_size_MW_DC'] / (x['inverter_rating_kW'] / 1000)
+        quantities = [pad_volume_m3 * 0.1 * (9490 / 1000) * number_concrete_pads,
+                      pad_volume_m3 * 0.9 * 1.30795 * number_concrete_pads,
+                      excavated_volume_m3 * 1.30795 * number_concrete_pads,
+                      excavated_volume_m3 * 1.30795 * number_concrete_pads]
+
+        foundation_construction_time = x['construction_time_months'] * 0.2
+        per_diems = []
+        for slot, daily_output, workers in tables['operations']:
+            _, crews, time_construct_days = \
+                _schedule(quantities[slot], daily_output, foundation_construction_time)
+            per_diems.append(_per_diem(workers, crews, time_construct_days,
+                                       x['construction_estimator_per_diem']))
+
+        overtime_multiplier = x['overtime_multiplier']
+        costs = dict()
+        for type_of_cost, rate_scale in [('equipment', 1), ('labor', x['labor_rate_scale'])]:
+            cost = 0
+            for slot, rate, operation in tables[type_of_cost]:
+                per_diem = per_diems[operation] if operation is not None else 0
+                cost = cost + \
+                    (quantities[slot] * (rate * rate_scale) * overtime_multiplier + per_diem)
+            costs[type_of_cost] = cost
+
+        materials = 0
+        for slot, price in tables['materials']:
+            materials = materials + quantities[slot] * (price * x['material_price_scale'])
+
+        equip_material_multiplier, labor_multiplier = self._mobilization_multipliers(x)
+        mobilization = materials * equip_material_multiplier + \
+            costs['equipment'] * equip_material_multiplier + costs['labor'] * labor_multiplier
+
+        return costs['equipment'] + costs['labor'] + materials + mobilization
+
+    def _erection_cost(self, x):
+        tables = self._erection
+
+        number_concrete_pads = x['system_size_MW_DC'] / (x['inverter_rating_kW'] / 1000)
+        total_crane_time = number_concrete_pads * 2
+        days_of_operation = _ceil(total_crane_time / x['hour_day'])
+
+        crew_rate_scale = x['labor_rate_scale'] * x['crew_rate_scale']
+        labor = 0
+        for per_diem_rate, workers, hourly_rate in tables['crane_crew']:
+            labor = labor + ((hourly_rate * crew_rate_scale) * x['hour_day'] * days_of_operation +
+                             (per_diem_rate * crew_rate_scale) * workers * days_of_operation)
+
+        crane_rental = tables['crane_usd_per_hour'] * total_crane_time
+        crane_fuel = tables['crane_fuel_gal_per_day'] * x['fuel_cost']
+
+        return labor + crane_rental + crane_fuel + tables['crane_mobilization_usd']
+
+    @staticmethod
+    def _substation_cost(x):
+        if x['substation_rating_MW'] is not None:
+            system_size_MW_AC = x['substation_rating_MW'] / x['dc_ac_ratio']
+        else:
+            system_size_MW_AC = x['system_size_MW_DC'] / x['dc_ac_ratio']
+
+        substation_cost = _where(
+            system_size_MW_AC > 15,
+            11652 * (x['interconnect_voltage_kV'] + system_size_MW_AC) +
+            11795 * (system_size_MW_AC ** 0.3549) + 1526800,
+            _where(system_size_MW_AC > 10, 1000000, 500000))
+
+        return substation_cost
+
+    @staticmethod
+    def _grid_connection_cost(x):
+        interconnect_voltage_kV = x['interconnect_voltage_kV']
+        dist_interconnect_mi = x['dist_interconnect_mi']
+
+        if x['switchyard_y_n'] == 'y':
+            interconnect_adder_USD = 18115 * interconnect_voltage_kV + 165944
+        else:
+            interconnect_adder_USD = 0
+
+        utility_scale_cost = _where(
+            dist_interconnect_mi == 0, 0,
+            ((1176 * interconnect_voltage_kV + 218257) *
+             np.power(dist_interconnect_mi, -0.1063) * dist_interconnect_mi) +
+            interconnect_adder_USD)
+
+        grid_size_kW_AC = x['grid_size_MW_AC'] * 1000
+        distributed_cost = grid_size_kW_AC * (1736.7 * (grid_size_kW_AC ** (-0.272)))
+
+        return _where(x['grid_system_size_MW_DC'] > 15, utility_scale_cost,
+                      distributed_cost)
+
+    @staticmethod
+    def _management_cost(x, total_bos_cost_before_mgmt):
+        system_size_MW_DC = x['system_size_MW_DC']
+        project_capex_usd = total_bos_cost_before_mgmt + (0.51 * system_size_MW_DC * 1e6)
+
+        costs = dict()
+        costs['epc_developer_profit'] = \
+            _where(system_size_MW_DC <= 10, 0.06, 0.05) * system_size_MW_DC * 1e6
+        costs['contingency_cost'] = 0.03 * system_size_MW_DC * 1e6
+        costs['bonding_usd'] = costs['contingency_cost']
+        costs['development_overhead_cost'] = \
+            0.3177 * (system_size_MW_DC ** (-0.547)) * project_capex_usd
+        costs['total_sales_tax'] = \
+            0.0328 * (system_size_MW_DC ** 0.0786) * project_capex_usd
+        costs['total_management_cost'] = \
+            costs['epc_developer_profit'] + costs['contingency_cost'] + \
+            costs['development_overhead_cost'] + costs['total_sales_tax']
+
+        return costs
+
+    # Extraction of the project data. The rows of the sheets are selected and
+    # merged as the cost modules do, with the quantities of materials replaced
+    # by their slot in the list of quantities computed by totals(), so that the
+    # rows (and their index labels) are the same as in the cost modules.
+
+    @staticmethod
+    def _operation_rows(operation_data):
+        """
+        Returns the (slot, daily output, number of workers) of each row of
+        operation_data, and the index label of each row. Rows without a
+        quantity (operations without a material) have a NaN daily output and
+        number of workers, and so a NaN per diem.
+        """
+        rows = [(int(slot), float(daily_output), float(workers)) if not pd.isna(slot)
+                else (0, np.nan, np.nan)
+                for slot, daily_output, workers in zip(
+                    operation_data['Quantity of material'], operation_data['Daily output'],
+                    operation_data['Number of workers'])]
+        return rows, list(operation_data.index)
+
+    @staticmethod
+    def _cost_rows(cost_data, operations, labels, drop_nan_per_diem):
+        """
+        Returns the (slot, rate, operation) of the rows of cost_data, where
+        operation is the position of the operation whose per diem is added to
+        the cost of the row: the operation with the same index label, as when
+        the cost modules add the per diem series to the costs of the rows.
+
+        Rows that have no such operation have a NaN cost, and are skipped (as by
+        sum()). So are rows of operations with a NaN per diem if
+        drop_nan_per_diem (otherwise their per diem is 0) and rows with a NaN
+        rate.
+        """
+        rows = []
+        for label, slot, rate in zip(cost_data.index, cost_data['Quantity of material'],
+                                     cost_data['Rate USD per unit']):
+            if label not in labels or pd.isna(rate):
+                continue
+            operation = labels.index(label)
+            _, daily_output, workers = operations[operation]
+            if math.isnan(daily_output) or math.isnan(workers):
+                if drop_nan_per_diem:
+                    continue
+                operation = None
+            rows.append((int(slot), float(rate), operation))
+
+        return rows
+
+    @staticmethod
+    def _crew_rows(input_dict, crew_type_id):
+        """
+        Returns the (per diem, number of workers, hourly rate) of the workers of
+        the crews of crew_type_id. Workers with a NaN cost are skipped.
+        """
+        crew = input_dict['crew'][input_dict['crew']['Crew type ID'].str.contains(crew_type_id)]
+        crew = pd.merge(input_dict['crew_cost'], crew, on=['Labor type ID'])
+        rows = zip(crew['Per diem USD per day'], crew['Number of workers'],
+                   crew['Hourly rate USD per hour'])
+        return [(float(per_diem), float(workers), float(hourly_rate))
+                for per_diem, workers, hourly_rate in rows
+                if not pd.isna(per_diem) and not pd.isna(workers)
+                and not pd.isna(hourly_rate)]
+
+    def _extract_unit_operations(self, index, module, slots, equipment_module=None):
+        """
+        Extracts the operations of a module whose quantities of materials are
+        merged on their units (see SitePreparationCost and
+        RackingSystemInstallation.estimate_construction_time()).
+        """
+        operation_data = index.operations(module)
+        list_units = operation_data['Units'].unique()
+        material_needs = pd.DataFrame(
+            {'Units': list_units,
+             'Quantity of material': [float(slots[unit]) for unit in list_units]},
+            columns=['Units', 'Quantity of material'])
+
+        operation_data = pd.merge(
+            operation_data, material_needs, on=['Units']).dropna(thresh=3)
+        operation_data = operation_data.where(
+            (operation_data['Daily output']).isnull() == False).dropna(thresh=4)
+        operations, labels = self._operation_rows(operation_data)
+
+        labor_equip_data = pd.merge(operation_data[['Operation ID',
+                                                    'Units',
+                                                    'Quantity of material']],
+                                    index.construction_estimator,
+                                    on=['Units', 'Operation ID'])
+        labor_data = labor_equip_data[labor_equip_data['Type of cost'] == 'Labor']
+        equipment_data = labor_equip_data[labor_equip_data['Type of cost'] == 'Equipment rental']
+        if equipment_module is not None:
+            equipment_data = equipment_data[equipment_data['Module'] == equipment_module]
+
+        return {'operations': operations,
+                'labels': labels,
+                'labor': self._cost_rows(labor_data, operations, labels,
+                                         drop_nan_per_diem=True),
+                'equipment': [(int(slot), float(rate)) for slot, rate in zip(
+                    equipment_data['Quantity of material'],
+                    equipment_data['Rate USD per unit']) if not pd.isna(rate)]}
+
+    def _extract_site_preparation(self, input_dict, index):
+        module = 'Inter-array roads (Solar)'
+        slots = {unit: slot for slot, unit in enumerate(self.road_quantity_units)}
+        tables = self._extract_unit_operations(index, module, slots, equipment_module=module)
+
+        material_name = index.rows(module)['Material type ID'].dropna().unique()
+        material_data = pd.merge(pd.DataFrame({'Material type ID': [material_name[0]]}),
+                                 input_dict['material_price'], on=['Material type ID'])
+        tables['material_price'] = \
+            float(pd.to_numeric(material_data['Material price USD per unit'].iloc[0]))
+
+        tables['management_crew'] = self._crew_rows(input_dict, 'M0')
+        return tables
+
+    def _extract_racking(self, input_dict, index):
+        tables = self._extract_unit_operations(index, 'Racking System Installation',
+                                               {'$/LF': 0})
+
+        solar_BOM = input_dict['solar_BOM']
+        partial_table_cost = (solar_BOM.usd_unit * solar_BOM.units_per_table).dropna().sum()
+        tables['cost_per_table_usd'] = float(partial_table_cost + 0.1 * partial_table_cost)
+
+        # The labor mobilization cost is based on the crews of the operation
+        # labelled 1:
+        tables['mobilization_operation'] = tables['labels'].index(1)
+        return tables
+
+    def _extract_collection(self, input_dict, index):
+        tables = dict()
+
+        trenching_labor = index.rows('Collection', type_of_cost='Labor')
+        tables['trenching_labor_usd_per_hr'] = float(trenching_labor['Rate USD per unit'].sum())
+        tables['trenching_labor_daily_output'] = float(trenching_labor['Daily output'].values[0])
+
+        trenching_equipment = index.rows('Collection', type_of_cost='Equipment')
+        tables['trenching_equipment_usd_per_hr'] = \
+            float(trenching_equipment['Rate USD per unit'].sum())
+        tables['trenching_equipment_daily_output'] = \
+            float(trenching_equipment['Daily output'].values[0])
+
+        for circuit, module in [('source', 'Source circuit wiring'),
+                                ('output', 'Output circuit wiring')]:
+            tables[circuit + '_circuit_daily_output'] = \
+                float(index.column('Daily output', module, operation_id=module)[0])
+            operations = index.operations(module)
+            tables[circuit + '_wiring_usd_lf'] = float(operations['Rate USD per unit'].iloc[0])
+            tables[circuit + '_circuit_workers'] = \
+                [float(workers) for workers in operations['Number of workers'].dropna()]
+
+        tables['trenching_workers'] = \
+            [float(workers) for workers in
+             index.operations('Collection')['Number of workers'].dropna()]
+
+        pv_wire_DC_specs = input_dict['pv_wire_DC_specs']
+        ampacity = pv_wire_DC_specs['Temperature Rating of Conductor at 75°C (167°F) in Amps']
+        for key, rows in [
+                ('source_circuit_usd_lf', pv_wire_DC_specs['Size (AWG or kcmil)'] == 10),
+                ('output_circuit_usd_lf_175A', ampacity == 175),
+                ('output_circuit_usd_lf_150A', ampacity == 150)]:
+            costs = pv_wire_DC_specs.loc[rows, 'Cost (USD/LF)']
+            tables[key] = float(costs.iloc[0]) if len(costs) else np.nan
+
+        return tables
+
+    def _extract_foundation(self, input_dict, index):
+        material_needs = pd.DataFrame(
+            {'Material type ID': list(self.pad_materials),
+             'Quantity of material': [float(slot) for slot in range(len(self.pad_materials))]},
+            columns=['Material type ID', 'Quantity of material'])
+
+        operation_data = pd.merge(material_needs,
+                                  index.operations('Foundations'),
+                                  on=['Material type ID'], how='outer')
+        operations, labels = self._operation_rows(operation_data)
+
+        labor_equip_data = pd.merge(material_needs, index.construction_estimator,
+                                    on=['Material type ID'])
+        equipment_data = \
+            labor_equip_data[labor_equip_data['Type of cost'].str.match('Equipment rental')]
+        labor_data = labor_equip_data[labor_equip_data['Type of cost'].str.match('Labor')]
+
+        material_data = pd.merge(material_needs, input_dict['material_price'],
+                                 on=['Material type ID'])
+
+        return {'operations': operations,
+                'equipment': self._cost_rows(equipment_data, operations, labels,
+                                             drop_nan_per_diem=False),
+                'labor': self._cost_rows(labor_data, operations, labels,
+                                         drop_nan_per_diem=False),
+                'materials': [(int(slot), float(price)) for slot, price in zip(
+                    material_data['Quantity of material'],
+                    pd.to_numeric(material_data['Material price USD per unit']))]}
+
+    def _extract_erection(self, input_dict):
+        equip_price = input_dict['equip_price']
+        return {'crane_crew': self._crew_rows(input_dict, 'C0'),
+                'crane_usd_per_hour': float(equip_price['Equipment price USD per hour'][0]),
+                'crane_fuel_gal_per_day': float(equip_price['Fuel consumption gal per day'][0]),
+                'crane_mobilization_usd': float(equip_price['Mobilization cost USD'][0])}
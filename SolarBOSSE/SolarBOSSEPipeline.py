@@ -0,0 +1,161 @@
+import pandas as pd
+
+from SolarBOSSE.excelio.create_master_input_dict import XlsxReader
+from SolarBOSSE.excelio.XlsxDataframeCache import XlsxDataframeCache
+from SolarBOSSE.model.Manager import Manager
+from SolarBOSSE.PipelineStats import pipeline_stats
+
+
+class SolarBOSSEPipeline:
+    """
+    A SolarBOSSE run, compiled once for a project list and its project data.
+
+    Compiling reads the project list and the project data sheets, applies the
+    labor cost multiplier, indexes the construction_estimator sheet and fills
+    in the default inputs: everything run_solarbosse() used to redo on every
+    call. The resulting master input dictionary is kept as a template, and each
+    call to run() only layers the scenario's overrides on a shallow copy of it
+    before running the cost modules.
+
+    Inputs read from the project data (such as the labor cost multiplier, which
+    is applied to the project data sheets) are fixed when compiling: overriding
+    them in run() has no effect on the sheets. Compile a new pipeline to change
+    them.
+
+    Example
+    -------
+    pipeline = SolarBOSSEPipeline.compile('project_list_50MW')
+    for size in [5, 50, 100]:
+        results, detailed_results = pipeline.run({'system_size_MW_DC': size})
+    """
+
+    def __init__(self, master_input_template):
+        """
+        Use compile() instead of instantiating this class directly.
+
+        Parameters
+        ----------
+        master_input_template : dict
+            Master input dictionary shared by all the runs of the pipeline.
+            Neither it nor the dataframes it holds are modified by run().
+        """
+        self.master_input_template = master_input_template
+
+    @classmethod
+    @pipeline_stats.timed('solarbosse.compile')
+    def compile(cls, project_list, project_data=None):
+        """
+        Builds the master input template of a project list.
+
+        As in run_solarbosse(), if the project list has several projects, the
+        last one is used.
+
+        Parameters
+        ----------
+        project_list : str or pandas.DataFrame
+            Basename (without the .xlsx extension) of the project list, or the
+            project list itself.
+
+        project_data : dict
+            Sheets of the project data workbook (keys are the names of the
+            sheets and values are their dataframes). Defaults to the sheets of
+            the 'Project data file' of the project, read through
+            XlsxDataframeCache. The dataframes are not modified.
+
+        Returns
+        -------
+        SolarBOSSEPipeline
+            The compiled pipeline.
+        """
+        from SolarBOSSE import main
+
+        if isinstance(project_list, pd.DataFrame):
+            projects = project_list
+        else:
+            projects = main.read_data(project_list)
+
+        project_parameters = projects.iloc[-1]
+
+        if project_data is None:
+            # Read only views of the cached sheets: create_master_input_dictionary()
+            # applies the labor cost multiplier to copies of the sheets it changes,
+            # and the cost modules do not modify the other sheets.
+            project_data = XlsxDataframeCache.read_all_sheets_from_xlsx(
+                project_parameters['Project data file'], main.project_data_path())
+
+        master_input_template = XlsxReader().create_master_input_dictionary(
+            project_data, project_parameters)
+
+        return cls(master_input_template)
+
+    @pipeline_stats.timed('solarbosse.run')
+    def run(self, overrides=None):
+        """
+        Runs SolarBOSSE for one scenario.
+
+        Parameters
+        ----------
+        overrides : dict
+            Inputs of the scenario that differ from the master input template
+            (e.g. system_size_MW_DC).
+
+        Returns
+        -------
+        tuple
+            The results dictionary and the detailed output dictionary, as
+            returned by run_solarbosse().
+        """
+        master_input_dict = dict(self.master_input_template)
+        master_input_dict['error'] = dict()
+        output_dict = dict()
+
+        if overrides is not None:
+            master_input_dict.update(overrides)
+
+        if 'grid_system_size_MW_DC' not in master_input_dict:
+            master_input_dict['grid_system_size_MW_DC'] = master_input_dict['system_size_MW_DC']
+
+        if 'grid_size_MW_AC' not in master_input_dict:
+            master_input_dict['grid_size_MW_AC'] = \
+                master_input_dict['system_size_MW_DC'] / master_input_dict['dc_ac_ratio']
+
+        # Manager class (1) manages the distribution of inout data for all modules
+        # and (2) executes landbosse
+        mc = Manager(input_dict=master_input_dict, output_dict=output_dict)
+        mc.execute_solarbosse()
+
+        return self.results(master_input_dict, output_dict), output_dict
+
+    @staticmethod
+    def results(master_input_dict, output_dict):
+        """
+        Returns the results dictionary of a run: the errors of the run, or, if
+        the run succeeded, the main costs from output_dict.
+        """
+        results = dict()
+        results['errors'] = []
+        if master_input_dict['error']:
+            for key, value in master_input_dict['error'].items():
+                msg = "Error in " + key + ": " + str(value)
+                results['errors'].append(msg)
+        else:   # if project runs successfully, return a dictionary with results
+            # that are 3 layers deep (but 1-D)
+            results['total_bos_cost'] = output_dict['total_bos_cost']
+            results['total_racking_cost'] = output_dict['total_racking_cost_USD']
+            results['siteprep_cost'] = output_dict['total_road_cost']
+            results['substation_cost'] = output_dict['total_substation_cost']
+            results['total_transdist_cost'] = output_dict['total_transdist_cost']
+
+            results['total_management_cost'] = output_dict['total_management_cost']
+            results['epc_developer_profit'] = output_dict['epc_developer_profit']
+            results['bonding_usd'] = output_dict['bonding_usd']
+            results['development_overhead_cost'] = output_dict['development_overhead_cost']
+            results['total_sales_tax'] = output_dict['development_overhead_cost']
+
+            results['total_foundation_cost'] = output_dict['total_foundation_cost']
+            results['total_erection_cost'] = output_dict['total_erection_cost']
+            results['total_collection_cost'] = output_dict['total_collection_cost']
+
+            results['total_bos_cost_before_mgmt'] = output_dict['total_bos_cost_before_mgmt']
+
+        return results
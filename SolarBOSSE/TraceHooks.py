@@ -0,0 +1,143 @@
+import json
+import logging
+import threading
+import time
+
+
+class TraceHooks:
+    """
+    Dispatches the trace events of the hybrid BOS pipeline to sinks.
+
+    An event is a dictionary with the name of the event under 'event', the
+    time it was emitted (time.time()) under 'time', and fields that depend on
+    the event:
+
+    stage_start, stage_end
+        A stage timed by PipelineStats starts or ends ('stage', and for
+        stage_end 'wall_time_s').
+
+    module_error
+        A cost module failed ('module', 'project', 'error' and 'traceback').
+
+    derived_inputs
+        Input dictionary derived for a leg of a hybrid plant ('leg', and the
+        inputs of the leg).
+
+    leg_results
+        BOS results of a leg of a hybrid plant ('leg', 'plant_size_MW',
+        'total_bos_cost', 'bos_usd_watt' and the leg's 'results').
+
+    A sink is any callable taking an event. With no sinks (the default),
+    emitting an event returns immediately, and code emitting events with
+    fields that are costly to compute checks enabled first. LoggingSink and
+    JsonLinesSink are provided.
+
+    Example
+    -------
+    with JsonLinesSink('trace.jsonl') as sink:
+        trace_hooks.add_sink(sink)
+        run_hybrid_BOS(hybrids_input_dict)
+        trace_hooks.remove_sink(sink)
+    """
+
+    def __init__(self):
+        self._sinks = []
+
+    @property
+    def enabled(self):
+        """
+        True if there is at least one sink.
+        """
+        return bool(self._sinks)
+
+    def add_sink(self, sink):
+        """
+        Sends the events emitted from now on to sink.
+        """
+        self._sinks = self._sinks + [sink]
+
+    def remove_sink(self, sink):
+        """
+        Stops sending events to sink.
+        """
+        self._sinks = [other for other in self._sinks if other is not sink]
+
+    def emit(self, event, **fields):
+        """
+        Sends event, with fields, to every sink.
+        """
+        sinks = self._sinks
+        if not sinks:
+            return
+
+        record = {'event': event, 'time': time.time()}
+        record.update(fields)
+        for sink in sinks:
+            sink(record)
+
+
+class LoggingSink:
+    """
+    Sink logging each event as a message of logger (by default, the
+    SolarBOSSE.trace logger). module_error events are logged as errors, with
+    their traceback, and other events at level.
+    """
+
+    def __init__(self, logger=None, level=logging.INFO):
+        self.logger = logger if logger is not None else logging.getLogger('SolarBOSSE.trace')
+        self.level = level
+
+    def __call__(self, record):
+        fields = {key: value for key, value in record.items()
+                  if key not in ('event', 'time', 'traceback')}
+        if record['event'] == 'module_error':
+            self.logger.error('%s %s\n%s', record['event'], fields,
+                              record.get('traceback', ''))
+        else:
+            self.logger.log(self.level, '%s %s', record['event'], fields)
+
+
+class JsonLinesSink:
+    """
+    Sink writing each event as a line of JSON to a file. Values that are not
+    JSON serializable are written as strings.
+    """
+
+    def __init__(self, file):
+        """
+        Parameters
+        ----------
+        file : str or file object
+            Path of the file (which is opened for appending, and closed by
+            close()), or a text file object (which is not closed).
+        """
+        if isinstance(file, str):
+            self.file = open(file, 'a')
+            self._owns_file = True
+        else:
+            self.file = file
+            self._owns_file = False
+        self._lock = threading.Lock()
+
+    def __call__(self, record):
+        line = json.dumps(record, default=str) + '\n'
+        with self._lock:
+            self.file.write(line)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Flushes the file, and closes it if it was opened by this sink.
+        """
+        self.file.flush()
+        if self._owns_file:
+            self.file.close()
+
+
+# Trace hooks of this process:
+trace_hooks = TraceHooks()
@@ -0,0 +1,102 @@
+class ConstructionEstimatorIndex:
+    """
+    Index over the construction_estimator sheet of the project data.
+
+    The cost modules each select the rows of construction_estimator for their own
+    module (and, within it, a type of cost or an operation) every time they run.
+    This class scans the sheet once, grouping the row positions by (Module,
+    Operation ID, Type of cost, Units), and keeps the row blocks of the queries
+    that have been made, so that later queries are dictionary lookups.
+
+    The index is built for one construction_estimator dataframe, and must be
+    rebuilt if that dataframe is modified (e.g. when a labor cost multiplier is
+    applied to it). See CostModule.construction_estimator_index().
+
+    The blocks returned by rows() and operations() are shared by all the
+    callers of the same query (copy=False, the default), and must not be
+    modified. Pass copy=True to get a block that can be.
+    """
+
+    key_columns = ['Module', 'Operation ID', 'Type of cost', 'Units']
+
+    def __init__(self, construction_estimator):
+        """
+        Parameters
+        ----------
+        construction_estimator : pandas.DataFrame
+            The construction_estimator sheet, after labor cost multipliers have
+            been applied.
+        """
+        self.construction_estimator = construction_estimator
+
+        # Row positions of each (Module, Operation ID, Type of cost, Units) key:
+        self._positions = dict()
+        key_values = zip(*(construction_estimator[column].values
+                           for column in self.key_columns))
+        for position, key in enumerate(key_values):
+            self._positions.setdefault(key, []).append(position)
+
+        # Row blocks of the queries made so far:
+        self._blocks = dict()
+
+    def positions(self, module, operation_id=None, type_of_cost=None, units=None):
+        """
+        Returns the (sorted) row positions in construction_estimator of the rows
+        with the given Module and, if given, Operation ID, Type of cost and Units.
+        """
+        query = (module, operation_id, type_of_cost, units)
+        positions = []
+        for key, key_positions in self._positions.items():
+            if all(value is None or value == key_value
+                   for value, key_value in zip(query, key)):
+                positions.extend(key_positions)
+
+        return sorted(positions)
+
+    def rows(self, module, operation_id=None, type_of_cost=None, units=None,
+             copy=False):
+        """
+        Returns the rows of construction_estimator with the given Module and, if
+        given, Operation ID, Type of cost and Units. Same as filtering
+        construction_estimator with a boolean mask on each of the given columns.
+        The rows are a shared block, unless copy is True.
+        """
+        query = ('rows', module, operation_id, type_of_cost, units)
+        if query not in self._blocks:
+            self._blocks[query] = self.construction_estimator.iloc[
+                self.positions(module, operation_id, type_of_cost, units)]
+
+        return self._block(query, copy)
+
+    def operations(self, module, copy=False):
+        """
+        Returns the operations of module that have data. Same as
+
+        construction_estimator.where(
+            construction_estimator['Module'] == module).dropna(thresh=4)
+
+        The operations are a shared block, unless copy is True.
+        """
+        query = ('operations', module)
+        if query not in self._blocks:
+            self._blocks[query] = self.rows(module).dropna(thresh=4)
+
+        return self._block(query, copy)
+
+    def column(self, column, module, operation_id=None, type_of_cost=None,
+               units=None):
+        """
+        Returns a (read only) NumPy array of column for the rows selected by rows().
+        """
+        query = ('column', column, module, operation_id, type_of_cost, units)
+        if query not in self._blocks:
+            values = self.rows(module, operation_id, type_of_cost, units)[column].to_numpy()
+            values = values.copy()
+            values.flags.writeable = False
+            self._blocks[query] = values
+
+        return self._blocks[query]
+
+    def _block(self, query, copy):
+        block = self._blocks[query]
+        return block.copy() if copy else block
@@ -0,0 +1,270 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+# The dataframes of the sheets are assembled from their blocks with the block
+# manager of pandas, which is not part of its public API. It is only used with
+# the pandas versions it is known to work with. With other versions, or if its
+# import fails, the dataframes are built column by column instead (see
+# SharedProjectData._sheet_dataframe()):
+_BLOCK_MANAGER_PANDAS_VERSIONS = ((1, 3), (3, 0))
+
+try:
+    if not _BLOCK_MANAGER_PANDAS_VERSIONS[0] <= \
+            tuple(int(part) for part in pd.__version__.split('.')[:2]) < \
+            _BLOCK_MANAGER_PANDAS_VERSIONS[1]:
+        raise ImportError('pandas ' + pd.__version__ + ' is not supported')
+    from pandas.core.internals import BlockManager
+    from pandas.core.internals.api import make_block
+except (ImportError, ValueError):
+    BlockManager = make_block = None
+
+
+class SharedProjectData:
+    """
+    Project data sheets whose numeric columns are held in shared memory.
+
+    With a pool of worker processes, each worker would otherwise parse (or
+    unpickle) and hold its own copy of every project data sheet. Instead, the
+    parent process calls create() once with the sheets of the project data
+    workbooks. This copies the numeric columns of every sheet into a single
+    multiprocessing.shared_memory segment, and returns an instance whose
+    manifest (a small, picklable dictionary) describes where each column is.
+    The manifest is then passed to the workers (e.g. through the initializer of
+    a ProcessPoolExecutor), which call attach() to get dataframes whose numeric
+    columns are write protected NumPy views of the shared segment. Only the
+    object (e.g. string) columns, which are small, are copied into each worker.
+
+    The process that called create() owns the segment, and must call unlink()
+    (or use the instance as a context manager) once the workers are done with
+    it. Workers must be started with multiprocessing by that process, so that
+    they share its resource tracker.
+
+    Example
+    -------
+    with SharedProjectData.create({'project_data': sheets}) as shared:
+        with ProcessPoolExecutor(initializer=initialize_worker,
+                                 initargs=(shared.manifest,)) as executor:
+            ...
+
+    where initialize_worker() calls SharedProjectData.attach(manifest), and
+    passes the dataframes() of the returned instance to
+    XlsxDataframeCache.cache_all_sheets().
+    """
+
+    # Offsets of the column blocks in the shared segment are multiples of this
+    # (in bytes):
+    _alignment = 64
+
+    def __init__(self, manifest, shared_memory_segment, owner):
+        """
+        Use create() or attach() instead of instantiating this class directly.
+
+        Parameters
+        ----------
+        manifest : dict
+            Description of the sheets held in shared_memory_segment.
+
+        shared_memory_segment : multiprocessing.shared_memory.SharedMemory
+            Shared memory segment holding the numeric columns of the sheets.
+
+        owner : bool
+            True if this instance created shared_memory_segment.
+        """
+        self.manifest = manifest
+        self.shared_memory_segment = shared_memory_segment
+        self.owner = owner
+        self._dataframes = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        if self.owner:
+            self.unlink()
+
+    @classmethod
+    def create(cls, workbooks):
+        """
+        Copies the numeric columns of the sheets of workbooks into a new shared
+        memory segment.
+
+        Parameters
+        ----------
+        workbooks : dict
+            Keys are the base names of the project data .xlsx files, and values
+            are dictionaries of their sheets (as returned by
+            XlsxDataframeCache.read_all_sheets_from_xlsx()).
+
+        Returns
+        -------
+        SharedProjectData
+            The instance owning the new segment.
+        """
+        # Lay out the column blocks of every sheet, one block per numeric dtype:
+        manifest = {'workbooks': dict()}
+        blocks_values = []
+        size = 0
+        for xlsx_basename, sheets in workbooks.items():
+            manifest['workbooks'][xlsx_basename] = dict()
+            for sheet_name, df in sheets.items():
+                sheet_manifest, sheet_blocks_values = cls._sheet_layout(df)
+                for block, values in zip(sheet_manifest['blocks'], sheet_blocks_values):
+                    size = -(-size // cls._alignment) * cls._alignment
+                    block['offset'] = size
+                    size += values.nbytes
+                    blocks_values.append((block, values))
+                manifest['workbooks'][xlsx_basename][sheet_name] = sheet_manifest
+
+        shared_memory_segment = shared_memory.SharedMemory(create=True,
+                                                           size=max(size, 1))
+        manifest['name'] = shared_memory_segment.name
+
+        for block, values in blocks_values:
+            shared_values = np.ndarray(values.shape, dtype=values.dtype,
+                                       buffer=shared_memory_segment.buf,
+                                       offset=block['offset'])
+            shared_values[:] = values
+
+        return cls(manifest, shared_memory_segment, owner=True)
+
+    @classmethod
+    def attach(cls, manifest):
+        """
+        Attaches to the shared memory segment described by manifest.
+
+        Parameters
+        ----------
+        manifest : dict
+            The manifest of a SharedProjectData made by create().
+
+        Returns
+        -------
+        SharedProjectData
+            An instance that does not own the segment.
+        """
+        shared_memory_segment = shared_memory.SharedMemory(name=manifest['name'])
+        return cls(manifest, shared_memory_segment, owner=False)
+
+    def dataframes(self):
+        """
+        Returns the sheets as dataframes, whose numeric columns are write
+        protected views of the shared memory segment. The dataframes are made
+        once, and the same dataframes are returned by later calls.
+
+        Returns
+        -------
+        dict
+            Keys are the base names of the project data .xlsx files, and values
+            are dictionaries of their sheets.
+        """
+        if self._dataframes is None:
+            self._dataframes = {
+                xlsx_basename: {sheet_name: self._sheet_dataframe(sheet_manifest)
+                                for sheet_name, sheet_manifest in sheets.items()}
+                for xlsx_basename, sheets in self.manifest['workbooks'].items()}
+
+        return self._dataframes
+
+    def close(self):
+        """
+        Closes this process' access to the shared memory segment. The dataframes
+        must not be used after this.
+        """
+        self._dataframes = None
+        self.shared_memory_segment.close()
+
+    def unlink(self):
+        """
+        Frees the shared memory segment. Only called by the process that created
+        it, once all the processes using it are done.
+        """
+        self.shared_memory_segment.unlink()
+
+    @staticmethod
+    def _sheet_layout(df):
+        """
+        Splits the columns of df into numeric blocks (one per dtype), to be held
+        in shared memory, and object columns, to be held in the manifest.
+
+        Returns the manifest of the sheet and the list of values of its numeric
+        blocks (in the order of the manifest's blocks).
+        """
+        positions_by_dtype = dict()
+        object_positions = []
+        for position, dtype in enumerate(df.dtypes):
+            if isinstance(dtype, np.dtype) and dtype.kind in 'biufcmM':
+                positions_by_dtype.setdefault(dtype, []).append(position)
+            elif dtype == object:
+                object_positions.append(position)
+            else:
+                raise TypeError(f'Column {df.columns[position]} has dtype {dtype}, '
+                                f'which cannot be shared.')
+
+        sheet_manifest = {
+            'columns': df.columns,
+            'index': df.index,
+            'blocks': [],
+            'object_positions': object_positions,
+            'object_values': np.array([df.iloc[:, position].to_numpy()
+                                       for position in object_positions],
+                                      dtype=object).reshape(len(object_positions),
+                                                            len(df)),
+        }
+
+        blocks_values = []
+        for dtype, positions in positions_by_dtype.items():
+            values = np.array([df.iloc[:, position].to_numpy()
+                               for position in positions], dtype=dtype)
+            sheet_manifest['blocks'].append({'dtype': dtype.str,
+                                             'shape': values.shape,
+                                             'positions': positions})
+            blocks_values.append(values)
+
+        return sheet_manifest, blocks_values
+
+    def _sheet_dataframe(self, sheet_manifest):
+        """
+        Makes the dataframe of a sheet from its manifest, without copying the
+        numeric values out of the shared memory segment.
+        """
+        blocks_values = []
+        for block in sheet_manifest['blocks']:
+            values = np.ndarray(block['shape'], dtype=np.dtype(block['dtype']),
+                                buffer=self.shared_memory_segment.buf,
+                                offset=block['offset'])
+            values.flags.writeable = False
+            blocks_values.append((values, block['positions']))
+
+        if sheet_manifest['object_positions']:
+            blocks_values.append((sheet_manifest['object_values'].copy(),
+                                  sheet_manifest['object_positions']))
+
+        if make_block is None:
+            return self._sheet_dataframe_by_column(sheet_manifest, blocks_values)
+
+        blocks = [make_block(values, placement=positions, ndim=2)
+                  for values, positions in blocks_values]
+        block_manager = BlockManager(blocks, [sheet_manifest['columns'],
+                                              sheet_manifest['index']])
+        return pd.DataFrame(block_manager)
+
+    @staticmethod
+    def _sheet_dataframe_by_column(sheet_manifest, blocks_values):
+        """
+        Makes the dataframe of a sheet with the public DataFrame constructor,
+        from a view of each column of its blocks. The numeric columns still
+        share the segment, but pandas may copy them into a single block (e.g.
+        when the dataframe is consolidated).
+        """
+        columns = dict()
+        for values, positions in blocks_values:
+            for row, position in enumerate(positions):
+                columns[position] = values[row]
+
+        df = pd.DataFrame({position: columns[position] for position in sorted(columns)},
+                          index=sheet_manifest['index'], copy=False)
+        df.columns = sheet_manifest['columns']
+        return df
@@ -1,6 +1,15 @@
+import hashlib
 import os
+import pickle
+import tempfile
+import numpy as np
 import pandas as pd
-from LandBOSSE.landbosse.excelio.XlsxFileOperations import XlsxFileOperations
+
+from SolarBOSSE.PipelineStats import pipeline_stats
+
+
+# (major, minor) version of pandas:
+_PANDAS_VERSION = tuple(int(part) for part in pd.__version__.split('.')[:2])
 
 
 class XlsxDataframeCache:
@@ -19,26 +28,55 @@ class XlsxDataframeCache:
     of paralelization).
 
     Regardless of which executor is used, care must be taken that one thread
-    or process cannot mutate the dataframes of another process. So, this
-    class make copies of dataframes so the callables running from the
-    executor cannot overwrite each other's data.
+    or process cannot mutate the dataframes of another process. So, by default,
+    this class returns read only views of the cached dataframes: the NumPy
+    arrays holding their numeric values are shared with the cache and write
+    protected, so that assigning to a numeric cell (e.g. with .loc, .iloc or
+    .at) raises a ValueError instead of modifying the cache. Object (e.g.
+    string) columns are not protected, and are copied for each view: default
+    reads are therefore not free of copies. Adding, replacing or dropping whole
+    columns of a view only changes that view. Callers that do modify the
+    numeric values of the dataframes (such as LandBOSSE, when it applies labor
+    cost multipliers in place) must pass copy=True to get copies.
+
+    With pandas copy-on-write (enabled with pd.options.mode.copy_on_write, and
+    always on from pandas 3.0), pandas protects the cache itself: assigning to
+    a cell of a view copies the column of the view instead of raising, and the
+    object columns are not copied for each view.
+
+    Parsing an .xlsx file is slow, so the sheets parsed in one process are also
+    pickled to a sidecar file (in a .xlsx_cache directory next to the .xlsx
+    file), which later processes read instead of parsing the .xlsx file again.
+    A sidecar file is only used if it was written for the same .xlsx file (path
+    and contents, checked with its modification time and size, or its SHA-256
+    hash if those changed) by the same version of this cache format and of
+    pandas. Otherwise it is rebuilt. Set disk_cache to False to neither read nor
+    write sidecar files.
     """
 
     # _cache is a class attribute that holds the cache of sheets and their
     # dataframes
     _cache = {}
 
+    # Whether parsed sheets are cached in sidecar files, and the version of the
+    # format of those files (to be incremented whenever that format changes):
+    disk_cache = True
+    disk_cache_version = 1
+    disk_cache_dirname = '.xlsx_cache'
+
     @classmethod
-    def read_all_sheets_from_xlsx(cls, xlsx_basename, xlsx_path=None):
+    @pipeline_stats.timed('solarbosse.sheet_load')
+    def read_all_sheets_from_xlsx(cls, xlsx_basename, xlsx_path=None, copy=False):
         """
         If the .xlsx file specified by .xlsx_basename has been read before
-        (meaning it is stored as a key on cls._cache), a copy of all the
-        dataframes stored under that sheet name is returned. See the note
-        about copying in the class docstring for why copies are being made.
+        (meaning it is stored as a key on cls._cache), read only views (or, if
+        copy is True, copies) of all the dataframes stored under that sheet
+        name are returned. See the note about views and copies in the class
+        docstring.
 
         If the xlsx_basename has not been read before, all the sheets are
-        read and copies are returned. The sheets are stored on the dictionary
-        cache.
+        read and views (or copies) are returned. The sheets are stored on the
+        dictionary cache.
 
         Parameters
         ----------
@@ -50,9 +88,14 @@ class XlsxDataframeCache:
             in the dictionary used to access all the sheets in the
             named .xlsx file.
 
-        xlsx_pathname : str
-            The path from which to read the .xlsx file. This parameter
-            has the default value of
+        xlsx_path : str
+            The path from which to read the .xlsx file. Defaults to the
+            project_data directory of the LandBOSSE input directory.
+
+        copy : bool
+            If False (the default), read only views of the cached dataframes
+            are returned. If True, writable copies of the cached dataframes
+            are returned.
 
         Returns
         -------
@@ -63,19 +106,50 @@ class XlsxDataframeCache:
         """
         if xlsx_basename in cls._cache:
             original = cls._cache[xlsx_basename]
-            return cls.copy_dataframes(original)
-
-        file_ops = XlsxFileOperations()
+            return cls.copy_dataframes(original) if copy else cls.view_dataframes(original)
 
         if xlsx_path is None:
+            # LandBOSSE is only needed to locate its default input directory:
+            from LandBOSSE.landbosse.excelio.XlsxFileOperations import XlsxFileOperations
+            file_ops = XlsxFileOperations()
             xlsx_filename = os.path.join(file_ops.landbosse_input_dir(), 'project_data', f'{xlsx_basename}.xlsx')
         else:
             xlsx_filename = os.path.join(xlsx_path, f'{xlsx_basename}.xlsx')
 
-        xlsx = pd.ExcelFile(xlsx_filename)
-        sheets_dict = {sheet_name: xlsx.parse(sheet_name) for sheet_name in xlsx.sheet_names}
+        sheets_dict = cls.read_disk_cache(xlsx_filename) if cls.disk_cache else None
+        if sheets_dict is None:
+            xlsx = pd.ExcelFile(xlsx_filename)
+            sheets_dict = {sheet_name: xlsx.parse(sheet_name) for sheet_name in xlsx.sheet_names}
+            if cls.disk_cache:
+                cls.write_disk_cache(xlsx_filename, sheets_dict)
+
+        for sheet in sheets_dict.values():
+            cls.write_protect(sheet)
+
         cls._cache[xlsx_basename] = sheets_dict
-        return cls.copy_dataframes(sheets_dict)
+        return cls.copy_dataframes(sheets_dict) if copy else cls.view_dataframes(sheets_dict)
+
+    @classmethod
+    def cache_all_sheets(cls, xlsx_basename, sheets_dict):
+        """
+        Stores sheets_dict in the cache as the sheets of xlsx_basename, so that
+        later calls to read_all_sheets_from_xlsx() return views (or copies) of
+        these dataframes instead of reading the .xlsx file. Used by worker
+        processes to cache sheets held in shared memory (see SharedProjectData).
+
+        Parameters
+        ----------
+        xlsx_basename : str
+            The base name of the xlsx file, without the .xlsx extension.
+
+        sheets_dict : dict
+            Keys are names of sheets and values are their dataframes. The
+            dataframes are write protected in place.
+        """
+        for sheet in sheets_dict.values():
+            cls.write_protect(sheet)
+
+        cls._cache[xlsx_basename] = dict(sheets_dict)
 
     @classmethod
     def copy_dataframes(cls, dict_of_dataframes):
@@ -95,3 +169,167 @@ class XlsxDataframeCache:
             Values are copies of the origin dataframes.
         """
         return {xlsx_basename: df.copy() for xlsx_basename, df in dict_of_dataframes.items()}
+
+    @classmethod
+    def view_dataframes(cls, dict_of_dataframes):
+        """
+        Makes read only views of a dictionary of (write protected) dataframes.
+        See the class docstring for how these views can be used.
+
+        Parameters
+        ----------
+        dict_of_dataframes : dict
+            The dictionary of dataframes to view.
+
+        Returns
+        -------
+        dict
+            Keys are the same as the original dictionary of dataframes.
+            Values are shallow copies of the original dataframes, which share
+            their (write protected) numeric values.
+        """
+        return {xlsx_basename: cls.view_dataframe(df) for xlsx_basename, df in dict_of_dataframes.items()}
+
+    @staticmethod
+    def view_dataframe(df):
+        """
+        Returns a read only view of a (write protected) dataframe: a shallow copy
+        of df, with copies of its object columns.
+        """
+        view = df.copy(deep=False)
+        if _copy_on_write():
+            return view
+
+        object_columns = df.columns[(df.dtypes == object).to_numpy()]
+        if len(object_columns) > 0:
+            view[object_columns] = df[object_columns].copy()
+        return view
+
+    @staticmethod
+    def write_protect(df):
+        """
+        Write protects the NumPy arrays holding the numeric values of df, in
+        place. Object arrays, and values held in pandas extension arrays (e.g.
+        categoricals), are not protected. Nor are the arrays of pandas versions
+        whose blocks are not accessed (see _block_arrays()), which copy on write.
+        """
+        for values in _block_arrays(df):
+            if values.dtype != object:
+                values.flags.writeable = False
+        return df
+
+    @classmethod
+    def disk_cache_filename(cls, xlsx_filename):
+        """
+        Returns the name of the sidecar file caching the sheets of xlsx_filename.
+        """
+        xlsx_dirname, xlsx_basename = os.path.split(os.path.abspath(xlsx_filename))
+        return os.path.join(xlsx_dirname, cls.disk_cache_dirname,
+                            f'{xlsx_basename}.pkl')
+
+    @classmethod
+    def disk_cache_key(cls, xlsx_filename, file_hash=True):
+        """
+        Returns the dictionary identifying the contents of xlsx_filename that a
+        sidecar file is valid for. The SHA-256 hash of the file is only computed
+        if file_hash is True.
+        """
+        xlsx_filename = os.path.abspath(xlsx_filename)
+        stat = os.stat(xlsx_filename)
+        key = {
+            'version': cls.disk_cache_version,
+            'pandas_version': pd.__version__,
+            'path': xlsx_filename,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+        }
+        if file_hash:
+            with open(xlsx_filename, 'rb') as xlsx_file:
+                key['sha256'] = hashlib.sha256(xlsx_file.read()).hexdigest()
+        return key
+
+    @classmethod
+    def read_disk_cache(cls, xlsx_filename):
+        """
+        Returns the dictionary of dataframes cached in the sidecar file of
+        xlsx_filename, or None if there is no such file or if it is stale or
+        unreadable.
+
+        The sidecar file holds two pickles: the key of the .xlsx file it was
+        written for (see disk_cache_key()), then the dictionary of dataframes.
+        Only the key is read from a stale file.
+        """
+        try:
+            with open(cls.disk_cache_filename(xlsx_filename), 'rb') as cache_file:
+                cached_key = pickle.load(cache_file)
+                key = cls.disk_cache_key(xlsx_filename, file_hash=False)
+
+                same_version = all(cached_key.get(name) == key[name]
+                                   for name in ['version', 'pandas_version', 'path'])
+                same_stat = all(cached_key.get(name) == key[name]
+                                for name in ['mtime_ns', 'size'])
+
+                # If the file was touched (e.g. by a checkout), compare contents:
+                if same_version and not same_stat:
+                    key = cls.disk_cache_key(xlsx_filename)
+                    same_stat = cached_key.get('sha256') == key['sha256']
+
+                if not (same_version and same_stat):
+                    return None
+
+                return pickle.load(cache_file)
+
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError,
+                ImportError, IndexError, TypeError, ValueError):
+            return None
+
+    @classmethod
+    def write_disk_cache(cls, xlsx_filename, sheets_dict):
+        """
+        Writes sheets_dict to the sidecar file of xlsx_filename.
+
+        The file is written to a temporary file that is then renamed, so that
+        processes reading the cache concurrently never see a partial file. If
+        the file cannot be written (e.g. the directory is read only), the cache
+        is not written, and the sheets will be parsed again by the next process.
+        """
+        cache_filename = cls.disk_cache_filename(xlsx_filename)
+        cache_dirname = os.path.dirname(cache_filename)
+        temp_filename = None
+        try:
+            os.makedirs(cache_dirname, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=cache_dirname, suffix='.tmp',
+                                             delete=False) as temp_file:
+                temp_filename = temp_file.name
+                pickle.dump(cls.disk_cache_key(xlsx_filename), temp_file, protocol=5)
+                pickle.dump(sheets_dict, temp_file, protocol=5)
+            os.replace(temp_filename, cache_filename)
+
+        except OSError:
+            if temp_filename is not None and os.path.exists(temp_filename):
+                os.remove(temp_filename)
+
+
+def _block_arrays(df):
+    """
+    Returns the NumPy arrays of the blocks of df. Blocks are private pandas
+    state, only accessed with the pandas versions they are known to work with
+    (before 3.0). No arrays are returned with later versions.
+    """
+    if not (1, 1) <= _PANDAS_VERSION < (3, 0):
+        return []
+    return [block.values for block in df._mgr.blocks
+            if isinstance(block.values, np.ndarray)]
+
+
+def _copy_on_write():
+    """
+    Returns True if pandas copy-on-write is enabled.
+    """
+    if _PANDAS_VERSION >= (3, 0):
+        return True
+    try:
+        return pd.get_option('mode.copy_on_write') is True
+    except KeyError:
+        # pandas before 1.5 has no copy-on-write:
+        return False
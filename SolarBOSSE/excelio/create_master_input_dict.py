@@ -1,4 +1,6 @@
-from LandBOSSE.landbosse.model import DefaultMasterInputDict
+import numpy as np
+from .ConstructionEstimatorIndex import ConstructionEstimatorIndex
+from ..PipelineStats import pipeline_stats
 
 
 class XlsxReader:
@@ -49,6 +51,7 @@ class XlsxReader:
     possible.
     """
 
+    @pipeline_stats.timed('solarbosse.master_input_dict')
     def create_master_input_dictionary(self,
                                        project_data_dataframes,
                                        project_parameters):
@@ -92,17 +95,23 @@ class XlsxReader:
         # The erection module takes in a bunch of keys and values under the
         # 'project_data' key in the incomplete_input_dict
 
-        # Apply the labor multipliers
+        # Apply the labor multipliers (to copies of the sheets with labor costs,
+        # the project_data_dataframes are not modified)
         incomplete_input_dict['labor_cost_multiplier'] = \
             project_parameters['Labor cost multiplier']
         labor_cost_multiplier = incomplete_input_dict['labor_cost_multiplier']
-        self.apply_labor_multiplier_to_project_data_dict(project_data_dataframes,
-                                                         labor_cost_multiplier)
+        project_data_dataframes = self.labor_cost_view(project_data_dataframes,
+                                                       labor_cost_multiplier)
 
         # Get the first set of data
         incomplete_input_dict['construction_estimator'] = \
             project_data_dataframes['construction_estimator']
 
+        # Index the construction_estimator rows of each module once, now that the
+        # labor multiplier has been applied:
+        incomplete_input_dict['construction_estimator_index'] = \
+            ConstructionEstimatorIndex(incomplete_input_dict['construction_estimator'])
+
         incomplete_input_dict['hour_day'] = \
             project_parameters['Hours per workday (hours)']
 
@@ -260,11 +269,48 @@ class XlsxReader:
         incomplete_input_dict['project_id'] = project_parameters['Project ID']
 
         # Now fill any missing values with sensible defaults.
+        from LandBOSSE.landbosse.model import DefaultMasterInputDict
         defaults = DefaultMasterInputDict()
         master_input_dict = defaults.populate_input_dict(incomplete_input_dict=
                                                          incomplete_input_dict)
         return master_input_dict
 
+    def labor_cost_view(self, project_data_dict, labor_cost_multiplier):
+        """
+        Returns the project data with the labor multiplier applied, without
+        modifying project_data_dict.
+
+        The returned dictionary has the same sheets as project_data_dict. The
+        "crew_price" and "construction_estimator" dataframes are copies with the
+        labor multiplier applied (see apply_labor_multiplier_to_project_data_dict()),
+        and all the other dataframes are those of project_data_dict. This makes
+        it possible to read the project data from XlsxDataframeCache without
+        copying every sheet: only the two (small) sheets with labor costs are
+        copied. If the multiplier is 1, no sheet is copied.
+
+        Parameters
+        ----------
+        project_data_dict : dict
+            The dictionary that has the dataframes as values.
+
+        labor_cost_multiplier : float
+            The scalar labor cost multiplier.
+
+        Returns
+        -------
+        dict
+            The project data with the labor multiplier applied.
+        """
+        labor_cost_view = dict(project_data_dict)
+        if labor_cost_multiplier != 1:
+            labor_cost_view['crew_price'] = project_data_dict['crew_price'].copy()
+            labor_cost_view['construction_estimator'] = \
+                project_data_dict['construction_estimator'].copy()
+            self.apply_labor_multiplier_to_project_data_dict(labor_cost_view,
+                                                             labor_cost_multiplier)
+
+        return labor_cost_view
+
     def apply_labor_multiplier_to_project_data_dict(self,
                                                     project_data_dict,
                                                     labor_cost_multiplier):
@@ -300,22 +346,10 @@ class XlsxReader:
 
         construction_estimator = project_data_dict['construction_estimator']
 
-        # This function maps new labor rates in construction_estimator. Used with an apply()
-        # call, it will create a new Series that can be mapped back onto the
-        # original dataframe.
-        #
-        # If the column "Type of cost" is "Labor" then return the current cost
-        # times the labor multiplier. If "Type of cost" isn't "Labor" then
-        # just return the current cost.
-        def map_labor_rates(row):
-            if row['Type of cost'] == 'Labor':
-                return row['Rate USD per unit'] * labor_cost_multiplier
-            else:
-                return row['Rate USD per unit']
-
-        construction_estimator_new_labor_rates = \
-            construction_estimator.apply(map_labor_rates, axis=1)
-        construction_estimator.drop(columns=['Rate USD per unit'],
-                                    inplace=True)
+        # If the column "Type of cost" is "Labor" then the new rate is the current
+        # rate times the labor multiplier. If "Type of cost" isn't "Labor" then
+        # the rate is unchanged.
+        is_labor = (construction_estimator['Type of cost'] == 'Labor').to_numpy()
+        rates = construction_estimator['Rate USD per unit'].to_numpy()
         construction_estimator['Rate USD per unit'] = \
-            construction_estimator_new_labor_rates
+            np.where(is_labor, rates * labor_cost_multiplier, rates)
@@ -1,79 +1,129 @@
 import os
 import pandas as pd
-from SolarBOSSE.excelio.create_master_input_dict import XlsxReader
-from LandBOSSE.landbosse.excelio.XlsxDataframeCache import XlsxDataframeCache
-from SolarBOSSE.model.Manager import Manager
+from SolarBOSSE.excelio.XlsxDataframeCache import XlsxDataframeCache
+from SolarBOSSE.excelio.SharedProjectData import SharedProjectData
+from SolarBOSSE.SolarBOSSEPipeline import SolarBOSSEPipeline
+
+
+# Pipelines compiled by run_solarbosse(), keyed by project list. Like the sheets
+# in XlsxDataframeCache, they are kept for the lifetime of the process:
+_compiled_pipelines = dict()
 
 
 def run_solarbosse(input_dictionary):
-    input_output_path = os.path.dirname(__file__)
+    """
+    Runs SolarBOSSE for the project list input_dictionary['project_list'], with
+    the other entries of input_dictionary overriding the inputs read from the
+    project list and project data.
+
+    The project list is compiled into a SolarBOSSEPipeline the first time it is
+    run in a process. Later runs only apply their overrides (see
+    SolarBOSSEPipeline.run()).
+
+    Returns
+    -------
+    tuple
+        The results dictionary (main costs, or the errors of the run) and the
+        detailed output dictionary.
+    """
     # SolarBOSSE uses LandBOSSE's Excel I/O library for reading in data from Excel
-    # files. Accordingly, the environment variables used in SolarBOSSE are called
-    # LANDBOSSE_INPUT_DIR & LANDBOSSE_OUTPUT_DIR:
-    os.environ["LANDBOSSE_INPUT_DIR"] = input_output_path
-    os.environ["LANDBOSSE_OUTPUT_DIR"] = input_output_path
-
-    project_data = read_data(input_dictionary['project_list'])
-    xlsx_reader = XlsxReader()
-    for _, project_parameters in project_data.iterrows():
-        project_data_basename = project_parameters['Project data file']
-
-        project_data_sheets = \
-            XlsxDataframeCache.read_all_sheets_from_xlsx(project_data_basename)
-
-        # make sure you call create_master_input_dictionary() as soon as
-        # labor_cost_multiplier's value is changed.
-        master_input_dict = xlsx_reader.create_master_input_dictionary(
-                                            project_data_sheets, project_parameters)
-
-        master_input_dict['error'] = dict()
-
-    # master_input_dict = dict()
-    output_dict = dict()
-
-    for key, _ in input_dictionary.items():
-        master_input_dict[key] = input_dictionary[key]
-
-    if 'grid_system_size_MW_DC' not in master_input_dict:
-        master_input_dict['grid_system_size_MW_DC'] = master_input_dict['system_size_MW_DC']
-
-    if 'grid_size_MW_AC' not in master_input_dict:
-        master_input_dict['grid_size_MW_AC'] = \
-            master_input_dict['system_size_MW_DC'] / master_input_dict['dc_ac_ratio']
-
-    # Manager class (1) manages the distribution of inout data for all modules
-    # and (2) executes landbosse
-    mc = Manager(input_dict=master_input_dict, output_dict=output_dict)
-    mc.execute_solarbosse()
-
-    # results dictionary that gets returned by this function:
-    results = dict()
-    results['errors'] = []
-    if master_input_dict['error']:
-        for key, value in master_input_dict['error'].items():
-            msg = "Error in " + key + ": " + str(value)
-            results['errors'].append(msg)
-    else:   # if project runs successfully, return a dictionary with results
-        # that are 3 layers deep (but 1-D)
-        results['total_bos_cost'] = output_dict['total_bos_cost']
-        results['total_racking_cost'] = output_dict['total_racking_cost_USD']
-        results['siteprep_cost'] = output_dict['total_road_cost']
-        results['substation_cost'] = output_dict['total_substation_cost']
-        results['total_transdist_cost'] = output_dict['total_transdist_cost']
-
-        results['total_management_cost'] = output_dict['total_management_cost']
-        results['epc_developer_profit'] = output_dict['epc_developer_profit']
-        results['bonding_usd'] = output_dict['bonding_usd']
-        results['development_overhead_cost'] = output_dict['development_overhead_cost']
-        results['total_sales_tax'] = output_dict['development_overhead_cost']
-
-        results['total_foundation_cost'] = output_dict['total_foundation_cost']
-        results['total_erection_cost'] = output_dict['total_erection_cost']
-        results['total_collection_cost'] = output_dict['total_collection_cost']
-
-        results['total_bos_cost_before_mgmt'] = output_dict['total_bos_cost_before_mgmt']
-
-    return results, output_dict
+    # files. The project data directory is passed explicitly instead of through
+    # the LANDBOSSE_INPUT_DIR environment variable, which is process wide and is
+    # also set by LandBOSSE (possibly from another thread, see run_BOSSEs()):
+    project_list = input_dictionary['project_list']
+    if project_list not in _compiled_pipelines:
+        _compiled_pipelines[project_list] = SolarBOSSEPipeline.compile(project_list)
+
+    return _compiled_pipelines[project_list].run(input_dictionary)
+
+
+def preload_project_data(project_list):
+    """
+    Reads the project list, and every project data workbook it references, into
+    XlsxDataframeCache. Later calls to run_solarbosse() in the same process then
+    use the cached data frames instead of parsing the .xlsx files again.
+
+    Meant to be called once per worker process, before a sweep of scenarios.
+
+    Parameters
+    ----------
+    project_list : str
+        Basename (without the .xlsx extension) of the project list.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The project list.
+    """
+    project_data = read_data(project_list)
+    for project_data_basename in project_data['Project data file'].unique():
+        XlsxDataframeCache.read_all_sheets_from_xlsx(project_data_basename,
+                                                     project_data_path())
+
+    return project_data
+
+
+def share_project_data(project_list):
+    """
+    Reads the project list, and every project data workbook it references, into
+    shared memory (see SharedProjectData). Meant to be called once by the parent
+    process of a pool of workers, which then call attach_project_data() with
+    the manifest of the returned instance.
+
+    The caller owns the shared memory segment, and must unlink() it once the
+    workers are done.
+
+    Parameters
+    ----------
+    project_list : str
+        Basename (without the .xlsx extension) of the project list.
+
+    Returns
+    -------
+    SharedProjectData
+        The project list and project data workbooks, in shared memory.
+    """
+    project_data = preload_project_data(project_list)
+
+    workbooks = {project_list: XlsxDataframeCache.read_all_sheets_from_xlsx(
+        project_list, os.path.dirname(__file__))}
+    for project_data_basename in project_data['Project data file'].unique():
+        workbooks[project_data_basename] = XlsxDataframeCache.read_all_sheets_from_xlsx(
+            project_data_basename, project_data_path())
+
+    return SharedProjectData.create(workbooks)
+
+
+def attach_project_data(manifest):
+    """
+    Attaches to the project data put in shared memory by share_project_data(),
+    and caches its sheets in XlsxDataframeCache, so that run_solarbosse() uses
+    them instead of reading the .xlsx files. Meant to be called once per worker
+    process.
+
+    Parameters
+    ----------
+    manifest : dict
+        The manifest of the SharedProjectData returned by share_project_data().
+
+    Returns
+    -------
+    SharedProjectData
+        The attached project data, which must be kept alive as long as the
+        cached sheets are used.
+    """
+    shared_project_data = SharedProjectData.attach(manifest)
+    for xlsx_basename, sheets in shared_project_data.dataframes().items():
+        XlsxDataframeCache.cache_all_sheets(xlsx_basename, sheets)
+
+    return shared_project_data
+
+
+def project_data_path():
+    """
+    Returns the directory holding the SolarBOSSE project data .xlsx files.
+    """
+    return os.path.join(os.path.dirname(__file__), 'project_data')
 
 
 # This method reads in the two input Excel files (project_list; project_1)
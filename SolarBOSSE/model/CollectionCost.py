@@ -1,8 +1,54 @@
-import traceback
 import math
+from collections import Counter
 import numpy as np
 import pandas as pd
 from .CostModule import CostModule
+from .CostLedger import CostLedger
+
+
+def distance_to_combiner_box(number_of_strings, module_width_m,
+                             number_modules_per_string):
+    """
+    Cumulative distance to combiner box at end of a row, for all strings in 1 of the
+    2 sub rows of the row (see CollectionCost.distance_to_combiner_box()).
+
+    With n = int(number_of_strings / 2) strings per sub row, each L = module_width_m
+    * number_modules_per_string long, the terminal module of the 1st string is L
+    away from the combiner box, and string i (counting from 0) adds the
+    (2 * i + 1) * L run of its terminal module, plus the width of its first module.
+    Summing this arithmetic series gives n^2 * L + (n - 1) * module_width_m.
+
+    Parameters
+    ----------
+    number_of_strings : int or array_like
+        Number of strings in a row (both sub rows).
+
+    module_width_m : float or array_like
+        Module width (in m), including the width of the mid clamp.
+
+    number_modules_per_string : int or array_like
+        Number of modules in each string.
+
+    Returns
+    -------
+    float or numpy.ndarray
+        Cumulative distance to combiner box (in m). A float if all the inputs are
+        scalars, and an array of the broadcast shape of the inputs otherwise.
+    """
+    number_of_strings_per_sub_row = np.trunc(np.asarray(number_of_strings) / 2)
+    module_width_m = np.asarray(module_width_m, dtype=float)
+
+    string_length_m = module_width_m * number_modules_per_string
+
+    distance = np.where(number_of_strings_per_sub_row >= 1,
+                        number_of_strings_per_sub_row ** 2 * string_length_m +
+                        (number_of_strings_per_sub_row - 1) * module_width_m,
+                        0.0)
+
+    if distance.ndim == 0:
+        return float(distance)
+
+    return distance
 
 
 class CollectionCost(CostModule):
@@ -87,6 +133,39 @@ class CollectionCost(CostModule):
         of the plant.
     """
 
+    # Keys read and written by this module (see CostModule):
+    input_keys = CostModule.input_keys + ('construction_estimator',
+                                        'construction_estimator_per_diem',
+                                        'construction_time_months', 'hour_day',
+                                        'inverter_max_mppt_V_DC', 'inverter_rating_kW',
+                                        'module_I_SC_DC', 'module_V_oc', 'module_rating_W',
+                                        'module_width_m', 'overtime_multiplier',
+                                        'pv_wire_DC_specs')
+    output_keys = ('Days taken for trenching (equipment)',
+                   'Days taken for trenching (labor)',
+                   'Equipment Cost USD with weather delays',
+                   'Equipment Cost USD without weather delays',
+                   'Equipment cost of trenching per day {usd/day)',
+                   'Labor Cost USD with weather delays',
+                   'Labor Cost USD without weather delays',
+                   'Labor cost of output wiring per day (usd/day)',
+                   'Labor cost of source wiring per day (usd/day)',
+                   'Labor cost of trenching per day (usd/day)',
+                   'Total per diem costs (USD)', 'days_taken_output_wiring',
+                   'days_taken_source_wiring', 'inverter_list', 'land_width_m',
+                   'managament_crew_cost_before_wind_delay', 'num_days',
+                   'operation_data_entire_farm', 'operation_data_id_days_crews_workers',
+                   'output_circuit_daily_output', 'output_circuit_wire_length_total_lf',
+                   'output_wiring_USD_lf', 'source_circuit_daily_output',
+                   'source_circuit_wire_length_total_lf', 'source_wiring_USD_lf',
+                   'string_V_oc', 'subarray_width_m', 'time_construct_days',
+                   'total_collection_cost', 'total_collection_cost_ledger',
+                   'total_material_cost', 'trench_length_km',
+                   'trenching_cable_equipment_usd_per_hr',
+                   'trenching_equipment_daily_output', 'trenching_labor_daily_output',
+                   'trenching_labor_usd_per_hr', 'wind_multiplier')
+    total_cost_key = 'total_collection_cost'
+
     def __init__(self, input_dict, output_dict, project_name):
         super(CollectionCost, self).__init__(input_dict, output_dict, project_name)
         self.input_dict = input_dict
@@ -230,32 +309,12 @@ class CollectionCost(CostModule):
         orientation stacked end-to-end. Multiply result obtained form this method by
         2 to get total cumulative length of source circuit wire for entire row.
         """
-        distance_to_combiner_box = 0    # initialize
-
-        number_modules_per_string = self.number_modules_per_string()
-
         # Get module length (plus 1" width of mid clamp):
         module_width_m = self.input_dict['module_width_m'] + self.inch_to_m
 
-        number_of_strings_per_sub_row = int(number_of_strings / 2)
-
-        for i in range(number_of_strings_per_sub_row):
-            if 0 == i:
-                # Distance of terminal module in 1st string from combiner box:
-                distance_to_combiner_box = (i + 1) * module_width_m * \
-                                           number_modules_per_string
-
-                adder = distance_to_combiner_box + module_width_m
-
-            else:
-                # Where adder is the first module in subsequent strings
-                distance_to_combiner_box += adder + ((i + 1) * module_width_m *
-                                                     number_modules_per_string)
-
-                adder = ((i + 1) * module_width_m * number_modules_per_string) + \
-                        module_width_m
-
-        return distance_to_combiner_box
+        return distance_to_combiner_box(number_of_strings,
+                                        module_width_m,
+                                        self.number_modules_per_string())
 
     def source_circuit_wire_length_lf(self,
                                       num_strings_per_row,
@@ -439,26 +498,21 @@ class CollectionCost(CostModule):
         collection_construction_time = self.input_dict[
                                            'construction_time_months'] * 0.45
 
-        throughput_operations = self.input_dict['construction_estimator']
+        construction_estimator_index = self.construction_estimator_index()
         trench_length_km = self.output_dict['trench_length_km']
 
-        operation_data = throughput_operations.where(
-            throughput_operations['Module'] == 'Collection').dropna(thresh=4)
-
-        source_wiring_operations = throughput_operations.where(
-            throughput_operations['Module'] == 'Source circuit wiring').dropna(thresh=4)
+        # Operations are modified below, so copies of the operations are used:
+        operation_data = construction_estimator_index.operations('Collection', copy=True)
 
-        output_wiring_operations = throughput_operations.where(
-            throughput_operations['Module'] == 'Output circuit wiring').dropna(thresh=4)
+        source_wiring_operations = \
+            construction_estimator_index.operations('Source circuit wiring', copy=True)
 
-        # from construction_estimator data, only read in Collection related data and
-        # filter out the rest:
-        cable_trenching = throughput_operations[throughput_operations.Module == 'Collection']
-        source_wiring = throughput_operations[throughput_operations.Module == 'Source circuit wiring']
-        output_wiring = throughput_operations[throughput_operations.Module == 'Output circuit wiring']
+        output_wiring_operations = \
+            construction_estimator_index.operations('Output circuit wiring', copy=True)
 
         # Storing data with labor related inputs:
-        trenching_labor = cable_trenching[cable_trenching.values == 'Labor']
+        trenching_labor = construction_estimator_index.rows('Collection',
+                                                            type_of_cost='Labor')
         trenching_labor_usd_per_hr = trenching_labor['Rate USD per unit'].sum()
 
         self.output_dict['trenching_labor_usd_per_hr'] = trenching_labor_usd_per_hr
@@ -468,25 +522,20 @@ class CollectionCost(CostModule):
         trenching_labor_num_workers = trenching_labor['Number of workers'].sum()
 
         # Get labor daily output for source circuit wiring:
-
-        source_wiring_labor = source_wiring[source_wiring.Module == 'Source circuit wiring']
-
-        source_circuit_daily_output = source_wiring_labor.loc[
-            source_wiring_labor['Operation ID'] == 'Source circuit wiring', 'Daily output']
-        source_circuit_daily_output = source_circuit_daily_output.iloc[0]
+        source_circuit_daily_output = construction_estimator_index.column(
+            'Daily output', 'Source circuit wiring', operation_id='Source circuit wiring')
+        source_circuit_daily_output = source_circuit_daily_output[0]
         self.output_dict['source_circuit_daily_output'] = source_circuit_daily_output
 
         # Get labor daily output for output circuit wiring:
-
-        output_wiring_labor = output_wiring[output_wiring.Module == 'Output circuit wiring']
-
-        output_circuit_daily_output = output_wiring_labor.loc[
-            output_wiring_labor['Operation ID'] == 'Output circuit wiring', 'Daily output']
-        output_circuit_daily_output = output_circuit_daily_output.iloc[0]
+        output_circuit_daily_output = construction_estimator_index.column(
+            'Daily output', 'Output circuit wiring', operation_id='Output circuit wiring')
+        output_circuit_daily_output = output_circuit_daily_output[0]
         self.output_dict['output_circuit_daily_output'] = output_circuit_daily_output
 
         # Storing data with equipment related inputs:
-        trenching_equipment = cable_trenching[cable_trenching.values == 'Equipment']
+        trenching_equipment = construction_estimator_index.rows('Collection',
+                                                                type_of_cost='Equipment')
         trenching_cable_equipment_usd_per_hr = trenching_equipment['Rate USD per unit'].sum()
 
         self.output_dict['trenching_cable_equipment_usd_per_hr'] = \
@@ -634,13 +683,12 @@ class CollectionCost(CostModule):
             self.output_dict['Equipment Cost USD without weather delays'] * \
             self.output_dict['wind_multiplier']
 
-        trenching_equipment_rental_cost_df = \
-            pd.DataFrame([['Equipment rental',
-                           self.output_dict['Equipment Cost USD with weather delays'],
-                           'Collection']],
-                         columns=['Type of cost',
-                                    'Cost USD',
-                                    'Phase of construction'])
+        # Cost breakdown of collection system:
+        collection_cost = CostLedger()
+
+        collection_cost.add('Equipment rental',
+                            self.output_dict['Equipment Cost USD with weather delays'],
+                            'Collection')
 
         # Calculating trenching labor cost:
         self.output_dict['Days taken for trenching (labor)'] = \
@@ -693,31 +741,15 @@ class CollectionCost(CostModule):
             self.output_dict['Labor Cost USD without weather delays'] * \
             self.output_dict['wind_multiplier']
 
-        trenching_labor_cost_df = pd.DataFrame([['Labor',
-                                                 self.output_dict['Labor Cost USD with weather delays'],
-                                                 'Collection']],
-                                               columns=['Type of cost',
-                                                        'Cost USD',
-                                                        'Phase of construction'])
+        collection_cost.add('Labor',
+                            self.output_dict['Labor Cost USD with weather delays'],
+                            'Collection')
 
         # Calculate cable cost:
-        cable_cost_usd_per_LF_df = pd.DataFrame([['Materials',
-                                                  self.output_dict['total_material_cost'],
-                                                  'Collection']],
-                                                columns=['Type of cost',
-                                                         'Cost USD',
-                                                         'Phase of construction'])
-
-        # Combine all calculated cost items into the 'collection_cost' data frame:
-        collection_cost = pd.DataFrame([], columns=['Type of cost',
-                                                    'Cost USD',
-                                                    'Phase of construction'])
-
-        collection_cost = collection_cost.append(trenching_equipment_rental_cost_df)
-        collection_cost = collection_cost.append(trenching_labor_cost_df)
-        collection_cost = collection_cost.append(cable_cost_usd_per_LF_df)
-
-        # Calculate Mobilization Cost and add to collection_cost data frame:
+        collection_cost.add('Materials', self.output_dict['total_material_cost'],
+                            'Collection')
+
+        # Calculate Mobilization Cost and add to collection_cost:
         equip_material_mobilization_multiplier = \
             0.16161 * (self.input_dict['system_size_MW_DC'] ** (-0.135))
 
@@ -739,16 +771,10 @@ class CollectionCost(CostModule):
                                       equipment_mobilization_USD + \
                                       labor_mobilization_USD
 
-        mobilization_cost = pd.DataFrame([['Mobilization',
-                                           collection_mobilization_usd ,
-                                           'Collection']],
-                                         columns=['Type of cost',
-                                                  'Cost USD',
-                                                  'Phase of construction'])
-        collection_cost = collection_cost.append(mobilization_cost)
+        collection_cost.add('Mobilization', collection_mobilization_usd, 'Collection')
 
-        self.output_dict['total_collection_cost_df'] = collection_cost
-        self.output_dict['total_collection_cost'] = collection_cost['Cost USD'].sum()
+        self.output_dict['total_collection_cost_ledger'] = collection_cost
+        self.output_dict['total_collection_cost'] = collection_cost.total()
 
         return self.output_dict['total_collection_cost']
 
@@ -876,13 +902,18 @@ class CollectionCost(CostModule):
                 if fraction_site_prep_area_regions > 0:
                     regions_list.append(fraction_site_prep_area_regions * 150)
 
-                for region in regions_list:
+                # Regions of the same size have the same collection cost, so each
+                # distinct region size is only run once. Full 150 MW regions are
+                # run first, so the per-region output keys are left holding the
+                # last (fractional) region, as when every region was run:
+                for region, region_count in Counter(regions_list).items():
                     # Should be site_prep_area_acres_mw_dc and not site_prep_area_acres_mw_ac
                     self.input_dict['site_prep_area_acres'] = \
                         self.input_dict['site_prep_area_acres_mw_ac'] * region
 
                     self.run_module_for_150_MW()
-                    total_collection_cost += self.output_dict['total_collection_cost']
+                    total_collection_cost += \
+                        region_count * self.output_dict['total_collection_cost']
 
             else:
                 self.run_module_for_150_MW()
@@ -895,9 +926,7 @@ class CollectionCost(CostModule):
             return 0, 0  # module ran successfully
 
         except Exception as error:
-            traceback.print_exc()
-            print(f"Fail {self.project_name} CollectionCost")
-            self.input_dict['error']['CollectionCost'] = error
+            self.record_error(error)
             return 1, error  # module did not run successfully
 
 
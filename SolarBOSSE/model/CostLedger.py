@@ -0,0 +1,64 @@
+from array import array
+
+import pandas as pd
+
+
+class CostLedger:
+    """
+    Cost breakdown of a cost module, as a list of (type of cost, cost in USD, phase
+    of construction) entries.
+
+    Entries are stored in plain lists and an array of doubles, so building the
+    breakdown and summing it does not allocate any DataFrames. Cost modules store
+    their ledger in the output dictionary (e.g. under 'total_road_cost_ledger').
+    The DataFrame with 'Type of cost', 'Cost USD' and 'Phase of construction'
+    columns, formerly stored under the *_df keys, is only made when to_df() is
+    called.
+    """
+
+    __slots__ = ('types_of_cost', 'costs_usd', 'phases_of_construction')
+
+    columns = ['Type of cost', 'Cost USD', 'Phase of construction']
+
+    def __init__(self):
+        self.types_of_cost = []
+        self.costs_usd = array('d')
+        self.phases_of_construction = []
+
+    def __len__(self):
+        return len(self.costs_usd)
+
+    def add(self, type_of_cost, cost_usd, phase_of_construction):
+        """
+        Adds an entry to the ledger.
+
+        Parameters
+        ----------
+        type_of_cost : str
+            e.g. 'Labor', 'Equipment rental', 'Materials' or 'Mobilization'
+
+        cost_usd : float
+            Cost (in USD)
+
+        phase_of_construction : str
+            Phase of construction (usually the name of the cost module)
+        """
+        self.types_of_cost.append(type_of_cost)
+        self.costs_usd.append(cost_usd)
+        self.phases_of_construction.append(phase_of_construction)
+
+    def total(self):
+        """
+        Returns the sum (in USD) of all the entries. Like DataFrame.sum(), NaN
+        costs are skipped.
+        """
+        return sum(cost_usd for cost_usd in self.costs_usd if cost_usd == cost_usd)
+
+    def to_df(self):
+        """
+        Returns the ledger as a DataFrame with one row per entry.
+        """
+        return pd.DataFrame({'Type of cost': self.types_of_cost,
+                             'Cost USD': self.costs_usd.tolist(),
+                             'Phase of construction': self.phases_of_construction},
+                            columns=self.columns)
@@ -1,13 +1,90 @@
+import functools
+import traceback
+from collections import Counter
+
+from ..excelio.ConstructionEstimatorIndex import ConstructionEstimatorIndex
+from ..TraceHooks import trace_hooks
+
+
+def run_once(phase):
+    """
+    Decorator for the phases of a cost module (e.g. estimate_construction_time())
+    that are needed by more than one other phase of the module.
+
+    The phase runs the first time it is called on a cost module instance. Later
+    calls on the same instance return the result of the first call, which is kept
+    in the instance's PhaseResults. Arguments of later calls are ignored: phases
+    decorated with run_once() must only depend on the module's input and output
+    dictionaries, which are fixed for the lifetime of the instance.
+    """
+    @functools.wraps(phase)
+    def run_phase_once(self, *args, **kwargs):
+        return self.phase_results.get_or_run(phase.__name__,
+                                             lambda: phase(self, *args, **kwargs))
+
+    return run_phase_once
+
+
+class PhaseResults:
+    """
+    Results of the phases of a single cost module instance that are decorated with
+    run_once(), along with the number of times each phase actually ran.
+    """
+
+    def __init__(self):
+        self.results = dict()
+        self.run_counts = Counter()
+
+    def get_or_run(self, phase_name, run_phase):
+        """
+        Returns the result of phase_name, calling run_phase() to compute it if the
+        phase has not run yet.
+        """
+        if phase_name not in self.results:
+            self.results[phase_name] = run_phase()
+            self.run_counts[phase_name] += 1
+
+        return self.results[phase_name]
+
+    def clear(self):
+        """
+        Forgets the results of all phases, so they run again on their next call.
+        """
+        self.results.clear()
+
+
 class CostModule:
     """
     This is a super class for all other cost modules to import
     that provides shared pre-processed data.
+
+    Each cost module declares the keys it reads and writes, which Manager uses
+    to find the dependencies between modules (see Manager.dependency_graph()):
+
+    input_keys
+        Keys the module reads, from the input dictionary or from the outputs
+        of other modules. Keys derived from the input dictionary by
+        CostModule.__init__() (such as system_size_MW_AC) are not listed.
+
+    output_keys
+        Keys the module writes to the output dictionary.
+
+    total_cost_key
+        Output key holding the module's total cost, which Manager adds to
+        total_bos_cost_before_mgmt. None if the module's cost is not part of
+        that total (e.g. ManagementCost).
     """
 
+    input_keys = ('system_size_MW_DC', 'dc_ac_ratio', 'switchyard_y_n',
+                  'site_prep_area_acres_mw_ac')
+    output_keys = ()
+    total_cost_key = None
+
     def __init__(self, input_dict, output_dict, project_name):
         self.input_dict = input_dict
         self.output_dict = output_dict
         self.project_name = project_name
+        self.phase_results = PhaseResults()
 
         self.input_dict['system_size_MW_AC'] = \
             self.input_dict['system_size_MW_DC'] / self.input_dict['dc_ac_ratio']
@@ -33,3 +110,34 @@ class CostModule:
         # 1 acre = 4046.86 m2:
         self.input_dict['site_prep_area_m2'] = \
             self.input_dict['site_prep_area_acres'] * 4046.86
+
+    def construction_estimator_index(self):
+        """
+        Returns the ConstructionEstimatorIndex of input_dict['construction_estimator'].
+
+        The index is normally built by XlsxReader when the project data is read.
+        If the input dictionary holds no index for its construction_estimator
+        dataframe (e.g. because the dataframe was replaced), one is built and
+        stored in the input dictionary.
+        """
+        index = self.input_dict.get('construction_estimator_index')
+        if index is None or \
+                index.construction_estimator is not self.input_dict['construction_estimator']:
+            index = ConstructionEstimatorIndex(self.input_dict['construction_estimator'])
+            self.input_dict['construction_estimator_index'] = index
+
+        return index
+
+    def record_error(self, error):
+        """
+        Records error (raised while running the module) in input_dict['error']
+        under the name of the module, and emits a module_error event to
+        trace_hooks. Called by run_module() from its exception handler.
+        """
+        module_name = type(self).__name__
+        self.input_dict['error'][module_name] = error
+
+        if trace_hooks.enabled:
+            trace_hooks.emit('module_error', module=module_name,
+                             project=self.project_name, error=repr(error),
+                             traceback=traceback.format_exc())
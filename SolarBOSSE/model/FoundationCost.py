@@ -1,8 +1,8 @@
-import traceback
 import math
 import pandas as pd
 import numpy as np
 from .CostModule import CostModule
+from .CostLedger import CostLedger
 
 class FoundationCost(CostModule):
     """
@@ -174,6 +174,26 @@ class FoundationCost(CostModule):
         4. Mobilization
     """
 
+    # Keys read and written by this module (see CostModule):
+    input_keys = CostModule.input_keys + ('concrete_pad_depth_inches',
+                                        'concrete_pad_excavation_depth_inches',
+                                        'concrete_pad_length_inches',
+                                        'concrete_pad_width_inches',
+                                        'construction_estimator',
+                                        'construction_estimator_per_diem',
+                                        'construction_time_months', 'inverter_rating_kW',
+                                        'material_price', 'overtime_multiplier')
+    output_keys = ('concrete_pad_volume_inch3', 'concrete_pad_volume_m3',
+                   'excavated_volume_m3', 'foundation_construction_months',
+                   'foundation_volume_concrete_m3_per_pad', 'labor_equip_data',
+                   'managament_crew_cost_before_wind_delay',
+                   'material_needs_entire_farm', 'material_needs_per_pad',
+                   'number_concrete_pads', 'operation_data_entire_farm',
+                   'operation_data_id_days_crews_workers',
+                   'steel_mass_short_ton_per_pad', 'total_foundation_cost',
+                   'total_foundation_cost_ledger')
+    total_cost_key = 'total_foundation_cost'
+
     def __init__(self, input_dict, output_dict, project_name):
         """
         Parameters
@@ -332,7 +352,7 @@ class FoundationCost(CostModule):
         # Assuming construction of transformer & inverter pads takes 20% of total
         # project time
         foundation_construction_time = input_data['construction_time_months'] * 0.2
-        throughput_operations = input_data['construction_estimator']
+        construction_estimator_index = self.construction_estimator_index()
         material_needs_per_pad = output_data['material_needs_per_pad']
 
         quantity_materials_entire_farm = \
@@ -346,8 +366,7 @@ class FoundationCost(CostModule):
         material_needs_entire_farm['Quantity of material'] = \
             quantity_materials_entire_farm
 
-        operation_data = throughput_operations.where(
-            throughput_operations['Module'] == 'Foundations').dropna(thresh=4)
+        operation_data = construction_estimator_index.operations('Foundations')
 
         # operation data for entire solar farm:
         operation_data = pd.merge(material_needs_entire_farm,
@@ -458,12 +477,10 @@ class FoundationCost(CostModule):
 
         self.output_dict['labor_equip_data'] = labor_equip_data
 
-        # Create foundation cost data frame
-        foundation_cost = pd.DataFrame(columns=['Type of cost',
-                                                'Cost USD',
-                                                'Phase of construction'])
+        # Cost breakdown of foundations:
+        foundation_cost = CostLedger()
 
-        # Create equipment costs row to be appended to foundation_cost
+        # Equipment costs entry of foundation_cost
         equipment_dataframe = \
             labor_equip_data[labor_equip_data['Type of cost'].str.match('Equipment rental')]
 
@@ -473,14 +490,10 @@ class FoundationCost(CostModule):
 
         equipment_cost_usd_with_weather_delays = equipment_cost_usd_without_delay.sum()
 
-        equipment_costs = pd.DataFrame([['Equipment rental',
-                                         equipment_cost_usd_with_weather_delays,
-                                         'Foundation']],
-                                       columns=['Type of cost',
-                                                'Cost USD',
-                                                'Phase of construction'])
+        foundation_cost.add('Equipment rental', equipment_cost_usd_with_weather_delays,
+                            'Foundation')
 
-        # Create labor costs row to be appended to foundation_cost
+        # Labor costs entry of foundation_cost
         labor_dataframe = \
             labor_equip_data[labor_equip_data['Type of cost'].str.match('Labor')]
 
@@ -491,12 +504,7 @@ class FoundationCost(CostModule):
         labor_cost_usd_with_management = labor_cost_usd_without_management.sum() + \
                                          output_data['managament_crew_cost_before_wind_delay']
 
-        labor_costs = pd.DataFrame([['Labor',
-                                     labor_cost_usd_with_management,
-                                     'Foundation']],
-                                   columns=['Type of cost',
-                                            'Cost USD',
-                                            'Phase of construction'])
+        foundation_cost.add('Labor', labor_cost_usd_with_management, 'Foundation')
 
         material_cost_dataframe = pd.DataFrame(columns=['Operation ID',
                                                         'Type of cost',
@@ -508,17 +516,7 @@ class FoundationCost(CostModule):
         material_cost_dataframe['Type of cost'] = 'Materials'
         material_cost_dataframe['Cost USD'] = material_data_entire_farm['Cost USD']
         material_costs_sum = material_cost_dataframe['Cost USD'].sum()
-        material_costs = pd.DataFrame([['Materials',
-                                        material_costs_sum,
-                                        'Foundation']],
-                                      columns=['Type of cost',
-                                               'Cost USD',
-                                               'Phase of construction'])
-
-        # Append all cost items to foundation_cost
-        foundation_cost = foundation_cost.append(equipment_costs)
-        foundation_cost = foundation_cost.append(labor_costs)
-        foundation_cost = foundation_cost.append(material_costs)
+        foundation_cost.add('Materials', material_costs_sum, 'Foundation')
 
         # calculate mobilization cost as percentage of total foundation cost and add to
         # foundation_cost:
@@ -543,13 +541,11 @@ class FoundationCost(CostModule):
                                       labor_mobilization_USD
 
         foundation_mob_cost = foundation_mobilization_usd
-        mob_cost = pd.DataFrame([['Mobilization', foundation_mob_cost, 'Foundation']],
-                                columns=['Type of cost', 'Cost USD', 'Phase of construction'])
-        foundation_cost = foundation_cost.append(mob_cost)
+        foundation_cost.add('Mobilization', foundation_mob_cost, 'Foundation')
 
         total_foundation_cost = foundation_cost
-        output_data['total_foundation_cost_df'] = total_foundation_cost
-        output_data['total_foundation_cost'] = total_foundation_cost['Cost USD'].sum()
+        output_data['total_foundation_cost_ledger'] = total_foundation_cost
+        output_data['total_foundation_cost'] = total_foundation_cost.total()
 
         return total_foundation_cost
 
@@ -595,7 +591,5 @@ class FoundationCost(CostModule):
             return 0, 0   # module ran successfully
 
         except Exception as error:
-            traceback.print_exc()
-            print(f"Fail {self.project_name} FoundationCost")
-            self.input_dict['error']['FoundationCost'] = error
+            self.record_error(error)
             return 1, error    # module did not run successfully
@@ -1,7 +1,6 @@
-import traceback
-import pandas as pd
 import math
 from .CostModule import CostModule
+from .CostLedger import CostLedger
 
 
 class GridConnectionCost(CostModule):
@@ -30,6 +29,14 @@ class GridConnectionCost(CostModule):
 
     """
 
+    # Keys read and written by this module (see CostModule):
+    input_keys = CostModule.input_keys + ('dist_interconnect_mi',
+                                        'grid_size_MW_AC', 'grid_system_size_MW_DC',
+                                        'interconnect_voltage_kV')
+    output_keys = ('array_to_POI_usd_per_kw', 'interconnect_adder_USD',
+                   'total_transdist_cost', 'trans_dist_usd', 'trans_dist_usd_ledger')
+    total_cost_key = 'total_transdist_cost'
+
     def __init__(self, input_dict, output_dict , project_name):
         """
         Parameters
@@ -95,16 +102,13 @@ class GridConnectionCost(CostModule):
             output_dict['trans_dist_usd'] = \
                 input_dict['grid_size_MW_AC'] * 1000 * output_dict['array_to_POI_usd_per_kw']
 
-        output_dict['trans_dist_usd_df'] = pd.DataFrame([['Other',
-                                                          output_dict['trans_dist_usd'],
-                                                          'Transmission and Distribution']],
-                                                        columns=['Type of cost',
-                                                                 'Cost USD',
-                                                                 'Phase of construction'])
+        output_dict['trans_dist_usd_ledger'] = CostLedger()
+        output_dict['trans_dist_usd_ledger'].add('Other', output_dict['trans_dist_usd'],
+                                                 'Transmission and Distribution')
 
-        output_dict['total_transdist_cost'] = output_dict['trans_dist_usd_df']['Cost USD'].sum()
+        output_dict['total_transdist_cost'] = output_dict['trans_dist_usd_ledger'].total()
 
-        return output_dict['trans_dist_usd_df']
+        return output_dict['trans_dist_usd_ledger']
 
     def run_module(self):
         """
@@ -127,7 +131,6 @@ class GridConnectionCost(CostModule):
             self.calculate_costs(self.input_dict, self.output_dict)
             return 0, 0 # module ran successfully
         except Exception as error:
-            traceback.print_exc()
-            print(f"Fail {self.project_name} GridConnectionCost")
+            self.record_error(error)
             return 1, error # module did not run successfully
 
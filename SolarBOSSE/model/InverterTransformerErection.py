@@ -1,7 +1,7 @@
-import traceback
 import pandas as pd
 import math
 from .CostModule import CostModule
+from .CostLedger import CostLedger
 
 
 class InverterTransformerErection(CostModule):
@@ -15,6 +15,14 @@ class InverterTransformerErection(CostModule):
 
     """
 
+    # Keys read and written by this module (see CostModule):
+    input_keys = CostModule.input_keys + ('crew', 'crew_cost', 'equip_price',
+                                        'fuel_cost', 'hour_day', 'inverter_rating_MW',
+                                        'number_concrete_pads')
+    output_keys = ('crane_days_of_operation', 'total_erection_cost',
+                   'total_erection_cost_ledger')
+    total_cost_key = 'total_erection_cost'
+
     def __init__(self, input_dict, output_dict, project_name):
         super(InverterTransformerErection, self).__init__(input_dict, output_dict, project_name)
         self.input_dict = input_dict
@@ -97,75 +105,36 @@ class InverterTransformerErection(CostModule):
         """
 
         """
-        # Initialize total cost data frame
-        total_cost = pd.DataFrame(columns=['Type of cost',
-                                                'Cost USD',
-                                                'Phase of construction'])
+        # Initialize cost breakdown
+        total_cost = CostLedger()
 
         # Get labor cost
         labor_cost = self.crane_crew_cost()
-        labor_cost_df = pd.DataFrame([['Labor',
-                                     labor_cost,
-                                     'InverterTransformerErection']],
-                                   columns=['Type of cost',
-                                            'Cost USD',
-                                            'Phase of construction'])
+        total_cost.add('Labor', labor_cost, 'InverterTransformerErection')
 
         # Get crane rental cost:
         crane_rental_cost = self.crane_rental_cost()
-        crane_rental_cost_df = pd.DataFrame([['Equipment Rental',
-                                              crane_rental_cost,
-                                              'InverterTransformerErection']],
-                                            columns=['Type of cost',
-                                                     'Cost USD',
-                                                     'Phase of construction'])
+        total_cost.add('Equipment Rental', crane_rental_cost, 'InverterTransformerErection')
 
         # Get any associated material costs:
         material_cost = 0
-        material_cost_df = pd.DataFrame([['Material',
-                                              material_cost,
-                                              'InverterTransformerErection']],
-                                            columns=['Type of cost',
-                                                     'Cost USD',
-                                                     'Phase of construction'])
+        total_cost.add('Material', material_cost, 'InverterTransformerErection')
 
         # Get fuel consumption cost:
         crane_fuel_cost = self.crane_fuel_cost()
-        crane_fuel_cost_df = pd.DataFrame([['Fuel',
-                                              crane_fuel_cost,
-                                              'InverterTransformerErection']],
-                                            columns=['Type of cost',
-                                                     'Cost USD',
-                                                     'Phase of construction'])
+        total_cost.add('Fuel', crane_fuel_cost, 'InverterTransformerErection')
 
         # Get any associated other costs:
         other_cost = 0
-        other_cost_df = pd.DataFrame([['Other',
-                                              other_cost,
-                                              'InverterTransformerErection']],
-                                            columns=['Type of cost',
-                                                     'Cost USD',
-                                                     'Phase of construction'])
+        total_cost.add('Other', other_cost, 'InverterTransformerErection')
 
         # Get mobilization + demobilization cost:
 
         mob_cost = self.mobilization_cost()
-        mob_cost_df = pd.DataFrame([['Mobilization',
-                                     mob_cost,
-                                     'InverterTransformerErection']],
-                                   columns=['Type of cost',
-                                            'Cost USD',
-                                            'Phase of construction'])
-
-        total_cost = total_cost.append(labor_cost_df)
-        total_cost = total_cost.append(crane_rental_cost_df)
-        total_cost = total_cost.append(material_cost_df)
-        total_cost = total_cost.append(crane_fuel_cost_df)
-        total_cost = total_cost.append(other_cost_df)
-        total_cost = total_cost.append(mob_cost_df)
-
-        self.output_dict['total_erection_cost_df'] = total_cost
-        self.output_dict['total_erection_cost'] = total_cost['Cost USD'].sum()
+        total_cost.add('Mobilization', mob_cost, 'InverterTransformerErection')
+
+        self.output_dict['total_erection_cost_ledger'] = total_cost
+        self.output_dict['total_erection_cost'] = total_cost.total()
 
     def run_module(self):
         """
@@ -177,7 +146,5 @@ class InverterTransformerErection(CostModule):
             return 0, 0   # module ran successfully
 
         except Exception as error:
-            traceback.print_exc()
-            print(f"Fail {self.project_name} InverterTransformerErection")
-            self.input_dict['error']['InverterTransformerErection'] = error
+            self.record_error(error)
             return 1, error    # module did not run successfully
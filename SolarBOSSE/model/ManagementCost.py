@@ -1,7 +1,5 @@
 import math
-import traceback
 import pytest
-import traceback
 from .CostModule import CostModule
 
 
@@ -16,6 +14,11 @@ class ManagementCost(CostModule):
 
     """
 
+    # Keys read and written by this module (see CostModule):
+    input_keys = CostModule.input_keys + ('total_bos_cost_before_mgmt',)
+    output_keys = ('bonding_usd', 'contingency_cost', 'development_overhead_cost',
+                   'epc_developer_profit', 'total_management_cost', 'total_sales_tax')
+
     def __init__(self, input_dict, output_dict, project_name):
         """
         This method runs all cost calculations in the model based on the
@@ -126,7 +129,5 @@ class ManagementCost(CostModule):
 
             return 0, 0    # module ran successfully
         except Exception as error:
-            traceback.print_exc()
-            print(f"Fail {self.project_name} ManagementCost")
-            self.input_dict['error']['ManagementCost'] = error
+            self.record_error(error)
             return 1, error  # module did not run successfully
@@ -1,3 +1,9 @@
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+
+from ..PipelineStats import pipeline_stats
+from ..excelio.ConstructionEstimatorIndex import ConstructionEstimatorIndex
 from .RackingSystemInstallation import RackingSystemInstallation
 from .SitePreparationCost import SitePreparationCost
 from .SubstationCost import SubstationCost
@@ -8,87 +14,465 @@ from .InverterTransformerErection import InverterTransformerErection
 from .CollectionCost import CollectionCost
 
 
+class ManagerStep:
+    """
+    A step run by Manager: a cost module, or a sum of the costs written by other
+    steps. Like cost modules, steps declare the keys they read and write.
+    """
+
+    def __init__(self, name, input_keys, output_keys, run):
+        """
+        Parameters
+        ----------
+        name : str
+            Name of the step (the name of the cost module class for cost
+            modules).
+
+        input_keys : tuple
+            Keys the step reads, from the input dictionary or from the outputs
+            of other steps.
+
+        output_keys : tuple
+            Keys the step writes to the output dictionary.
+
+        run : callable
+            Runs the step, when called with the input and output dictionaries.
+        """
+        self.name = name
+        self.input_keys = tuple(input_keys)
+        self.output_keys = tuple(output_keys)
+        self.run = run
+
+    @classmethod
+    def cost_module(cls, cost_module_class, project_name):
+        """
+        Returns the step running a cost module class.
+        """
+        stage_name = 'solarbosse.module.' + cost_module_class.__name__
+
+        def run(input_dict, output_dict):
+            with pipeline_stats.stage(stage_name):
+                cost_module = cost_module_class(input_dict=input_dict,
+                                                output_dict=output_dict,
+                                                project_name=project_name)
+                cost_module.run_module()
+
+        return cls(cost_module_class.__name__, cost_module_class.input_keys,
+                   cost_module_class.output_keys, run)
+
+    @classmethod
+    def cost_sum(cls, output_key, cost_keys):
+        """
+        Returns the step writing the sum of the costs under cost_keys to
+        output_key.
+        """
+        def run(input_dict, output_dict):
+            total = output_dict[cost_keys[0]]
+            for cost_key in cost_keys[1:]:
+                total = total + output_dict[cost_key]
+            output_dict[output_key] = total
+
+        return cls(output_key, cost_keys, (output_key,), run)
+
+
+class RecordingDict(dict):
+    """
+    A copy of a dictionary that records the keys read from it (along with the
+    values they had) before being written, and the keys written to it.
+
+    Reads through [], get() and the in operator are recorded. Keys that were
+    missing when read are recorded with the value RecordingDict.missing.
+    """
+
+    missing = object()
+
+    def __init__(self, dictionary):
+        super().__init__(dictionary)
+        self.reads = dict()
+        self.written_keys = set()
+
+    def __getitem__(self, key):
+        self._record_read(key)
+        return super().__getitem__(key)
+
+    def __contains__(self, key):
+        self._record_read(key)
+        return super().__contains__(key)
+
+    def __setitem__(self, key, value):
+        self.written_keys.add(key)
+        super().__setitem__(key, value)
+
+    def get(self, key, default=None):
+        self._record_read(key)
+        return super().get(key, default)
+
+    def writes(self):
+        """
+        Returns the keys written to the dictionary, with their values.
+        """
+        return {key: dict.__getitem__(self, key) for key in self.written_keys}
+
+    def _record_read(self, key):
+        if key not in self.written_keys and key not in self.reads:
+            self.reads[key] = dict.get(self, key, self.missing)
+
+
+class StepRecord:
+    """
+    What a step read and wrote the last time it ran: the values of the keys it
+    read from the input and output dictionaries (before writing them), and the
+    values it wrote to them.
+    """
+
+    def __init__(self, input_reads, output_reads, input_writes, output_writes):
+        self.input_reads = input_reads
+        self.output_reads = output_reads
+        self.input_writes = input_writes
+        self.output_writes = output_writes
+
+    def unchanged(self, input_dict, output_dict):
+        """
+        Returns True if all the keys the step read still have the same values
+        in input_dict and output_dict.
+        """
+        return all(self._same_value(dictionary.get(key, RecordingDict.missing), value)
+                   for reads, dictionary in [(self.input_reads, input_dict),
+                                             (self.output_reads, output_dict)]
+                   for key, value in reads.items())
+
+    @staticmethod
+    def _same_value(value, recorded_value):
+        """
+        Values are the same if they are the same object, or if they are equal
+        scalars. Other objects (e.g. dataframes) that are not the recorded object
+        are assumed to have changed.
+        """
+        if value is recorded_value:
+            return True
+        try:
+            equal = value == recorded_value
+        except Exception:
+            return False
+        return isinstance(equal, (bool, np.bool_)) and bool(equal)
+
+
 class Manager:
     """
     The Manager class distributes input and output dictionaries among the
     various modules. It maintains the hierarchical dictionary structure.
+
+    The cost modules, and the sums of their costs, are run as steps of a
+    dependency graph built from the keys each step reads and writes (see
+    CostModule and dependency_graph()). Custom cost modules can be run by
+    passing them in cost_modules, and only the steps needed for some outputs can
+    be run by passing those outputs to execute_solarbosse().
+
+    In incremental mode, the Manager records the keys each step read on its
+    last run. When execute_solarbosse() is called again (e.g. after changing
+    dist_interconnect_mi in the input dictionary), only the steps that read
+    keys whose values changed are run again. The other steps write back the
+    values they wrote on their last run. Since the sums of the costs and
+    ManagementCost read the costs written by the cost modules, they run again
+    whenever one of those costs changes.
     """
 
-    def __init__(self, input_dict, output_dict):
+    # Cost modules run by default, in the order they run when run serially:
+    default_cost_modules = [SitePreparationCost,
+                            RackingSystemInstallation,
+                            CollectionCost,
+                            FoundationCost,
+                            InverterTransformerErection,
+                            SubstationCost,
+                            GridConnectionCost,
+                            ManagementCost]
+
+    def __init__(self, input_dict, output_dict, cost_modules=None,
+                 concurrency='serial', max_workers=None, incremental=False):
         """
         This initializer sets up the instance variables of:
 
-        self.cost_modules: A list of cost module instances. Each of the
-            instances must implement the method input_output.
+        self.cost_modules: A list of cost module classes. Each of the
+            classes must declare the keys it reads and writes (see CostModule).
 
         self.input_dict: A placeholder for the inputs dictionary
 
         self.output_dict: A placeholder for the output dictionary
+
+        Parameters
+        ----------
+        cost_modules : list
+            Cost module classes to run. Defaults to default_cost_modules. The
+            total cost (see CostModule.total_cost_key) of every module is added
+            to total_bos_cost_before_mgmt.
+
+        concurrency : str
+            'serial' (the default) runs the steps one after the other, in
+            dependency order, on the shared input and output dictionaries.
+            'thread' runs independent steps concurrently in a thread pool. Each
+            step then runs on its own copies of the dictionaries, which are
+            merged back in the order the steps run serially.
+
+        max_workers : int
+            Number of threads when concurrency is 'thread'.
+
+        incremental : bool
+            If True, execute_solarbosse() only runs the steps whose inputs
+            changed since their last run (see the class docstring). Changes are
+            found by comparing values, so dataframes in the input dictionary
+            must be replaced rather than modified in place. Steps that record
+            an error in input_dict['error'] always run again. Incremental
+            runs are serial.
+
+        self.executed_steps: The names of the steps that ran during the last
+            call to execute_solarbosse(), in the order they ran.
         """
+        if concurrency not in ('serial', 'thread'):
+            raise ValueError("concurrency must be one of 'serial' or 'thread'")
+
+        if incremental and concurrency != 'serial':
+            raise ValueError("incremental runs require concurrency='serial'")
+
         self.input_dict = input_dict
         self.output_dict = output_dict
+        self.cost_modules = list(self.default_cost_modules if cost_modules is None
+                                 else cost_modules)
+        self.concurrency = concurrency
+        self.max_workers = max_workers
+        self.incremental = incremental
+        self.step_records = dict()
+        self.executed_steps = []
+
+    def steps(self, project_name='solar_run'):
+        """
+        Returns the steps of the run, in dependency order (and otherwise in the
+        order of self.cost_modules): the cost modules, the sum of their costs
+        (total_bos_cost_before_mgmt) and the total BOS cost (total_bos_cost).
+        """
+        steps = [ManagerStep.cost_module(cost_module, project_name)
+                 for cost_module in self.cost_modules]
+
+        cost_keys = [cost_module.total_cost_key for cost_module in self.cost_modules
+                     if cost_module.total_cost_key is not None]
+        steps.append(ManagerStep.cost_sum('total_bos_cost_before_mgmt', cost_keys))
+        steps.append(ManagerStep.cost_sum('total_bos_cost',
+                                          ['total_bos_cost_before_mgmt',
+                                           'total_management_cost']))
 
-    def execute_solarbosse(self):
-
-        project_name = 'solar_run'
-
-        # SitePrepCost:
-        siteprep = SitePreparationCost(input_dict=self.input_dict,
-                                       output_dict=self.output_dict,
-                                       project_name=project_name)
-        siteprep.run_module()
-
-        # RackingSystemInstallation:
-        racking_system_installation = RackingSystemInstallation(input_dict=self.input_dict,
-                                                                output_dict=self.output_dict,
-                                                                project_name=project_name)
-        racking_system_installation.run_module()
-
-        collection_system = CollectionCost(input_dict=self.input_dict,
-                                           output_dict=self.output_dict,
-                                           project_name=project_name)
-        collection_system.run_module()
-
-        foundation_cost = FoundationCost(input_dict=self.input_dict,
-                                         output_dict=self.output_dict,
-                                         project_name=project_name)
-        foundation_cost.run_module()
-
-        container_erection = InverterTransformerErection(input_dict=self.input_dict,
-                                                         output_dict=self.output_dict,
-                                                         project_name=project_name)
-        container_erection.run_module()
-
-        # SubstationCost:
-        substationcost = SubstationCost(input_dict=self.input_dict,
-                                        output_dict=self.output_dict,
-                                        project_name=project_name)
-        substationcost.run_module()
-
-        # GridConnectionCost:
-        gridconnection = GridConnectionCost(input_dict=self.input_dict,
-                                            output_dict=self.output_dict,
-                                            project_name=project_name)
-        gridconnection.run_module()
-
-        # Sum all costs
-        self.output_dict['total_bos_cost_before_mgmt'] = \
-            self.output_dict['total_racking_cost_USD'] + \
-            self.output_dict['total_road_cost'] + \
-            self.output_dict['total_substation_cost'] + \
-            self.output_dict['total_transdist_cost'] + \
-            self.output_dict['total_foundation_cost'] + \
-            self.output_dict['total_erection_cost'] + \
-            self.output_dict['total_collection_cost']
-
-        # ManagementCost:
-        managementcost = ManagementCost(input_dict=self.input_dict,
-                                        output_dict=self.output_dict,
-                                        project_name=project_name)
-        managementcost.run_module()
-
-        self.output_dict['total_bos_cost'] = \
-            self.output_dict['total_bos_cost_before_mgmt'] + \
-            self.output_dict['total_management_cost']
+        dependencies = self._dependencies(steps)
+
+        # Stable topological sort: the first step (in declaration order) whose
+        # dependencies have all been sorted comes next.
+        ordered_steps = []
+        ordered_names = set()
+        while len(ordered_steps) < len(steps):
+            for step in steps:
+                if step.name not in ordered_names and \
+                        dependencies[step.name] <= ordered_names:
+                    ordered_steps.append(step)
+                    ordered_names.add(step.name)
+                    break
+            else:
+                raise ValueError('The cost modules have circular dependencies: ' +
+                                 ', '.join(step.name for step in steps
+                                           if step.name not in ordered_names))
+
+        return ordered_steps
+
+    def dependency_graph(self):
+        """
+        Returns the dependency graph of the steps of the run, for inspection.
+
+        Returns
+        -------
+        dict
+            Keys are the names of the steps, in the order they run serially.
+            Values are the (sorted) lists of the names of the steps each step
+            depends on.
+        """
+        steps = self.steps()
+        dependencies = self._dependencies(steps)
+        return {step.name: sorted(dependencies[step.name]) for step in steps}
+
+    def execute_solarbosse(self, outputs=None, project_name='solar_run'):
+        """
+        Runs the cost modules and sums their costs.
+
+        Parameters
+        ----------
+        outputs : list
+            Output keys that are needed. Only the steps writing them, and the
+            steps those depend on, are run. Defaults to running all the steps.
+
+        project_name : str
+            Name of the project, used in error messages.
+
+        Returns
+        -------
+        dict
+            The output dictionary.
+        """
+        steps = self.steps(project_name)
+
+        if outputs is not None:
+            steps = self._required_steps(steps, outputs)
+
+        if self.incremental:
+            self._execute_incrementally(steps)
+        elif self.concurrency == 'thread':
+            self._execute_concurrently(steps)
+            self.executed_steps = [step.name for step in steps]
+        else:
+            for step in steps:
+                step.run(self.input_dict, self.output_dict)
+            self.executed_steps = [step.name for step in steps]
 
         return self.output_dict
+
+    @staticmethod
+    def _dependencies(steps):
+        """
+        Returns the names of the steps each step depends on: the other steps that
+        write keys it reads.
+        """
+        writers = dict()
+        for step in steps:
+            for output_key in step.output_keys:
+                writers.setdefault(output_key, []).append(step.name)
+
+        return {step.name: {writer for input_key in step.input_keys
+                            for writer in writers.get(input_key, [])
+                            if writer != step.name}
+                for step in steps}
+
+    def _required_steps(self, steps, outputs):
+        """
+        Returns the steps (in the order of steps) needed to write outputs.
+        """
+        dependencies = self._dependencies(steps)
+        writers = dict()
+        for step in steps:
+            for output_key in step.output_keys:
+                writers.setdefault(output_key, []).append(step.name)
+
+        required = set()
+        for output_key in outputs:
+            if output_key not in writers:
+                raise ValueError(f'No cost module writes the output {output_key}')
+            to_visit = list(writers[output_key])
+            while to_visit:
+                name = to_visit.pop()
+                if name not in required:
+                    required.add(name)
+                    to_visit.extend(dependencies[name])
+
+        return [step for step in steps if step.name in required]
+
+    def _execute_concurrently(self, steps):
+        """
+        Runs steps in a thread pool, each as soon as the steps it depends on are
+        done.
+
+        Each step runs on a shallow copy of the input dictionary (sharing its
+        'error' dictionary), and on an output dictionary holding the outputs of
+        the steps it depends on, so that steps writing the same keys cannot
+        overwrite each other's values while they run. Once all the steps are
+        done, their inputs and outputs are merged into self.input_dict and
+        self.output_dict in the order of steps, as if they had run serially.
+        """
+        dependencies = self._dependencies(steps)
+        step_names = [step.name for step in steps]
+        step_inputs = dict()
+        step_outputs = dict()
+
+        def run_step(step):
+            step_input_dict = dict(self.input_dict)
+            step_output_dict = dict(self.output_dict)
+            for name in step_names:
+                if name in dependencies[step.name]:
+                    step_output_dict.update(step_outputs[name])
+            initial_outputs = dict(step_output_dict)
+
+            step.run(step_input_dict, step_output_dict)
+
+            # Keep the outputs written by the step:
+            written_outputs = {key: value for key, value in step_output_dict.items()
+                               if key not in initial_outputs or
+                               value is not initial_outputs[key]}
+            return step_input_dict, written_outputs
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = dict()
+            done_names = set()
+            while len(done_names) < len(steps):
+                for step in steps:
+                    if step.name not in done_names and \
+                            step not in running.values() and \
+                            dependencies[step.name] <= done_names:
+                        running[executor.submit(run_step, step)] = step
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    step = running.pop(future)
+                    step_inputs[step.name], step_outputs[step.name] = future.result()
+                    done_names.add(step.name)
+
+        for name in step_names:
+            self.input_dict.update(step_inputs[name])
+            self.output_dict.update(step_outputs[name])
+
+    def _execute_incrementally(self, steps):
+        """
+        Runs the steps whose inputs changed since their last run, recording what
+        they read and wrote, and writes back the last values written by the
+        other steps.
+        """
+        # Build the construction estimator index (see
+        # CostModule.construction_estimator_index()) before any step runs, so
+        # that the first step reading it does not record it as missing, and
+        # is not rerun once the index exists:
+        construction_estimator = self.input_dict.get('construction_estimator')
+        index = self.input_dict.get('construction_estimator_index')
+        if construction_estimator is not None and \
+                (index is None or index.construction_estimator is not construction_estimator):
+            self.input_dict['construction_estimator_index'] = \
+                ConstructionEstimatorIndex(construction_estimator)
+
+        self.executed_steps = []
+        for step in steps:
+            record = self.step_records.get(step.name)
+            if record is not None and record.unchanged(self.input_dict, self.output_dict):
+                self.input_dict.update(record.input_writes)
+                self.output_dict.update(record.output_writes)
+            else:
+                self.step_records[step.name] = self._run_recorded(step)
+                self.executed_steps.append(step.name)
+
+    def _run_recorded(self, step):
+        """
+        Runs step on recording copies of the input and output dictionaries, and
+        copies what it wrote back into self.input_dict and self.output_dict.
+
+        Returns the StepRecord of the run, or None if the step recorded an error.
+        """
+        errors = self.input_dict.get('error')
+        initial_errors = dict(errors) if errors is not None else None
+
+        step_input_dict = RecordingDict(self.input_dict)
+        step_output_dict = RecordingDict(self.output_dict)
+        step.run(step_input_dict, step_output_dict)
+
+        input_writes = step_input_dict.writes()
+        output_writes = step_output_dict.writes()
+        self.input_dict.update(input_writes)
+        self.output_dict.update(output_writes)
+
+        if errors is not None and errors != initial_errors:
+            return None
+
+        # The error dictionary is where steps report errors, not an input:
+        input_reads = dict(step_input_dict.reads)
+        input_reads.pop('error', None)
+
+        return StepRecord(input_reads, step_output_dict.reads,
+                          input_writes, output_writes)
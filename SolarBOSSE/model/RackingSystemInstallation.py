@@ -1,8 +1,8 @@
-import traceback
 import pandas as pd
 import math
 import numpy as np
-from .CostModule import CostModule
+from .CostModule import CostModule, run_once
+from .CostLedger import CostLedger
 
 
 class RackingSystemInstallation(CostModule):
@@ -19,6 +19,19 @@ class RackingSystemInstallation(CostModule):
     5. String testing
 
     """
+    # Keys read and written by this module (see CostModule):
+    input_keys = CostModule.input_keys + ('construction_estimator',
+                                        'construction_estimator_per_diem',
+                                        'construction_time_months', 'foundation_hole_ft',
+                                        'module_rating_W', 'overtime_multiplier',
+                                        'solar_BOM')
+    output_keys = ('installation_time', 'management_crew_cost', 'material_needs',
+                   'operation_data', 'racking_cost_USD_watt', 'rating_per_table_watts',
+                   'total_foundation_holes', 'total_foundation_length_LF',
+                   'total_racking_cost_USD', 'total_racking_cost_ledger',
+                   'total_racking_material_cost_USD')
+    total_cost_key = 'total_racking_cost_USD'
+
     def __init__(self, input_dict, output_dict, project_name):
         super(RackingSystemInstallation, self).__init__(input_dict, output_dict, project_name)
         self.input_dict = input_dict
@@ -88,6 +101,7 @@ class RackingSystemInstallation(CostModule):
         self.output_dict['total_foundation_length_LF'] = total_foundation_length_LF
         return total_foundation_length_LF
 
+    @run_once
     def estimate_construction_time(self):
         """
         Estimates construction time of roads for entire project.
@@ -125,15 +139,14 @@ class RackingSystemInstallation(CostModule):
             - Cost of labor and equipment rental prior to weather delays
 
         """
-        throughput_operations = self.input_dict['construction_estimator']
+        construction_estimator_index = self.construction_estimator_index()
 
         # assumes road construction occurs for 60% of project time
         self.output_dict['installation_time'] = \
             self.input_dict['construction_time_months'] * 0.6
 
-        operation_data = throughput_operations.where(
-            throughput_operations['Module'] == 'Racking System Installation').\
-            dropna(thresh=4)
+        operation_data = construction_estimator_index.operations(
+            'Racking System Installation')
 
         # create list of unique material units for operations
         list_units = operation_data['Units'].unique()
@@ -146,13 +159,11 @@ class RackingSystemInstallation(CostModule):
 
         # Here material needs is equivalent to saying cumulative length of
         # foundation holes that need to be drilled:
-        material_needs = pd.DataFrame(columns=['Units', 'Quantity of material'])
-        for unit in list_units:
-            unit_quantity = pd.DataFrame([[unit, total_foundation_length_LF_dict[unit]]],
-                                         columns=['Units', 'Quantity of material'])
-            material_needs = material_needs.append(unit_quantity)
-
-        material_needs = material_needs.reset_index(drop=True)
+        material_needs = pd.DataFrame(
+            {'Units': list_units,
+             'Quantity of material': [total_foundation_length_LF_dict[unit]
+                                      for unit in list_units]},
+            columns=['Units', 'Quantity of material'])
         self.output_dict['material_needs'] = material_needs
 
         # join material needs with operational data to compute costs
@@ -213,8 +224,8 @@ class RackingSystemInstallation(CostModule):
         Returns
         ----------
 
-        pd.DataFrame total_road_cost
-            Dataframe containing following calculated outputs (after weather delay
+        CostLedger total_racking_cost
+            Cost breakdown with the following calculated outputs (after weather delay
             considerations):
 
             - Total labor cost
@@ -231,12 +242,11 @@ class RackingSystemInstallation(CostModule):
         """
         construction_estimator = self.input_dict['construction_estimator']
 
-        material_costs = pd.DataFrame([['Materials',
-                                        self.output_dict['total_racking_material_cost_USD'],
-                                        'Racking System Installation']],
-                                      columns=['Type of cost',
-                                               'Cost USD',
-                                               'Phase of construction'])
+        # Cost breakdown of racking system installation:
+        racking_cost = CostLedger()
+
+        racking_cost.add('Materials', self.output_dict['total_racking_material_cost_USD'],
+                         'Racking System Installation')
 
         operation_data = self.estimate_construction_time()
 
@@ -270,12 +280,7 @@ class RackingSystemInstallation(CostModule):
 
         labor_racking_installation = labor_data['Cost USD'].sum() + \
                                          self.output_dict['management_crew_cost']
-        labor_costs = pd.DataFrame([['Labor',
-                                     float(labor_racking_installation),
-                                     'Racking System Installation']],
-                                   columns=['Type of cost',
-                                            'Cost USD',
-                                            'Phase of construction'])
+        labor_costs = float(labor_racking_installation)
 
         # Filter out equipment costs from construction_estimator tab:
         equipment_data = labor_equip_data[
@@ -289,31 +294,13 @@ class RackingSystemInstallation(CostModule):
 
         equip_racking_installation = equipment_data['Cost USD'].sum()
 
-        equipment_costs = pd.DataFrame([['Equipment rental',
-                                         float(equip_racking_installation),
-                                         'Racking System Installation']],
-                                       columns=['Type of cost',
-                                                'Cost USD',
-                                                'Phase of construction'])
-
-        # Create empty road cost (showing cost breakdown by type) dataframe:
-        racking_cost = pd.DataFrame(columns=['Type of cost',
-                                          'Cost USD',
-                                          'Phase of construction'])
+        racking_cost.add('Equipment rental', float(equip_racking_installation),
+                         'Racking System Installation')
+        racking_cost.add('Labor', labor_costs, 'Racking System Installation')
 
         # Place holder for any other costs not captured in the processes so far
         cost_adder = 0
-        additional_costs = pd.DataFrame([['Other',
-                                          float(cost_adder),
-                                          'Racking System Installation']],
-                                        columns=['Type of cost',
-                                                 'Cost USD',
-                                                 'Phase of construction'])
-
-        racking_cost = racking_cost.append(material_costs)
-        racking_cost = racking_cost.append(equipment_costs)
-        racking_cost = racking_cost.append(labor_costs)
-        racking_cost = racking_cost.append(additional_costs)
+        racking_cost.add('Other', float(cost_adder), 'Racking System Installation')
 
         # Calculate mobilization costs:
         # TODO: convert to user input:
@@ -337,17 +324,12 @@ class RackingSystemInstallation(CostModule):
                                     equipment_mobilization_USD + \
                                     labor_mobilization_USD
 
-        mobilization_costs = pd.DataFrame([['Mobilization',
-                                            racking_mobilization_usd,
-                                            'Racking System Installation']],
-                                          columns=['Type of cost',
-                                                   'Cost USD',
-                                                   'Phase of construction'])
+        racking_cost.add('Mobilization', racking_mobilization_usd,
+                         'Racking System Installation')
 
-        racking_cost = racking_cost.append(mobilization_costs)
         total_racking_cost = racking_cost
-        self.output_dict['total_racking_cost_df'] = total_racking_cost
-        self.output_dict['total_racking_cost_USD'] = total_racking_cost['Cost USD'].sum()
+        self.output_dict['total_racking_cost_ledger'] = total_racking_cost
+        self.output_dict['total_racking_cost_USD'] = total_racking_cost.total()
         return total_racking_cost
 
     def run_module(self):
@@ -367,6 +349,5 @@ class RackingSystemInstallation(CostModule):
             return self.output_dict
 
         except Exception as error:
-            traceback.print_exc()
-            print(f"Fail {self.project_name} RackingSystemInstallation")
+            self.record_error(error)
             return 1, error # module did not run successfully
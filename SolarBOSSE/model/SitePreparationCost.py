@@ -1,8 +1,8 @@
 import pandas as pd
 import numpy as np
 import math
-import traceback
-from .CostModule import CostModule
+from .CostModule import CostModule, run_once
+from .CostLedger import CostLedger
 
 
 # TODO: Add implementation of road quality
@@ -130,6 +130,22 @@ class SitePreparationCost(CostModule):
 
     """
 
+    # Keys read and written by this module (see CostModule):
+    input_keys = CostModule.input_keys + ('construction_estimator',
+                                        'construction_estimator_per_diem',
+                                        'construction_time_months', 'crane_width',
+                                        'crew', 'crew_cost', 'hour_day', 'material_price',
+                                        'overtime_multiplier', 'road_thickness_in',
+                                        'road_width_ft')
+    output_keys = ('crane_path_width_m', 'depth_to_subgrade_m',
+                   'embankment_volume_crane', 'embankment_volume_road',
+                   'management_crew', 'management_crew_cost', 'material_needs',
+                   'material_volume_cubic_yards', 'operation_data',
+                   'road_construction_time', 'road_thickness_m', 'road_volume',
+                   'road_volume_m3', 'road_width_m', 'rough_grading_area',
+                   'topsoil_volume', 'total_road_cost', 'total_road_cost_ledger')
+    total_cost_key = 'total_road_cost'
+
     def __init__(self, input_dict, output_dict, project_name):
         """
         Parameters
@@ -232,6 +248,7 @@ class SitePreparationCost(CostModule):
 
         return output_dict
 
+    @run_once
     def estimate_construction_time(self, input_dict, output_dict):
         """
         Estimates construction time of roads for entire project.
@@ -269,15 +286,15 @@ class SitePreparationCost(CostModule):
             - Cost of labor and equipment rental prior to weather delays
 
         """
-        throughput_operations = input_dict['construction_estimator']
+        construction_estimator_index = self.construction_estimator_index()
         # assumes road construction occurs for 20% of project time
         # TODO: Find new multiplier to replace 20%
         output_dict['road_construction_time'] = input_dict['construction_time_months'] * 0.20
 
         # Main switch between small DW wind and (utility scale + distributed wind)
         # select operations for roads module that have data
-        operation_data = throughput_operations.where(
-            throughput_operations['Module'] == 'Inter-array roads (Solar)').dropna(thresh=4)
+        operation_data = construction_estimator_index.operations(
+            'Inter-array roads (Solar)')
 
         # create list of unique material units for operations
         list_units = operation_data['Units'].unique()
@@ -309,13 +326,10 @@ class SitePreparationCost(CostModule):
             'loose cubic yard': output_dict['material_volume_cubic_yards'],
             'Each (100000 square feet)': output_dict['rough_grading_area']}
 
-        material_needs = pd.DataFrame(columns=['Units', 'Quantity of material'])
-        for unit in list_units:
-            unit_quantity = pd.DataFrame([[unit, material_quantity_dict[unit]]],
-                                         columns=['Units', 'Quantity of material'])
-            material_needs = material_needs.append(unit_quantity)
-
-        material_needs = material_needs.reset_index(drop=True)
+        material_needs = pd.DataFrame(
+            {'Units': list_units,
+             'Quantity of material': [material_quantity_dict[unit] for unit in list_units]},
+            columns=['Units', 'Quantity of material'])
         output_dict['material_needs'] = material_needs
 
         # join material needs with operational data to compute costs
@@ -398,8 +412,8 @@ class SitePreparationCost(CostModule):
         Returns
         ----------
 
-        pd.DataFrame total_road_cost
-            Dataframe containing following calculated outputs (after weather delay
+        CostLedger total_road_cost
+            Cost breakdown with the following calculated outputs (after weather delay
             considerations):
 
             - Total labor cost
@@ -416,8 +430,8 @@ class SitePreparationCost(CostModule):
         """
         construction_estimator = input_dict['construction_estimator']
 
-        material_name = construction_estimator['Material type ID'].\
-            where(construction_estimator['Module'] == 'Inter-array roads (Solar)').dropna().unique()
+        material_name = self.construction_estimator_index().\
+            rows('Inter-array roads (Solar)')['Material type ID'].dropna().unique()
 
         material_vol = pd.DataFrame([[material_name[0],
                                       output_dict['material_volume_cubic_yards'],
@@ -437,12 +451,11 @@ class SitePreparationCost(CostModule):
         material_cost_of_roads = material_data['Quantity of material'].iloc[0] * \
                     pd.to_numeric(material_data['Material price USD per unit'].iloc[0])
 
-        material_costs = pd.DataFrame([['Materials',
-                                        float(material_cost_of_roads),
-                                        'Inter-array roads (Solar)']],
-                                      columns=['Type of cost',
-                                               'Cost USD',
-                                               'Phase of construction'])
+        # Cost breakdown of roads:
+        road_cost = CostLedger()
+
+        road_cost.add('Materials', float(material_cost_of_roads),
+                      'Inter-array roads (Solar)')
 
         operation_data = self.estimate_construction_time(input_dict, output_dict)
 
@@ -473,12 +486,7 @@ class SitePreparationCost(CostModule):
 
         labor_for_inner_roads_cost_usd = labor_data['Cost USD'].sum() + \
                                          output_dict['management_crew_cost']
-        labor_costs = pd.DataFrame([['Labor',
-                                     float(labor_for_inner_roads_cost_usd),
-                                     'Inter-array roads (Solar)']],
-                                   columns=['Type of cost',
-                                            'Cost USD',
-                                            'Phase of construction'])
+        labor_costs = float(labor_for_inner_roads_cost_usd)
 
         # Filter out equipment costs from construction_estimator tab:
         equipment_data = labor_equip_data[
@@ -492,31 +500,13 @@ class SitePreparationCost(CostModule):
 
         equip_for_new_roads_cost_usd = equipment_data['Cost USD'].sum()
 
-        equipment_costs = pd.DataFrame([['Equipment rental',
-                                         float(equip_for_new_roads_cost_usd),
-                                         'Inter-array roads (Solar)']],
-                                       columns=['Type of cost',
-                                                'Cost USD',
-                                                'Phase of construction'])
-
-        # Create empty road cost (showing cost breakdown by type) dataframe:
-        road_cost = pd.DataFrame(columns=['Type of cost',
-                                          'Cost USD',
-                                          'Phase of construction'])
+        road_cost.add('Equipment rental', float(equip_for_new_roads_cost_usd),
+                      'Inter-array roads (Solar)')
+        road_cost.add('Labor', labor_costs, 'Inter-array roads (Solar)')
 
         # Place holder for any other costs not captured in the processes so far
         cost_adder = 0
-        additional_costs = pd.DataFrame([['Other',
-                                          float(cost_adder),
-                                          'Inter-array roads (Solar)']],
-                                        columns=['Type of cost',
-                                                 'Cost USD',
-                                                 'Phase of construction'])
-
-        road_cost = road_cost.append(material_costs)
-        road_cost = road_cost.append(equipment_costs)
-        road_cost = road_cost.append(labor_costs)
-        road_cost = road_cost.append(additional_costs)
+        road_cost.add('Other', float(cost_adder), 'Inter-array roads (Solar)')
 
         # Calculate mobilization costs:
 
@@ -540,17 +530,12 @@ class SitePreparationCost(CostModule):
                                       equipment_mobilization_USD + \
                                       labor_mobilization_USD
 
-        mobilization_costs = pd.DataFrame([['Mobilization',
-                                            siteprep_mobilization_usd,
-                                            'Inter-array roads (Solar)']],
-                                          columns=['Type of cost',
-                                                   'Cost USD',
-                                                   'Phase of construction'])
+        road_cost.add('Mobilization', siteprep_mobilization_usd,
+                      'Inter-array roads (Solar)')
 
-        road_cost = road_cost.append(mobilization_costs)
         total_road_cost = road_cost
-        output_dict['total_road_cost_df'] = total_road_cost
-        output_dict['total_road_cost'] = total_road_cost['Cost USD'].sum()
+        output_dict['total_road_cost_ledger'] = total_road_cost
+        output_dict['total_road_cost'] = total_road_cost.total()
         return total_road_cost
 
     def access_road_cost(self):
@@ -574,6 +559,5 @@ class SitePreparationCost(CostModule):
             self.calculate_costs(self.input_dict, self.output_dict)
             return 0, 0  # module ran successfully
         except Exception as error:
-            traceback.print_exc()
-            print(f"Fail {self.project_name} SitePreparationCost")
+            self.record_error(error)
             return 1, error  # module did not run successfully
@@ -1,7 +1,6 @@
-import traceback
-import pandas as pd
 import math
 from .CostModule import CostModule
+from .CostLedger import CostLedger
 
 
 class SubstationCost(CostModule):
@@ -35,6 +34,13 @@ class SubstationCost(CostModule):
 
 
     """
+    # Keys read and written by this module (see CostModule):
+    input_keys = CostModule.input_keys + ('interconnect_voltage_kV',
+                                        'substation_rating_MW')
+    output_keys = ('substation_cost_usd', 'total_substation_cost',
+                   'total_substation_cost_ledger')
+    total_cost_key = 'total_substation_cost'
+
     def __init__(self, input_dict, output_dict, project_name):
         """
         Parameters
@@ -87,18 +93,15 @@ class SubstationCost(CostModule):
             else:   # that is, < 10 MW_AC
                 output_dict['substation_cost_usd'] = 500000
 
-        output_dict['substation_cost_output_df'] = pd.DataFrame([['Other',
-                                                                  output_dict['substation_cost_usd'],
-                                                                  'Substation']],
-                                                                columns=['Type of cost',
-                                                                         'Cost USD',
-                                                                         'Phase of construction'])
+        output_dict['total_substation_cost_ledger'] = CostLedger()
+        output_dict['total_substation_cost_ledger'].add('Other',
+                                                        output_dict['substation_cost_usd'],
+                                                        'Substation')
 
-        output_dict['total_substation_cost_df'] = output_dict['substation_cost_output_df']
         output_dict['total_substation_cost'] = \
-        output_dict['substation_cost_output_df']['Cost USD'].sum()
+        output_dict['total_substation_cost_ledger'].total()
 
-        return output_dict['substation_cost_output_df']
+        return output_dict['total_substation_cost_ledger']
 
     def run_module(self):
         """
@@ -121,6 +124,5 @@ class SubstationCost(CostModule):
             self.calculate_costs(self.input_dict, self.output_dict)
             return 0, 0
         except Exception as error:
-            traceback.print_exc()
-            print(f"Fail {self.project_name} SubstationCost")
+            self.record_error(error)
             return 1, error
@@ -0,0 +1,332 @@
+"""
+Benchmarks of the SolarBOSSE cost modules, of run_solarbosse() and of
+run_hybrid_BOS().
+
+Run from the root of the repository:
+
+    python benchmarks/run_benchmarks.py --output benchmark_results.json
+
+The benchmarks only use data checked in to the repository: the SolarBOSSE
+project list in benchmarks/fixtures and the default project data workbook in
+SolarBOSSE/project_data, and, for the wind legs of the hybrid benchmarks, the
+LandBOSSE project list and project data workbook in benchmarks/fixtures (see
+hybrid_scenario()). Like SolarBOSSE itself (which takes its default inputs from
+LandBOSSE), they need the LandBOSSE submodule: when it cannot be imported, the
+benchmarks are reported as skipped.
+
+Each benchmark is timed repeat times, and reported (as JSON) with the time of
+each repetition along with their minimum, median and mean. Benchmarks of the
+runs are reported for the following states of the project data caches:
+
+cold
+    Nothing is cached: the project data workbook is parsed from the .xlsx file
+    (see XlsxDataframeCache).
+
+disk
+    The parsed workbook is loaded from its sidecar pickle file.
+
+warm
+    The parsed workbook (and, for run_solarbosse(), the compiled
+    SolarBOSSEPipeline) is held in memory, as in the later runs of a sweep.
+
+The cost modules are timed in isolation, on the inputs and outputs of a
+complete run of the plant, for plant sizes from 5 MW to 5 GW (see --sizes). So
+is ScalarEngine.totals(), which computes the same totals as the cost modules.
+
+run_monte_carlo() is timed on the scenario of hybrid_inputs.yaml, for 100,000
+samples (see --samples), with the wind leg run beforehand.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from SolarBOSSE import main as solarbosse_main  # noqa: E402
+from SolarBOSSE.ScalarEngine import ScalarEngine  # noqa: E402
+from SolarBOSSE.SolarBOSSEPipeline import SolarBOSSEPipeline  # noqa: E402
+from SolarBOSSE.excelio.XlsxDataframeCache import XlsxDataframeCache  # noqa: E402
+from SolarBOSSE.model.Manager import Manager  # noqa: E402
+
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Project list of the SolarBOSSE benchmarks. It is also installed under the name
+# of the project list used by the solar leg of run_hybrid_BOS():
+PROJECT_LIST = 'project_list_benchmark'
+HYBRID_PROJECT_LIST = 'project_list_50MW'
+
+# LandBOSSE project list of the wind leg of the hybrid benchmarks, and the
+# project data workbook it names (in benchmarks/fixtures/project_data):
+LANDBOSSE_PROJECT_LIST = 'landbosse_project_list_benchmark'
+LANDBOSSE_PROJECT_DATA = 'ge15_public'
+
+DEFAULT_SIZES_MW = [5, 50, 150, 500, 1500, 5000]
+
+
+def read_project_list():
+    """
+    Returns the project list fixture.
+    """
+    return pd.read_csv(os.path.join(FIXTURES, PROJECT_LIST + '.csv'))
+
+
+def reset_caches(cache_state):
+    """
+    Puts the project data caches of this process in cache_state ('cold',
+    'disk' or 'warm'), and installs the project list fixture.
+    """
+    if cache_state != 'warm':
+        XlsxDataframeCache._cache.clear()
+        solarbosse_main._compiled_pipelines.clear()
+
+    project_list = read_project_list()
+    for basename in [PROJECT_LIST, HYBRID_PROJECT_LIST]:
+        XlsxDataframeCache.cache_all_sheets(basename, {'Project list': project_list})
+
+    XlsxDataframeCache.disk_cache = cache_state != 'cold'
+
+    # LandBOSSE looks for the project data workbooks named by its project list
+    # in its own input directory, unless they are in its cache, keyed by base
+    # name. Reading the fixture caches it:
+    from LandBOSSE.landbosse.excelio.XlsxDataframeCache import \
+        XlsxDataframeCache as LandBOSSEDataframeCache
+    if LANDBOSSE_PROJECT_DATA not in LandBOSSEDataframeCache._cache:
+        LandBOSSEDataframeCache.read_all_sheets_from_xlsx(
+            LANDBOSSE_PROJECT_DATA, os.path.join(FIXTURES, 'project_data'))
+
+
+def hybrid_scenario():
+    """
+    Returns the scenario of hybrid_inputs.yaml, with its wind leg reading the
+    LandBOSSE project list fixture.
+    """
+    import main as hybrid_main
+
+    hybrids_input_dict = hybrid_main.read_hybrid_scenario(None)
+    hybrids_input_dict['path_to_project_list'] = FIXTURES
+    hybrids_input_dict['name_of_project_list'] = LANDBOSSE_PROJECT_LIST
+    return hybrids_input_dict
+
+
+def time_call(function, repeat, setup=None):
+    """
+    Returns the wall times (in seconds) of repeat calls of function. setup, if
+    given, is called (untimed) before each call.
+    """
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    return times
+
+
+def benchmark_result(name, times, **parameters):
+    """
+    Returns the JSON record of a benchmark.
+    """
+    result = {'name': name}
+    result.update(parameters)
+    result.update({'repeat': len(times),
+                   'times_s': times,
+                   'min_s': min(times),
+                   'median_s': statistics.median(times),
+                   'mean_s': statistics.mean(times)})
+    return result
+
+
+def benchmark_cost_modules(sizes, repeat):
+    """
+    Times each cost module in isolation, for each plant size.
+    """
+    reset_caches('disk')
+    pipeline = SolarBOSSEPipeline.compile(read_project_list())
+
+    results = []
+    for size in sizes:
+        overrides = {'system_size_MW_DC': size}
+        master_input_dict = dict(pipeline.master_input_template)
+        master_input_dict.update(overrides)
+        master_input_dict['error'] = dict()
+        master_input_dict['grid_system_size_MW_DC'] = size
+        master_input_dict['grid_size_MW_AC'] = size / master_input_dict['dc_ac_ratio']
+
+        # The outputs of a complete run hold the outputs of the modules each
+        # module depends on:
+        output_dict = dict()
+        Manager(dict(master_input_dict), output_dict).execute_solarbosse()
+
+        for cost_module in Manager.default_cost_modules:
+            def run_module():
+                cost_module(input_dict=dict(master_input_dict),
+                            output_dict=dict(output_dict),
+                            project_name='benchmark').run_module()
+
+            results.append(benchmark_result('cost_module.' + cost_module.__name__,
+                                            time_call(run_module, repeat),
+                                            size_MW_DC=size))
+
+    return results
+
+
+def benchmark_scalar_engine(sizes, repeat):
+    """
+    Times ScalarEngine.totals() for each plant size.
+    """
+    reset_caches('disk')
+    engine = ScalarEngine(SolarBOSSEPipeline.compile(read_project_list()).master_input_template)
+
+    return [benchmark_result('scalar_engine.totals',
+                             time_call(lambda: engine.totals(system_size_MW_DC=size), repeat),
+                             size_MW_DC=size)
+            for size in sizes]
+
+
+def benchmark_run_solarbosse(sizes, repeat):
+    """
+    Times run_solarbosse() from cold, disk and warm caches, for each plant size.
+    """
+    results = []
+    for size in sizes:
+        input_dictionary = {'project_list': PROJECT_LIST, 'system_size_MW_DC': size}
+        for cache_state in ['cold', 'disk', 'warm']:
+            reset_caches('disk')
+            solarbosse_main.run_solarbosse(dict(input_dictionary))
+
+            times = time_call(
+                lambda: solarbosse_main.run_solarbosse(dict(input_dictionary)),
+                repeat, setup=lambda: reset_caches(cache_state))
+            results.append(benchmark_result('run_solarbosse', times, size_MW_DC=size,
+                                            cache=cache_state))
+
+    reset_caches('disk')
+    return results
+
+
+def benchmark_run_hybrid_BOS(repeat):
+    """
+    Times run_hybrid_BOS() on the scenario of hybrid_inputs.yaml (see
+    hybrid_scenario()), from cold, disk and warm caches.
+    """
+    import main as hybrid_main
+
+    hybrids_input_dict = hybrid_scenario()
+
+    results = []
+    for cache_state in ['cold', 'disk', 'warm']:
+        def run_hybrid_BOS():
+            hybrid_main.run_hybrid_BOS(dict(hybrids_input_dict))
+
+        reset_caches('disk')
+        run_hybrid_BOS()
+        times = time_call(run_hybrid_BOS, repeat, setup=lambda: reset_caches(cache_state))
+        results.append(benchmark_result('run_hybrid_BOS', times, cache=cache_state))
+
+    reset_caches('disk')
+    return results
+
+
+def benchmark_monte_carlo(num_samples, repeat):
+    """
+    Times run_monte_carlo() on the scenario of hybrid_inputs.yaml (see
+    hybrid_scenario()), serially and in a pool of threads.
+    """
+    import main as hybrid_main
+    from hybrids_shared_infrastructure.monte_carlo import run_monte_carlo
+
+    reset_caches('disk')
+    hybrids_input_dict = hybrid_main.derive_hybrid_fields(hybrid_scenario())
+    wind_BOS = hybrid_main.run_wind_leg(hybrid_main.wind_leg_input_dict(hybrids_input_dict))
+    # Compiles the engine of the solar leg:
+    run_monte_carlo(hybrids_input_dict, 1, wind_BOS=wind_BOS)
+
+    results = []
+    for concurrency in ['serial', 'thread']:
+        times = time_call(lambda: run_monte_carlo(hybrids_input_dict, num_samples, seed=0,
+                                                  concurrency=concurrency,
+                                                  wind_BOS=wind_BOS),
+                          repeat)
+        results.append(benchmark_result('run_monte_carlo', times, samples=num_samples,
+                                        concurrency=concurrency))
+
+    return results
+
+
+def metadata():
+    """
+    Returns the environment the benchmarks ran in.
+    """
+    return {'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__}
+
+
+def run_benchmarks(benchmarks, sizes, repeat, num_samples=100000):
+    """
+    Runs the named benchmarks ('cost_modules', 'scalar_engine', 'run_solarbosse',
+    'run_hybrid_BOS' and 'monte_carlo'), and returns their JSON report.
+    """
+    if importlib.util.find_spec('LandBOSSE') is None:
+        return {'metadata': metadata(),
+                'benchmarks': [{'name': name, 'skipped': 'LandBOSSE is not available'}
+                               for name in benchmarks]}
+
+    results = []
+    if 'cost_modules' in benchmarks:
+        results.extend(benchmark_cost_modules(sizes, repeat))
+    if 'scalar_engine' in benchmarks:
+        results.extend(benchmark_scalar_engine(sizes, repeat))
+    if 'run_solarbosse' in benchmarks:
+        results.extend(benchmark_run_solarbosse(sizes, repeat))
+    if 'run_hybrid_BOS' in benchmarks:
+        results.extend(benchmark_run_hybrid_BOS(repeat))
+    if 'monte_carlo' in benchmarks:
+        results.extend(benchmark_monte_carlo(num_samples, repeat))
+
+    return {'metadata': metadata(), 'benchmarks': results}
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--output', help='JSON file to write (default: standard output)')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='number of times each benchmark is timed (default: 5)')
+    parser.add_argument('--sizes', type=float, nargs='+', default=DEFAULT_SIZES_MW,
+                        help='plant sizes in MW DC (default: %(default)s)')
+    parser.add_argument('--samples', type=int, default=100000,
+                        help='number of Monte Carlo samples (default: %(default)s)')
+    parser.add_argument('--benchmarks', nargs='+',
+                        choices=['cost_modules', 'scalar_engine', 'run_solarbosse',
+                                 'run_hybrid_BOS', 'monte_carlo'],
+                        default=['cost_modules', 'scalar_engine', 'run_solarbosse',
+                                 'run_hybrid_BOS', 'monte_carlo'],
+                        help='benchmarks to run (default: all)')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = parse_args(sys.argv[1:])
+    report = run_benchmarks(args.benchmarks, args.sizes, args.repeat, args.samples)
+
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
@@ -1,3 +1,6 @@
+import numpy as np
+
+
 def hybrid_gridconnection(input_dict):
     """
     Function to calculate total costs for transmission and distribution.
@@ -45,3 +48,56 @@ def hybrid_gridconnection(input_dict):
             input_dict['system_size_MW'] * 1000 * output_dict['substation_to_POI_usd_per_kw']
 
     return output_dict['trans_dist_usd']
+
+
+def hybrid_gridconnection_array(system_size_MW, dist_interconnect_mi,
+                                interconnect_voltage_kV, new_switchyard):
+    """
+    Array version of hybrid_gridconnection(), for N scenarios at once.
+
+    Parameters
+    ----------
+    system_size_MW : array_like
+        Grid interconnection rating (in MW)
+
+    dist_interconnect_mi : array_like
+        Distance to the point of interconnection (in miles)
+
+    interconnect_voltage_kV : array_like
+        Interconnection voltage (in kV)
+
+    new_switchyard : array_like of bool
+        Whether a new switchyard is built.
+
+    Returns
+    -------
+    numpy.ndarray
+        Transmission and distribution cost (in USD) of each scenario.
+    """
+    system_size_MW = np.asarray(system_size_MW, dtype=float)
+    dist_interconnect_mi = np.asarray(dist_interconnect_mi, dtype=float)
+    interconnect_voltage_kV = np.asarray(interconnect_voltage_kV, dtype=float)
+    new_switchyard = np.asarray(new_switchyard, dtype=bool)
+
+    # Both branches are evaluated for every scenario, and the branch that does not
+    # apply may raise 0 to a negative power:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        interconnect_adder_USD = \
+            np.where(new_switchyard, 18115 * interconnect_voltage_kV + 165944, 0)
+
+        utility_trans_dist_usd = \
+            np.where(dist_interconnect_mi == 0, 0,
+                     ((1176 * interconnect_voltage_kV + 218257) *
+                      (dist_interconnect_mi ** (-0.1063)) *
+                      dist_interconnect_mi
+                      ) + interconnect_adder_USD)
+
+        substation_to_POI_usd_per_kw = \
+            1736.7 * ((system_size_MW * 1000) ** (-0.272))
+
+        distributed_trans_dist_usd = \
+            system_size_MW * 1000 * substation_to_POI_usd_per_kw
+
+        return np.where(system_size_MW > 15,
+                        utility_trans_dist_usd,
+                        distributed_trans_dist_usd)
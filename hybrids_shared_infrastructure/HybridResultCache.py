@@ -0,0 +1,377 @@
+import glob
+import hashlib
+import importlib.metadata
+import json
+import math
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from numbers import Number
+
+
+class HybridResultCache:
+    """
+    Content addressed cache of the results of run_hybrid_BOS().
+
+    Results are keyed by a canonical hash of:
+
+    - the hybrid input dictionary, normalized so that equal scenarios hash the
+      same regardless of key order or numeric type (e.g. 5 and 5.0, or a NumPy
+      float and a Python float);
+    - the SHA-256 of the project data files: the SolarBOSSE project lists and
+      project data workbooks, the LandBOSSE project list, project data and
+      weather files of the scenario (see landbosse_data_files()), plus any
+      data_files given;
+    - a code version (by default, the SHA-256 of the model source files,
+      including those of LandBOSSE, and the LandBOSSE package version).
+
+    The data files of each LandBOSSE project list, and their hashes, are only
+    listed and checked again once check_interval seconds have passed since
+    they last were, so that lookups do not stat every file. Edits to the data
+    files within that interval (or, with a check_interval of None, after the
+    first lookup) are only seen after clear().
+
+    Results are kept pickled, in a bounded in-memory LRU and, optionally, in a
+    directory on disk. Every call returns a new unpickled copy, so callers may
+    modify the results they get. Concurrent calls for the same scenario (from
+    several threads) run it only once: the other calls wait for its result.
+
+    Example
+    -------
+    cache = HybridResultCache(directory='hybrid_results')
+    hybrid_results, wind_only, solar_only = cache.run_hybrid_BOS(hybrids_input_dict)
+    """
+
+    # Version of the key and file layout. Bump when either changes.
+    cache_version = 1
+
+    def __init__(self, run=None, max_entries=256, directory=None, data_files=None,
+                 code_version=None, check_interval=1.0):
+        """
+        Parameters
+        ----------
+        run : callable
+            Function run on cache misses, with the hybrid input dictionary and
+            the keyword arguments of run_hybrid_BOS(). Defaults to
+            run_hybrid_BOS() in main.py.
+
+        max_entries : int
+            Number of results kept in memory.
+
+        directory : str
+            Directory where results are also stored, as one pickle file per
+            key. Results are not stored on disk if None (the default).
+
+        data_files : list
+            Paths of project data files the results depend on, in addition to
+            the SolarBOSSE .xlsx files (see project_data_files(), which are
+            listed when the cache is created) and the LandBOSSE .xlsx files of
+            each scenario (see landbosse_data_files()).
+
+        code_version : str
+            Version of the model code. Defaults to source_version().
+
+        check_interval : float
+            Seconds after which the data files of a LandBOSSE project list are
+            listed and checked again (see data_file_hashes()). 0 checks them on
+            every lookup, and None only on the first one.
+        """
+        if max_entries < 1:
+            raise ValueError('max_entries must be at least 1')
+
+        self.run = run
+        self.max_entries = max_entries
+        self.directory = directory
+        self.data_files = self.project_data_files() + \
+            (list(data_files) if data_files is not None else [])
+        self.code_version = code_version if code_version is not None \
+            else self.source_version()
+        self.check_interval = check_interval
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._in_flight = dict()
+        # SHA-256 of the data files, with the (mtime, size) they were computed for:
+        self._file_hashes = dict()
+        # Data file hashes of each LandBOSSE project list, with the time they were
+        # checked (see data_file_hashes()):
+        self._data_file_hashes = dict()
+
+    def run_hybrid_BOS(self, hybrids_input_dict, concurrency='serial', executor=None):
+        """
+        Returns the results of run_hybrid_BOS() for hybrids_input_dict, running
+        it only if they are not cached. concurrency and executor are passed on
+        to run_hybrid_BOS(), and are not part of the key.
+        """
+        key = self.key(hybrids_input_dict)
+
+        with self._lock:
+            pickled_results = self._get(key)
+            if pickled_results is not None:
+                self.hits += 1
+                return pickle.loads(pickled_results)
+
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if not leader:
+            return pickle.loads(future.result())
+
+        try:
+            pickled_results = self._load(key)
+            if pickled_results is None:
+                results = self._run(hybrids_input_dict, concurrency=concurrency,
+                                    executor=executor)
+                pickled_results = pickle.dumps(results, protocol=pickle.HIGHEST_PROTOCOL)
+                self._store(key, pickled_results)
+        except BaseException as error:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(error)
+            raise
+
+        with self._lock:
+            self._put(key, pickled_results)
+            del self._in_flight[key]
+        future.set_result(pickled_results)
+
+        return pickle.loads(pickled_results)
+
+    def key(self, hybrids_input_dict):
+        """
+        Returns the key (a hex SHA-256) of the results of hybrids_input_dict.
+        """
+        content = {
+            'cache_version': self.cache_version,
+            'code_version': self.code_version,
+            'data_files': self.data_file_hashes(hybrids_input_dict),
+            'hybrids_input_dict': self.normalize(hybrids_input_dict),
+        }
+        canonical = json.dumps(content, sort_keys=True, separators=(',', ':'),
+                               allow_nan=False)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def data_file_hashes(self, hybrids_input_dict):
+        """
+        Returns the [path, SHA-256] of each data file of hybrids_input_dict: the
+        data_files of the cache, followed by the LandBOSSE data files of the
+        scenario (see landbosse_data_files()). They are only listed and hashed
+        again once check_interval seconds have passed since the last time for
+        the LandBOSSE project list of the scenario.
+        """
+        project_list = (hybrids_input_dict.get('path_to_project_list'),
+                        hybrids_input_dict.get('name_of_project_list'))
+        now = time.monotonic()
+        checked = self._data_file_hashes.get(project_list)
+        if checked is None or \
+                (self.check_interval is not None and now - checked[0] >= self.check_interval):
+            paths = self.data_files + self.landbosse_data_files(hybrids_input_dict)
+            checked = (now, [[path, self.file_hash(path)] for path in paths])
+            self._data_file_hashes[project_list] = checked
+
+        return checked[1]
+
+    @classmethod
+    def normalize(cls, value):
+        """
+        Returns value as JSON serializable data that is the same for equal
+        values: numbers (other than booleans) become the repr of their float
+        value, and tuples become lists.
+        """
+        if value is None or isinstance(value, (bool, str)):
+            return value
+        if hasattr(value, 'item') and getattr(value, 'ndim', None) == 0:
+            value = value.item()     # NumPy scalar
+            if isinstance(value, bool):
+                return value
+        if isinstance(value, Number):
+            number = float(value)
+            return 'nan' if math.isnan(number) else repr(number)
+        if isinstance(value, dict):
+            return {str(key): cls.normalize(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [cls.normalize(item) for item in value]
+
+        raise TypeError(f'Cannot make a cache key from a {type(value).__name__}')
+
+    def file_hash(self, path):
+        """
+        Returns the SHA-256 of the file at path, or None if there is no such
+        file. Hashes are only recomputed when the file's mtime or size change.
+        """
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._file_hashes.get(path)
+        if cached is None or cached[0] != signature:
+            sha256 = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    sha256.update(chunk)
+            cached = (signature, sha256.hexdigest())
+            self._file_hashes[path] = cached
+
+        return cached[1]
+
+    @staticmethod
+    def source_version():
+        """
+        Returns the SHA-256 of the .py files of SolarBOSSE, LandBOSSE,
+        hybrids_shared_infrastructure and main.py, and of the version of the
+        installed LandBOSSE package (if any).
+        """
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        paths = sorted(glob.glob(os.path.join(root, 'SolarBOSSE', '**', '*.py'),
+                                 recursive=True) +
+                       glob.glob(os.path.join(root, 'LandBOSSE', 'landbosse', '**', '*.py'),
+                                 recursive=True) +
+                       glob.glob(os.path.join(root, 'hybrids_shared_infrastructure',
+                                              '*.py')) +
+                       glob.glob(os.path.join(root, 'main.py')))
+
+        sha256 = hashlib.sha256()
+        sha256.update(('landbosse ' + str(_landbosse_version())).encode('utf-8'))
+        for path in paths:
+            sha256.update(os.path.relpath(path, root).encode('utf-8'))
+            with open(path, 'rb') as f:
+                sha256.update(f.read())
+
+        return sha256.hexdigest()
+
+    def clear(self):
+        """
+        Forgets the results held in memory, and the data files checked (which
+        are checked again by the next lookup). Results on disk are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._data_file_hashes.clear()
+
+    @staticmethod
+    def project_data_files():
+        """
+        Returns the (sorted) paths of the SolarBOSSE project lists and project
+        data workbooks.
+        """
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        solarbosse = os.path.join(root, 'SolarBOSSE')
+        paths = glob.glob(os.path.join(solarbosse, '*.xlsx')) + \
+            glob.glob(os.path.join(solarbosse, 'project_data', '*.xlsx'))
+
+        # Skip the lock files Excel leaves next to open workbooks:
+        paths = [path for path in paths if not os.path.basename(path).startswith('~$')]
+
+        return sorted(paths)
+
+    @staticmethod
+    def landbosse_data_files(hybrids_input_dict):
+        """
+        Returns the paths of the LandBOSSE input files of a scenario: its project
+        list (name_of_project_list.xlsx in path_to_project_list, defaulting to the
+        project list of the LandBOSSE API), followed by the (sorted) project data
+        workbooks and weather files of the project_data directories LandBOSSE
+        reads them from: those of path_to_project_list and of the LandBOSSE API.
+        """
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        landbosse_input_dir = os.path.join(root, 'LandBOSSE', 'landbosse', 'landbosse_api')
+        path_to_project_list = hybrids_input_dict.get('path_to_project_list') or \
+            landbosse_input_dir
+        name_of_project_list = hybrids_input_dict.get('name_of_project_list') or \
+            'project_list'
+
+        project_data = []
+        for directory in {path_to_project_list, landbosse_input_dir}:
+            for pattern in ['*.xlsx', '*.srw']:
+                project_data.extend(glob.glob(os.path.join(directory, 'project_data', pattern)))
+
+        return [os.path.join(path_to_project_list, name_of_project_list + '.xlsx')] + \
+            sorted(path for path in project_data if not os.path.basename(path).startswith('~$'))
+
+    def _run(self, hybrids_input_dict, **kwargs):
+        run = self.run
+        if run is None:
+            from main import run_hybrid_BOS as run
+
+        return run(hybrids_input_dict, **kwargs)
+
+    def _get(self, key):
+        """
+        Returns the pickled results of key held in memory (marking them as the
+        most recently used), or None. Called with self._lock held.
+        """
+        pickled_results = self._entries.get(key)
+        if pickled_results is not None:
+            self._entries.move_to_end(key)
+
+        return pickled_results
+
+    def _put(self, key, pickled_results):
+        """
+        Keeps the pickled results of key in memory, evicting the least recently
+        used results beyond max_entries. Called with self._lock held.
+        """
+        self._entries[key] = pickled_results
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _filename(self, key):
+        return os.path.join(self.directory, key + '.pickle')
+
+    def _load(self, key):
+        """
+        Returns the pickled results of key stored on disk, or None.
+        """
+        if self.directory is None:
+            return None
+
+        try:
+            with open(self._filename(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _store(self, key, pickled_results):
+        """
+        Stores the pickled results of key on disk. The file is written to a
+        temporary file first and then renamed, so that concurrent readers
+        never see a partial file.
+        """
+        if self.directory is None:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        fd, temporary_filename = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(pickled_results)
+            os.replace(temporary_filename, self._filename(key))
+        except BaseException:
+            os.remove(temporary_filename)
+            raise
+
+
+def _landbosse_version():
+    """
+    Returns the version of the installed LandBOSSE package, or None.
+    """
+    try:
+        return importlib.metadata.version('landbosse')
+    except importlib.metadata.PackageNotFoundError:
+        return None
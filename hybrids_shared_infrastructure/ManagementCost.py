@@ -1,3 +1,6 @@
+import numpy as np
+
+
 def epc_developer_profit_discount(hybrid_plant_size_MW, technology_size_MW):
     """
     profit is 5% of total cost (before management cost) at 100 MW. And 8 % of TIC at 5
@@ -112,3 +115,61 @@ def site_facility(hybrid_plant_size_MW, hybrid_construction_months, num_turbines
         site_facility_cost = 0
 
     return site_facility_cost
+
+
+def epc_developer_profit_discount_array(hybrid_plant_size_MW, technology_size_MW):
+    """
+    Array version of epc_developer_profit_discount(), for N scenarios at once.
+    """
+    hybrid_plant_size_MW = np.asarray(hybrid_plant_size_MW, dtype=float)
+    technology_size_MW = np.asarray(technology_size_MW, dtype=float)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        profit_discount_multiplier = \
+            np.where(technology_size_MW == 0, 0,
+                     (10.298 * (technology_size_MW ** (-0.157))) -
+                     (10.298 * (hybrid_plant_size_MW ** (-0.157))))
+
+    return profit_discount_multiplier / 100
+
+
+def development_overhead_cost_discount_array(hybrid_plant_size_MW, technology_size_MW):
+    """
+    Array version of development_overhead_cost_discount(), for N scenarios at once.
+    """
+    hybrid_plant_size_MW = np.asarray(hybrid_plant_size_MW, dtype=float)
+    technology_size_MW = np.asarray(technology_size_MW, dtype=float)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        overhead_discount_multiplier = \
+            np.where(technology_size_MW == 0, 0,
+                     (31.422 * (technology_size_MW ** (-0.598))) -
+                     (31.422 * (hybrid_plant_size_MW ** (-0.598))))
+
+    return overhead_discount_multiplier / 100
+
+
+def site_facility_array(hybrid_plant_size_MW, hybrid_construction_months, num_turbines):
+    """
+    Array version of site_facility(), for N scenarios at once.
+
+    Returns
+    -------
+    numpy.ndarray
+        Cost of site facilities and security (in USD) of each scenario.
+    """
+    ps = np.asarray(hybrid_plant_size_MW, dtype=float)
+    ct = np.asarray(hybrid_construction_months, dtype=float)
+    nt = np.asarray(num_turbines, dtype=float)
+
+    building_area_sq_ft = float(4000)
+    construction_building_cost = building_area_sq_ft * 125 + 176125
+
+    # np.round() rounds halves to even, like round() in site_facility():
+    nr = np.where(nt < 30, 1, np.round(0.05 * nt))
+    acs = np.select([nt < 30, nt < 100], [30000, 240000], 390000)
+    compound_security_cost = 9825 * nr + 29850 * ct + acs + 60 * ps + 62400
+
+    site_facility_cost = construction_building_cost + compound_security_cost
+
+    return np.where(ps > 15, site_facility_cost, 0.0)
@@ -1,5 +1,7 @@
-from .GridConnectionCost import hybrid_gridconnection
-from .SubstationCost import hybrid_substation
+import numpy as np
+
+from .GridConnectionCost import hybrid_gridconnection, hybrid_gridconnection_array
+from .SubstationCost import hybrid_substation, hybrid_substation_array
 from .ManagementCost import *
 
 
@@ -232,3 +234,158 @@ class PostSimulationProcessing:
 
         return BOS_dict
 
+
+class ColumnarPostSimulationProcessing:
+    """
+    Columnar counterpart of PostSimulationProcessing, combining the wind only and
+    solar only BOS results of N scenarios in one vectorized pass.
+
+    hybrids_inputs, LandBOSSE_BOS_results and SolarBOSSE_results are mappings
+    (e.g. DataFrames) from the keys used by PostSimulationProcessing to arrays
+    with one element per scenario. Cost buckets missing from a leg (e.g. for legs
+    that were not run) are taken to be 0. The leg results are not mutated; the
+    adjusted leg totals are stored as arrays on this object instead.
+    """
+    def __init__(self, hybrids_inputs, LandBOSSE_BOS_results, SolarBOSSE_results):
+        self.hybrid_plant_size_MW = self.input_array(hybrids_inputs, 'hybrid_plant_size_MW')
+        self.wind_plant_size_MW = self.input_array(hybrids_inputs, 'wind_plant_size_MW')
+        self.solar_system_size_MW_DC = \
+            self.input_array(hybrids_inputs, 'solar_system_size_MW_DC')
+
+        shared_interconnection = \
+            np.asarray(hybrids_inputs['shared_interconnection'], dtype=bool)
+        shared_substation = np.asarray(hybrids_inputs['shared_substation'], dtype=bool)
+
+        self.hybrid_gridconnection_usd = np.where(
+            shared_interconnection,
+            hybrid_gridconnection_array(
+                hybrids_inputs['grid_interconnection_rating_MW'],
+                hybrids_inputs['distance_to_interconnect_mi'],
+                hybrids_inputs['interconnect_voltage_kV'],
+                hybrids_inputs['new_switchyard']),
+            0)
+
+        self.hybrid_substation_usd = np.where(
+            shared_substation,
+            hybrid_substation_array(hybrids_inputs['hybrid_substation_rating_MW'],
+                                    hybrids_inputs['interconnect_voltage_kV']),
+            0)
+
+        self.site_facility_usd = \
+            site_facility_array(self.hybrid_plant_size_MW,
+                                hybrids_inputs['hybrid_construction_months'],
+                                hybrids_inputs['num_turbines'])
+
+        wind_bos_usd = self.input_array(LandBOSSE_BOS_results, 'total_bos_cost')
+        wind_management_usd = \
+            self.input_array(LandBOSSE_BOS_results, 'total_management_cost')
+        solar_bos_usd = self.input_array(SolarBOSSE_results, 'total_bos_cost')
+        solar_management_usd = \
+            self.input_array(SolarBOSSE_results, 'total_management_cost')
+
+        # Profit and overhead savings from going hybrid. Cost before management is
+        # unchanged by the profit savings, as both the total and the management
+        # cost are reduced by them:
+        wind_cost_before_mgmt = wind_bos_usd - wind_management_usd
+        solar_cost_before_mgmt = solar_bos_usd - solar_management_usd
+
+        wind_profit_savings = \
+            epc_developer_profit_discount_array(self.hybrid_plant_size_MW,
+                                                self.wind_plant_size_MW) * \
+            wind_cost_before_mgmt
+
+        solar_profit_savings = \
+            epc_developer_profit_discount_array(self.hybrid_plant_size_MW,
+                                                self.solar_system_size_MW_DC) * \
+            solar_cost_before_mgmt
+
+        wind_overhead_savings = \
+            development_overhead_cost_discount_array(self.hybrid_plant_size_MW,
+                                                     self.wind_plant_size_MW) * \
+            wind_cost_before_mgmt
+
+        # Same as PostSimulationProcessing.developer_overhead_USD(), which uses the
+        # profit discount for solar overhead savings:
+        solar_overhead_savings = solar_profit_savings
+
+        solar_only_site_cost_usd = \
+            site_facility_array(self.solar_system_size_MW_DC,
+                                hybrids_inputs['solar_construction_time_months'],
+                                np.zeros(len(self.solar_system_size_MW_DC)))
+
+        # site_facility_usd is removed from wind's overhead cost (and the solar
+        # only site facility cost from solar's) to prevent double counting:
+        wind_overhead_usd = wind_overhead_savings + \
+            self.input_array(LandBOSSE_BOS_results, 'site_facility_usd')
+        solar_overhead_usd = solar_overhead_savings + solar_only_site_cost_usd
+
+        self.wind_bos_usd = wind_bos_usd - wind_profit_savings - wind_overhead_usd
+        self.wind_management_usd = \
+            wind_management_usd - wind_profit_savings - wind_overhead_usd
+        self.solar_bos_usd = solar_bos_usd - solar_profit_savings - solar_overhead_usd
+        self.solar_management_usd = \
+            solar_management_usd - solar_profit_savings - solar_overhead_usd
+
+        self.hybrid_BOS_usd = self.hybrid_BOS_usd_array(shared_interconnection,
+                                                        LandBOSSE_BOS_results,
+                                                        SolarBOSSE_results)
+        self.hybrid_BOS_usd_watt = self.hybrid_BOS_usd_watt_array()
+
+        self.hybrid_management_development_usd = self.wind_management_usd + \
+                                                 self.solar_management_usd + \
+                                                 self.site_facility_usd
+
+    @staticmethod
+    def input_array(mapping, key):
+        """
+        Returns mapping[key] as a float array, with missing values (and a missing
+        key) taken to be 0.
+        """
+        if key not in mapping:
+            any_key = next(iter(mapping))
+            return np.zeros(len(mapping[any_key]))
+
+        return np.nan_to_num(np.asarray(mapping[key], dtype=float))
+
+    def hybrid_BOS_usd_array(self, shared_interconnection, LandBOSSE_BOS_results,
+                             SolarBOSSE_results):
+        """
+        Hybrid BOS Results on a total project basis (USD)
+        """
+        total_hybrids_BOS_USD = self.wind_bos_usd + self.solar_bos_usd
+
+        wind_gridconnection_usd = np.where(
+            self.wind_plant_size_MW == 0, 0,
+            self.input_array(LandBOSSE_BOS_results, 'total_gridconnection_cost'))
+        wind_substation_usd = np.where(
+            self.wind_plant_size_MW == 0, 0,
+            self.input_array(LandBOSSE_BOS_results, 'total_substation_cost'))
+        solar_gridconnection_usd = np.where(
+            self.solar_system_size_MW_DC == 0, 0,
+            self.input_array(SolarBOSSE_results, 'total_transdist_cost'))
+        solar_substation_usd = np.where(
+            self.solar_system_size_MW_DC == 0, 0,
+            self.input_array(SolarBOSSE_results, 'substation_cost'))
+
+        shared_savings = self.hybrid_gridconnection_usd + \
+                         self.hybrid_substation_usd - \
+                         wind_gridconnection_usd - \
+                         solar_gridconnection_usd - \
+                         wind_substation_usd - \
+                         solar_substation_usd
+
+        return np.where(shared_interconnection,
+                        total_hybrids_BOS_USD + shared_savings,
+                        total_hybrids_BOS_USD)
+
+    def hybrid_BOS_usd_watt_array(self):
+        """
+        Hybrid BOS Results on a per Watt basis (USD/W)
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.select(
+                [self.solar_bos_usd == 0, self.wind_bos_usd == 0],
+                [self.wind_bos_usd / (self.wind_plant_size_MW * 1e6),
+                 self.solar_bos_usd / (self.solar_system_size_MW_DC * 1e6)],
+                self.hybrid_BOS_usd / ((self.solar_system_size_MW_DC * 1e6) +
+                                       (self.wind_plant_size_MW * 1e6)))
@@ -1,3 +1,6 @@
+import numpy as np
+
+
 def hybrid_substation(input_dict):
     """
     Function to calculate Substation Cost in USD
@@ -33,3 +36,35 @@ def hybrid_substation(input_dict):
     substation_cost_usd = output_dict['substation_cost_usd']
 
     return substation_cost_usd
+
+
+def hybrid_substation_array(hybrid_substation_rating_MW, interconnect_voltage_kV):
+    """
+    Array version of hybrid_substation(), for N scenarios at once.
+
+    Parameters
+    -------
+    hybrid_substation_rating_MW
+        (in MW)
+
+    interconnect_voltage_kV
+        (in kV)
+
+
+    Returns:
+    -------
+    substation_cost
+        (in USD), numpy.ndarray
+
+    """
+    rating = np.asarray(hybrid_substation_rating_MW, dtype=float)
+    interconnect_voltage_kV = np.asarray(interconnect_voltage_kV, dtype=float)
+
+    with np.errstate(invalid='ignore'):
+        utility_substation_cost_usd = \
+            11652 * (interconnect_voltage_kV + rating) + \
+            11795 * (rating ** 0.3549) + 1526800
+
+    return np.select([rating > 15, rating > 10],
+                     [utility_substation_cost_usd, 1000000],
+                     500000).astype(float)
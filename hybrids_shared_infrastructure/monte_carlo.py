@@ -0,0 +1,268 @@
+"""
+Monte Carlo estimates (e.g. P10, P50 and P90) of the BOS cost of a hybrid plant,
+under uncertainty in its labor rates, crew rates, material prices, distances to
+interconnect and construction times.
+
+Samples are not run through run_hybrid_BOS() one at a time. The solar leg of all
+the samples of a block is computed at once by ScalarEngine, on arrays with one
+element per sample, and combined with the wind leg by
+ColumnarPostSimulationProcessing. The wind leg (LandBOSSE) cannot be evaluated
+on arrays: it is run once, for the nominal scenario, and its results are held
+constant across the samples (the uncertainties only apply to the solar leg and
+to the shared infrastructure).
+
+The samples are drawn in blocks of block_size samples, from independent random
+streams spawned from a single seed (numpy.random.SeedSequence.spawn()). The
+samples therefore only depend on the seed, the number of samples and the block
+size, and not on how the blocks are evaluated (one after the other, or at the
+same time by a pool of threads).
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from hybrids_shared_infrastructure.PostSimulationProcessing import \
+    ColumnarPostSimulationProcessing
+from SolarBOSSE.ScalarEngine import ScalarEngine
+
+
+# Inputs that may be uncertain: the scales of the rates and prices of the solar
+# project data (see ScalarEngine.scale_inputs), of nominal value 1, and inputs
+# of the hybrid scenario:
+UNCERTAIN_INPUTS = ScalarEngine.scale_inputs + \
+    ('distance_to_interconnect_mi', 'solar_dist_interconnect_mi',
+     'solar_construction_time_months', 'wind_construction_time_months')
+
+# Default uncertainty of each input, as the (low, mode, high) multiples of its
+# nominal value of a triangular distribution:
+DEFAULT_UNCERTAINTIES = {
+    'labor_rate_scale': (0.9, 1.0, 1.3),
+    'crew_rate_scale': (0.9, 1.0, 1.2),
+    'material_price_scale': (0.85, 1.0, 1.25),
+    'distance_to_interconnect_mi': (0.8, 1.0, 1.5),
+    'solar_construction_time_months': (0.9, 1.0, 1.3),
+    'wind_construction_time_months': (0.9, 1.0, 1.3),
+}
+
+# Results of each sample:
+RESULT_COLUMNS = ('hybrid_BOS_usd', 'hybrid_BOS_usd_watt', 'hybrid_gridconnection_usd',
+                  'hybrid_substation_usd', 'hybrid_management_development_usd',
+                  'solar_only_BOS_usd')
+
+# Inputs of ColumnarPostSimulationProcessing:
+_HYBRID_COLUMNS = ('hybrid_plant_size_MW', 'wind_plant_size_MW', 'solar_system_size_MW_DC',
+                   'shared_interconnection', 'shared_substation',
+                   'grid_interconnection_rating_MW', 'distance_to_interconnect_mi',
+                   'interconnect_voltage_kV', 'new_switchyard', 'hybrid_substation_rating_MW',
+                   'hybrid_construction_months', 'num_turbines',
+                   'solar_construction_time_months')
+
+
+def run_monte_carlo(base_scenario, num_samples, uncertainties=None, seed=None,
+                    latin_hypercube=False, quantiles=(0.1, 0.5, 0.9), block_size=16384,
+                    concurrency='serial', max_workers=None, wind_BOS=None, engine=None):
+    """
+    Returns quantiles of the hybrid BOS results of a scenario under uncertainty,
+    and the results of each sample.
+
+    Parameters
+    ----------
+    base_scenario : dict
+        Hybrid input dictionary (as read from hybrid_inputs.yaml), holding the
+        nominal value of each uncertain input of the scenario.
+
+    num_samples : int
+        Number of samples.
+
+    uncertainties : dict
+        For each uncertain input (among UNCERTAIN_INPUTS), the (low, mode, high)
+        multiples of its nominal value of its triangular distribution. Defaults
+        to DEFAULT_UNCERTAINTIES. Inputs left out are not uncertain.
+
+    seed : int or numpy.random.SeedSequence
+        Seed of the random streams. Runs with the same seed, number of samples
+        and block size draw the same samples.
+
+    latin_hypercube : bool
+        If True, the samples of each block are a Latin hypercube sample (each
+        uncertain input has exactly one sample in each of the equally likely
+        intervals of its distribution). Otherwise they are drawn independently.
+
+    quantiles : sequence of float
+        Quantiles to return, labeled P10, P50, etc.
+
+    block_size : int
+        Number of samples drawn from each random stream, and evaluated at once.
+
+    concurrency : str
+        'serial' to evaluate the blocks one after the other, or 'thread' to
+        evaluate them in a pool of max_workers threads.
+
+    max_workers : int
+        Number of threads, for concurrency 'thread'.
+
+    wind_BOS : dict
+        LandBOSSE results of the wind leg of base_scenario. By default, the wind
+        leg is run.
+
+    engine : ScalarEngine
+        Engine computing the solar leg. By default, the engine of the project
+        list of the solar leg (see scalar_engine() in main.py).
+
+    Returns
+    -------
+    tuple
+        The quantiles (a DataFrame with one row per quantile, and one column per
+        result of RESULT_COLUMNS), and the samples (a DataFrame with one row per
+        sample, with the uncertain inputs followed by the results).
+    """
+    if concurrency not in ('serial', 'thread'):
+        raise ValueError("concurrency must be 'serial' or 'thread', not " + repr(concurrency))
+
+    if uncertainties is None:
+        uncertainties = DEFAULT_UNCERTAINTIES
+    unknown_inputs = set(uncertainties).difference(UNCERTAIN_INPUTS)
+    if unknown_inputs:
+        raise ValueError('Unknown uncertain inputs: ' + ', '.join(sorted(unknown_inputs)))
+
+    from main import derive_hybrid_fields, wind_leg_input_dict, solar_leg_input_dict, \
+        run_wind_leg, scalar_engine
+
+    base_scenario = derive_hybrid_fields(dict(base_scenario))
+    if wind_BOS is None:
+        wind_BOS = run_wind_leg(wind_leg_input_dict(base_scenario))
+    if engine is None:
+        engine = scalar_engine(solar_leg_input_dict(base_scenario)['project_list'])
+
+    names = [name for name in UNCERTAIN_INPUTS if name in uncertainties]
+    distributions = [uncertainties[name] for name in names]
+    nominal = np.array([1.0 if name in ScalarEngine.scale_inputs else base_scenario[name]
+                        for name in names], dtype=float)
+
+    block_sizes = [min(block_size, num_samples - start)
+                   for start in range(0, num_samples, block_size)]
+    streams = _seed_sequence(seed).spawn(len(block_sizes))
+
+    def run_block(size, stream):
+        multiples = draw_samples(np.random.default_rng(stream), size, distributions,
+                                 latin_hypercube)
+        inputs = pd.DataFrame(multiples * nominal, columns=names)
+        return inputs.join(evaluate_samples(base_scenario, inputs, wind_BOS, engine))
+
+    if concurrency == 'thread':
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            blocks = list(executor.map(run_block, block_sizes, streams))
+    else:
+        blocks = [run_block(size, stream) for size, stream in zip(block_sizes, streams)]
+
+    if blocks:
+        samples = pd.concat(blocks, ignore_index=True)
+    else:
+        samples = pd.DataFrame(columns=names + list(RESULT_COLUMNS))
+
+    return quantile_table(samples, quantiles), samples
+
+
+def _seed_sequence(seed):
+    return seed if isinstance(seed, np.random.SeedSequence) \
+        else np.random.SeedSequence(seed)
+
+
+def draw_samples(rng, size, distributions, latin_hypercube=False):
+    """
+    Returns size samples (one per row) of the triangular distributions (one
+    per column), given as (low, mode, high), drawn with the random generator
+    rng.
+    """
+    if not distributions:
+        return np.empty((size, 0))
+
+    dimensions = len(distributions)
+    if latin_hypercube:
+        # One sample in each of the size intervals of every distribution, in an
+        # independent random order for each distribution:
+        strata = rng.permuted(np.tile(np.arange(size), (dimensions, 1)), axis=1).T
+        uniforms = (strata + rng.random((size, dimensions))) / size
+    else:
+        uniforms = rng.random((size, dimensions))
+
+    low, mode, high = (np.array(parameter, dtype=float) for parameter in zip(*distributions))
+    return triangular_ppf(uniforms, low, mode, high)
+
+
+def triangular_ppf(quantile, low, mode, high):
+    """
+    Inverse of the cumulative distribution function of the triangular
+    distribution (low, mode, high).
+    """
+    low, mode, high = (np.asarray(parameter, dtype=float) for parameter in (low, mode, high))
+    width = high - low
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mode_quantile = np.where(width > 0, (mode - low) / width, 0)
+        below_mode = low + np.sqrt(quantile * width * (mode - low))
+        above_mode = high - np.sqrt((1 - quantile) * width * (high - mode))
+
+    return np.where(quantile < mode_quantile, below_mode, above_mode)
+
+
+def evaluate_samples(base_scenario, inputs, wind_BOS, engine):
+    """
+    Returns the results (RESULT_COLUMNS) of the samples of base_scenario with
+    the uncertain inputs of each row of inputs, evaluated at once.
+    """
+    from main import derive_hybrid_fields, solar_leg_input_dict, run_solar_leg_on_engine
+
+    num_samples = len(inputs)
+    scenario = dict(base_scenario)
+    scales = dict()
+    for name in inputs.columns:
+        if name in ScalarEngine.scale_inputs:
+            scales[name] = inputs[name].to_numpy()
+        else:
+            scenario[name] = inputs[name].to_numpy()
+    derive_hybrid_fields(scenario)
+
+    solar_input_dict = solar_leg_input_dict(scenario)
+    solar_input_dict.update(scales)
+    solar_BOS = run_solar_leg_on_engine(solar_input_dict, engine)
+
+    index = pd.RangeIndex(num_samples)
+    hybrids_inputs = pd.DataFrame({key: scenario[key] for key in _HYBRID_COLUMNS},
+                                  index=index)
+    wind_BOS = _leg_samples_frame(wind_BOS, index)
+    solar_BOS = _leg_samples_frame(solar_BOS, index)
+
+    # Same as combine_BOS_results(), legs of size 0 have no management cost:
+    if scenario['wind_plant_size_MW'] <= 0:
+        wind_BOS['total_management_cost'] = 0
+    if scenario['solar_system_size_MW_DC'] <= 0:
+        solar_BOS['total_management_cost'] = 0
+
+    hybrid_BOS = ColumnarPostSimulationProcessing(hybrids_inputs, wind_BOS, solar_BOS)
+
+    results = pd.DataFrame(index=index)
+    for column in RESULT_COLUMNS[:-1]:
+        results[column] = getattr(hybrid_BOS, column)
+    results['solar_only_BOS_usd'] = \
+        ColumnarPostSimulationProcessing.input_array(solar_BOS, 'total_bos_cost')
+    return results
+
+
+def _leg_samples_frame(leg_results, index):
+    """
+    Returns the numeric results of a leg (floats, or arrays with one element per
+    sample) as a DataFrame with one row per sample.
+    """
+    return pd.DataFrame({key: value for key, value in leg_results.items()
+                         if isinstance(value, (int, float, np.number, np.ndarray))},
+                        index=index)
+
+
+def quantile_table(samples, quantiles):
+    """
+    Returns the quantiles of the results of the samples, labeled P10, P50, etc.
+    """
+    table = samples[list(RESULT_COLUMNS)].astype(float).quantile(list(quantiles))
+    table.index = ['P{:g}'.format(100 * quantile) for quantile in quantiles]
+    return table
@@ -0,0 +1,187 @@
+"""
+Searches for the split of a hybrid plant between wind and solar that minimizes
+its BOS cost per watt, at a fixed grid interconnection.
+
+The capacity of the plant (hybrid_plant_size_MW) is fixed, so a split is set by
+its number of turbines: the solar plant gets the rest of the capacity. The BOS
+cost per watt is piecewise smooth in the number of turbines. The pieces start
+where the size of a leg crosses a breakpoint of the cost curves (e.g. the 15 MW
+switch between the distributed and utility scale grid connection models), or
+where the number of turbines crosses a breakpoint of site_facility(). Instead of
+evaluating every number of turbines, each piece is searched on its own, by
+repeatedly evaluating a few evenly spaced numbers of turbines and narrowing the
+piece around the best of them. The candidates of all the pieces are evaluated
+together, in one batch per round (see run_hybrid_BOS_batch() in main.py), with
+the solar legs computed by ScalarEngine.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+
+# Sizes of a leg (in MW) at which the cost curves change pieces: legs smaller
+# than 1 MW are not modeled, 10, 15 and 150 MW are breakpoints of the grid
+# connection, substation and management costs, and 20, 50, 300 and 500 MW are
+# breakpoints of the SolarBOSSE collection and racking costs:
+SIZE_BREAKPOINTS_MW = (1, 10, 15, 20, 50, 150, 300, 500)
+
+# Numbers of turbines at which site_facility() changes pieces:
+TURBINE_BREAKPOINTS = (30, 100)
+
+
+def optimize_capacity_split(base_scenario, hybrid_plant_size_MW=None, min_turbines=0,
+                            max_turbines=None, points_per_piece=5, evaluate=None):
+    """
+    Returns the number of turbines (and solar system size) minimizing the BOS cost
+    per watt (hybrid_BOS_usd_watt) of a hybrid plant of fixed capacity, along with
+    all the splits evaluated by the search.
+
+    Parameters
+    ----------
+    base_scenario : dict
+        Hybrid input dictionary (as read from hybrid_inputs.yaml). Its
+        num_turbines and solar_system_size_MW_DC are replaced by those of each
+        split, and its other inputs (e.g. grid_interconnection_rating_MW) are
+        kept.
+
+    hybrid_plant_size_MW : float
+        Capacity shared by the wind and solar plants. Defaults to the capacity
+        of base_scenario.
+
+    min_turbines, max_turbines : int
+        Bounds of the number of turbines. max_turbines defaults to (and is
+        capped at) the number of turbines fitting in hybrid_plant_size_MW.
+
+    points_per_piece : int
+        Number of splits evaluated per piece of the cost curves in each round
+        of the search (at least 4). Pieces with no more splits than that are
+        searched exhaustively.
+
+    evaluate : callable
+        Function returning the flattened results (with a hybrid_BOS_usd_watt
+        column) of a DataFrame of scenarios, indexed like it. Defaults to
+        run_hybrid_BOS_batch(), with the solar legs computed by ScalarEngine.
+
+    Returns
+    -------
+    tuple
+        The optimum (a pandas.Series), and the frontier: a DataFrame with one row
+        per split evaluated, sorted by number of turbines. Both hold num_turbines,
+        wind_plant_size_MW and solar_system_size_MW_DC, followed by the results
+        of the split.
+    """
+    if points_per_piece < 4:
+        raise ValueError('points_per_piece must be at least 4, not ' + str(points_per_piece))
+
+    if evaluate is None:
+        from main import run_hybrid_BOS_batch
+
+        def evaluate(scenarios):
+            return run_hybrid_BOS_batch(scenarios, use_scalar_engine=True)
+
+    turbine_rating_MW = base_scenario['turbine_rating_MW']
+    if hybrid_plant_size_MW is None:
+        hybrid_plant_size_MW = (base_scenario['num_turbines'] or 0) * turbine_rating_MW + \
+            base_scenario['solar_system_size_MW_DC']
+
+    # The tolerance keeps splits whose solar plant is (to rounding error) 0 MW:
+    turbines_fitting = int(math.floor(hybrid_plant_size_MW / turbine_rating_MW + 1e-9))
+    max_turbines = turbines_fitting if max_turbines is None \
+        else min(max_turbines, turbines_fitting)
+    if min_turbines > max_turbines:
+        raise ValueError('No split has between ' + str(min_turbines) + ' and ' +
+                         str(max_turbines) + ' turbines')
+
+    pieces = _pieces(min_turbines, max_turbines, turbine_rating_MW, hybrid_plant_size_MW)
+
+    usd_watt = dict()
+    rows = dict()
+    while pieces:
+        candidates = sorted({num_turbines for piece in pieces
+                             for num_turbines in _piece_points(piece, points_per_piece)
+                             if num_turbines not in usd_watt})
+        if candidates:
+            results = _evaluate_splits(base_scenario, candidates, turbine_rating_MW,
+                                       hybrid_plant_size_MW, evaluate)
+            for num_turbines, row in zip(candidates, results.to_dict('records')):
+                rows[num_turbines] = row
+                usd_watt[num_turbines] = row['hybrid_BOS_usd_watt']
+
+        pieces = [narrowed for narrowed in
+                  (_narrow(piece, points_per_piece, usd_watt) for piece in pieces)
+                  if narrowed is not None]
+
+    frontier = pd.DataFrame([rows[num_turbines] for num_turbines in sorted(rows)])
+    optimum = frontier.loc[frontier['hybrid_BOS_usd_watt'].idxmin()]
+    return optimum, frontier
+
+
+def _pieces(min_turbines, max_turbines, turbine_rating_MW, hybrid_plant_size_MW):
+    """
+    Returns the (first, last) numbers of turbines of each piece of the cost
+    curves between min_turbines and max_turbines.
+    """
+    # First number of turbines of each piece. The wind plant crosses a
+    # breakpoint (size > breakpoint) with the turbine after breakpoint / rating,
+    # and the solar plant (size <= breakpoint) at (plant size - breakpoint) /
+    # rating:
+    starts = set(TURBINE_BREAKPOINTS)
+    for breakpoint_MW in SIZE_BREAKPOINTS_MW:
+        starts.add(int(math.floor(breakpoint_MW / turbine_rating_MW)) + 1)
+        starts.add(int(math.ceil((hybrid_plant_size_MW - breakpoint_MW) / turbine_rating_MW)))
+
+    starts = sorted(start for start in starts if min_turbines < start <= max_turbines)
+    firsts = [min_turbines] + starts
+    lasts = [start - 1 for start in starts] + [max_turbines]
+    return list(zip(firsts, lasts))
+
+
+def _piece_points(piece, points_per_piece):
+    """
+    Returns the numbers of turbines evaluated in a piece in a round of the
+    search: all of them if there are no more than points_per_piece, and
+    points_per_piece evenly spaced ones (including both ends) otherwise.
+    """
+    first, last = piece
+    if last - first + 1 <= points_per_piece:
+        return list(range(first, last + 1))
+    return sorted(set(int(num_turbines) for num_turbines in
+                      np.round(np.linspace(first, last, points_per_piece))))
+
+
+def _narrow(piece, points_per_piece, usd_watt):
+    """
+    Returns the part of a piece left to search after a round (between the
+    neighbours of its best point), or None if the piece was searched
+    exhaustively.
+    """
+    first, last = piece
+    if last - first + 1 <= points_per_piece:
+        return None
+
+    # Splits whose cost is NaN (e.g. of a leg that failed) are never the best:
+    points = _piece_points(piece, points_per_piece)
+    best = min(range(len(points)),
+               key=lambda i: np.nan_to_num(usd_watt[points[i]], nan=np.inf))
+    return points[max(best - 1, 0)], points[min(best + 1, len(points) - 1)]
+
+
+def _evaluate_splits(base_scenario, candidates, turbine_rating_MW, hybrid_plant_size_MW,
+                     evaluate):
+    """
+    Returns the results of the splits with the given numbers of turbines, with
+    the split in the first columns.
+    """
+    splits = pd.DataFrame({'num_turbines': candidates})
+    splits['wind_plant_size_MW'] = splits['num_turbines'] * turbine_rating_MW
+    splits['solar_system_size_MW_DC'] = \
+        np.maximum(hybrid_plant_size_MW - splits['wind_plant_size_MW'], 0.0)
+
+    scenarios = pd.DataFrame([base_scenario] * len(candidates))
+    scenarios['num_turbines'] = splits['num_turbines']
+    scenarios['solar_system_size_MW_DC'] = splits['solar_system_size_MW_DC']
+
+    results = evaluate(scenarios)
+    return pd.concat([splits, results.drop(columns=splits.columns, errors='ignore')],
+                     axis=1)
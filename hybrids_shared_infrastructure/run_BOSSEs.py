@@ -1,14 +1,87 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 from LandBOSSE.landbosse.landbosse_api.run import run_landbosse
 from SolarBOSSE.main import run_solarbosse
+from SolarBOSSE.PipelineStats import pipeline_stats
+from SolarBOSSE.TraceHooks import trace_hooks
 from hybrids_shared_infrastructure.GridConnectionCost import hybrid_gridconnection
 
 
-def run_BOSSEs(hybrids_input_dict):
+def run_BOSSEs(hybrids_input_dict, concurrency='serial', executor=None):
     """
     Runs 1) LandBOSSE, and 2) SolarBOSSE as mutually exclusive BOS models.
 
+    The two legs share no state, so they can be run at the same time. Both legs
+    are joined before this function returns.
+
+    Parameters
+    ----------
+    hybrids_input_dict : dict
+        Hybrid input dictionary, with derived fields.
+
+    concurrency : str
+        'serial' (default) runs the wind leg and then the solar leg in the
+        calling thread. 'thread' runs both legs at once in a pool of two
+        threads, and 'process' in a pool of two worker processes.
+
+    executor : concurrent.futures.Executor
+        Optional, already running executor the legs are submitted to. Pass a
+        long lived executor to avoid starting a new pool (and re-reading the
+        project data in new worker processes) on every call. concurrency is
+        ignored when an executor is given.
+
+    Returns
+    -------
+    tuple
+        LandBOSSE results, SolarBOSSE results
     """
+    if concurrency not in ('serial', 'thread', 'process'):
+        raise ValueError("concurrency must be one of 'serial', 'thread' or 'process'")
+
     # <><><><><><><><><><><><><><><> RUNNING LandBOSSE API <><><><><><><><><><><><><><><><>
+    wind_input_dict = wind_leg_input_dict(hybrids_input_dict)
+    if trace_hooks.enabled:
+        trace_hooks.emit('derived_inputs', leg='wind', **wind_input_dict)
+    # <><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><
+
+
+    # <><><><><><><><><><><><><><><> RUNNING SolarBOSSE API <><><><><><><><><><><><><><><><>
+    solar_input_dict = solar_leg_input_dict(hybrids_input_dict)
+    if trace_hooks.enabled:
+        trace_hooks.emit('derived_inputs', leg='solar', **solar_input_dict)
+    # <><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><
+
+    if executor is None and concurrency == 'serial':
+        LandBOSSE_BOS_results = run_wind_leg(wind_input_dict)
+        SolarBOSSE_results = run_solar_leg(solar_input_dict)
+        return LandBOSSE_BOS_results, SolarBOSSE_results
+
+    if executor is None:
+        if concurrency == 'thread':
+            executor_class = ThreadPoolExecutor
+        else:
+            executor_class = ProcessPoolExecutor
+
+        with executor_class(max_workers=2) as leg_executor:
+            return _run_legs(leg_executor, wind_input_dict, solar_input_dict)
+
+    return _run_legs(executor, wind_input_dict, solar_input_dict)
+
+
+def _run_legs(executor, wind_input_dict, solar_input_dict):
+    """
+    Submits both legs to executor, and waits for their results.
+    """
+    wind_future = executor.submit(run_wind_leg, wind_input_dict)
+    solar_future = executor.submit(run_solar_leg, solar_input_dict)
+    return wind_future.result(), solar_future.result()
+
+
+def wind_leg_input_dict(hybrids_input_dict):
+    """
+    Returns the input dictionary passed to the LandBOSSE API for the wind portion
+    of a hybrid plant.
+    """
     wind_input_dict = dict()
     wind_input_dict['num_turbines'] = hybrids_input_dict['num_turbines']
     wind_input_dict['turbine_rating_MW'] = hybrids_input_dict['turbine_rating_MW']
@@ -21,9 +94,6 @@ def run_BOSSEs(hybrids_input_dict):
 
     wind_input_dict['grid_system_size_MW'] = hybrids_input_dict['grid_interconnection_rating_MW'] / 2
 
-    # delete line once finished debugging:
-    print('wind grid rating : ', wind_input_dict['grid_system_size_MW'])
-
     wind_input_dict['substation_rating_MW'] = hybrids_input_dict['hybrid_substation_rating_MW'] / 2
 
     if 'override_total_management_cost' in hybrids_input_dict:
@@ -36,18 +106,16 @@ def run_BOSSEs(hybrids_input_dict):
     if 'development_labor_cost_usd' in hybrids_input_dict:
         wind_input_dict['development_labor_cost_usd'] = hybrids_input_dict['development_labor_cost_usd']
 
-    if hybrids_input_dict['wind_plant_size_MW'] < 1:
-        LandBOSSE_BOS_results = dict()
-        LandBOSSE_BOS_results['total_bos_cost'] = 0
-    else:
-        LandBOSSE_BOS_results = run_landbosse(wind_input_dict)
-    # <><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><
+    return wind_input_dict
 
 
-    # <><><><><><><><><><><><><><><> RUNNING SolarBOSSE API <><><><><><><><><><><><><><><><>
+def solar_leg_input_dict(hybrids_input_dict):
+    """
+    Returns the input dictionary passed to the SolarBOSSE API for the solar portion
+    of a hybrid plant.
+    """
     solar_system_size = hybrids_input_dict['solar_system_size_MW_DC']
     solar_input_dict = dict()
-    BOS_results = dict()
     solar_input_dict['project_list'] = 'project_list_50MW'
     solar_input_dict['system_size_MW_DC'] = solar_system_size
 
@@ -84,16 +152,36 @@ def run_BOSSEs(hybrids_input_dict):
     else:
         solar_input_dict['grid_size_MW_AC'] = solar_input_dict['grid_system_size_MW_DC']
 
-    # delete line once finished debugging:
-    print('solar grid rating : ', solar_input_dict['grid_size_MW_AC'])
-
     solar_input_dict['substation_rating_MW'] = hybrids_input_dict['hybrid_substation_rating_MW'] / 2
 
-    if hybrids_input_dict['solar_system_size_MW_DC'] < 1:
+    return solar_input_dict
+
+
+@pipeline_stats.timed('hybrid.wind_leg')
+def run_wind_leg(wind_input_dict):
+    """
+    Runs LandBOSSE for the wind portion of a hybrid plant. Plants smaller than 1 MW
+    are not modeled, and return a total BOS cost of 0.
+    """
+    if wind_input_dict['num_turbines'] * wind_input_dict['turbine_rating_MW'] < 1:
+        LandBOSSE_BOS_results = dict()
+        LandBOSSE_BOS_results['total_bos_cost'] = 0
+    else:
+        LandBOSSE_BOS_results = run_landbosse(wind_input_dict)
+
+    return LandBOSSE_BOS_results
+
+
+@pipeline_stats.timed('hybrid.solar_leg')
+def run_solar_leg(solar_input_dict):
+    """
+    Runs SolarBOSSE for the solar portion of a hybrid plant. Plants smaller than 1 MW
+    are not modeled, and return a total BOS cost of 0.
+    """
+    if solar_input_dict['system_size_MW_DC'] < 1:
         SolarBOSSE_results = dict()
         SolarBOSSE_results['total_bos_cost'] = 0
     else:
         SolarBOSSE_results, detailed_results = run_solarbosse(solar_input_dict)
-    # <><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><><
 
-    return LandBOSSE_BOS_results, SolarBOSSE_results
+    return SolarBOSSE_results
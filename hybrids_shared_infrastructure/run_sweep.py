@@ -0,0 +1,191 @@
+"""
+Runs sweeps of hybrid BOS scenarios across a pool of worker processes.
+
+Every worker process is initialized once with the base scenario of the sweep. The
+initializer also caches the SolarBOSSE project list and project data workbooks in
+XlsxDataframeCache, and runs the wind leg of the base scenario once so that the
+LandBOSSE inputs are cached as well. Tasks sent to the workers then only carry
+the (small) dictionary of inputs that differ from the base scenario.
+
+The stats of the stages run by the workers (see SolarBOSSE.PipelineStats) are
+sent back with the results of each scenario, and added to the pipeline_stats of
+the parent process.
+
+By default, the parent process puts the SolarBOSSE workbooks in shared memory
+once, and the workers attach to it instead of each holding a copy of the
+numeric columns of every sheet (see SharedProjectData).
+
+Sweeps too large to hold in memory can be streamed from a scenario file to a
+result file instead (see stream_sweep.py).
+"""
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import pandas as pd
+
+from hybrids_shared_infrastructure.run_BOSSEs import wind_leg_input_dict, \
+    solar_leg_input_dict, run_wind_leg
+from SolarBOSSE.main import preload_project_data, share_project_data, \
+    attach_project_data
+from SolarBOSSE.PipelineStats import pipeline_stats
+
+
+# Base scenario of the sweep, set in each worker process by _initialize_worker():
+_base_scenario = None
+
+# Project data attached by a worker process, when the sweep shares it (kept here so
+# that the shared memory segment stays mapped while the worker runs):
+_shared_project_data = None
+
+# Results of the legs already run by a worker process (see run_hybrid_BOS_flat()).
+# Cleared once it holds more than _max_leg_results legs, to bound worker memory
+# on long sweeps:
+_leg_results = dict()
+_max_leg_results = 4096
+
+
+def run_sweep(base_scenario, scenario_deltas, max_workers=None, chunksize=1,
+              mp_context=None, shared_memory=True):
+    """
+    Runs every scenario of a sweep in a pool of worker processes.
+
+    Parameters
+    ----------
+    base_scenario : dict
+        Hybrid input dictionary (as read from hybrid_inputs.yaml) shared by
+        all the scenarios of the sweep.
+
+    scenario_deltas : iterable of dict
+        For each scenario, the inputs that differ from base_scenario. Fields
+        derived from the inputs (e.g. wind_plant_size_MW) are recomputed for
+        every scenario, and need not be included.
+
+    max_workers : int
+        Number of worker processes. Defaults to the number of CPUs.
+
+    chunksize : int
+        Number of scenarios sent to a worker process at a time.
+
+    mp_context : multiprocessing context
+        Context used to start the worker processes. Defaults to the platform
+        default.
+
+    shared_memory : bool
+        If True (the default), the SolarBOSSE project data is put in shared
+        memory once and shared by all the workers. If False, each worker reads
+        its own copy.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per scenario, in the order of scenario_deltas. Columns are the
+        scenario deltas, followed by the flattened results of the scenario
+        (see flatten_BOS_results() in main.py).
+    """
+    scenario_deltas = [dict(delta) for delta in scenario_deltas]
+
+    with sweep_executor(base_scenario, max_workers, mp_context, shared_memory) as executor:
+        rows = []
+        for row, worker_stats in executor.map(run_scenario_delta_with_stats,
+                                              scenario_deltas, chunksize=chunksize):
+            rows.append(row)
+            pipeline_stats.merge(worker_stats)
+
+    deltas = pd.DataFrame(scenario_deltas, index=range(len(scenario_deltas)))
+    results = pd.DataFrame(rows, index=range(len(rows)))
+    return pd.concat([deltas, results.drop(columns=deltas.columns,
+                                           errors='ignore')], axis=1)
+
+
+@contextmanager
+def sweep_executor(base_scenario, max_workers=None, mp_context=None, shared_memory=True):
+    """
+    Starts the pool of worker processes of a sweep, each initialized once with
+    the base scenario of the sweep, and shuts it down on exit. If shared_memory
+    is True, the SolarBOSSE project data is put in shared memory for the
+    workers, and freed on exit.
+
+    The parameters are those of run_sweep(). Yields the ProcessPoolExecutor,
+    whose workers run the scenario deltas submitted with
+    run_scenario_delta_with_stats().
+
+    Example
+    -------
+    with sweep_executor(base_scenario) as executor:
+        future = executor.submit(run_scenario_delta_with_stats, {'num_turbines': 10})
+    """
+    from main import derive_hybrid_fields
+
+    shared_project_data = None
+    if shared_memory:
+        hybrids_input_dict = derive_hybrid_fields(dict(base_scenario))
+        solar_input_dict = solar_leg_input_dict(hybrids_input_dict)
+        shared_project_data = share_project_data(solar_input_dict['project_list'])
+
+    try:
+        manifest = shared_project_data.manifest if shared_memory else None
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 mp_context=mp_context,
+                                 initializer=_initialize_worker,
+                                 initargs=(dict(base_scenario), manifest)) as executor:
+            yield executor
+    finally:
+        if shared_project_data is not None:
+            shared_project_data.close()
+            shared_project_data.unlink()
+
+
+def _initialize_worker(base_scenario, manifest=None):
+    """
+    Stores the base scenario of the sweep, and warms the project data caches of
+    the worker process. If manifest is given, the SolarBOSSE project data is
+    attached from shared memory instead of being read.
+    """
+    from main import derive_hybrid_fields
+
+    global _base_scenario, _shared_project_data
+    _base_scenario = base_scenario
+    _leg_results.clear()
+
+    hybrids_input_dict = derive_hybrid_fields(dict(base_scenario))
+
+    if manifest is not None:
+        _shared_project_data = attach_project_data(manifest)
+    else:
+        solar_input_dict = solar_leg_input_dict(hybrids_input_dict)
+        preload_project_data(solar_input_dict['project_list'])
+
+    # LandBOSSE reads (and caches) its inputs the first time it runs:
+    wind_input_dict = wind_leg_input_dict(hybrids_input_dict)
+    run_wind_leg(wind_input_dict)
+
+    # Only the stats of the scenarios are sent back to the parent process (with
+    # a fork context, the stats of the parent process are also inherited):
+    pipeline_stats.reset()
+
+
+def run_scenario_delta(scenario_delta):
+    """
+    Runs the base scenario of the sweep, updated with scenario_delta, in a worker
+    process. Returns the flattened results of the scenario.
+    """
+    from main import derive_hybrid_fields, run_hybrid_BOS_flat
+
+    hybrids_input_dict = dict(_base_scenario)
+    hybrids_input_dict.update(scenario_delta)
+    hybrids_input_dict = derive_hybrid_fields(hybrids_input_dict)
+
+    if len(_leg_results) > _max_leg_results:
+        _leg_results.clear()
+
+    return run_hybrid_BOS_flat(hybrids_input_dict, _leg_results)
+
+
+def run_scenario_delta_with_stats(scenario_delta):
+    """
+    Runs a scenario with run_scenario_delta(), and returns its results along
+    with the stats of the stages it ran.
+    """
+    pipeline_stats.reset()
+    row = run_scenario_delta(scenario_delta)
+    return row, pipeline_stats.as_dict()
@@ -0,0 +1,333 @@
+"""
+Runs sweeps of hybrid BOS scenarios read from, and written to, files as a stream.
+
+run_sweep() builds the list of all the scenario deltas, and collects the results
+of every scenario before returning them. For sweeps of millions of scenarios,
+run_streaming_sweep() instead reads the scenario deltas one at a time from a
+CSV, JSON lines or YAML stream file (see read_scenarios()), and appends the
+results of each scenario to the output file as soon as it completes (see
+ResultWriter). A scenario that fails is written as a row with its error, and
+does not stop the sweep.
+
+At most max_pending scenarios are in flight (submitted to the workers, and not
+yet written) at any time: once that many are pending, the next scenario is not
+read until one of them completes. The reader therefore never runs ahead of the
+workers, and memory stays constant however long the sweep. The workers are
+those of run_sweep(), initialized once with the base scenario of the sweep.
+"""
+import csv
+import json
+import os
+from concurrent.futures import wait, FIRST_COMPLETED
+
+import numpy as np
+import yaml
+
+from SolarBOSSE.PipelineStats import pipeline_stats
+
+
+# File formats of scenario and result files, by extension:
+FILE_FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl',
+                '.yaml': 'yaml', '.yml': 'yaml'}
+
+
+def file_format_of(path, file_format=None):
+    """
+    Returns file_format if given, and the format of path (see FILE_FORMATS)
+    otherwise.
+    """
+    if file_format is None:
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in FILE_FORMATS:
+            raise ValueError('Unknown file format of ' + path)
+        file_format = FILE_FORMATS[extension]
+
+    if file_format not in ('csv', 'jsonl', 'yaml'):
+        raise ValueError("file_format must be 'csv', 'jsonl' or 'yaml', not " +
+                         repr(file_format))
+    return file_format
+
+
+def read_scenarios(path, file_format=None):
+    """
+    Reads the scenario deltas of a file one at a time, without reading the
+    whole file in memory.
+
+    Parameters
+    ----------
+    path : str
+        Path of the file: a CSV file with one scenario per row, a JSON lines
+        file with one scenario object per line, or a YAML stream with one
+        scenario mapping per document (separated by ---).
+
+    file_format : str
+        'csv', 'jsonl' or 'yaml'. Defaults to the format of the extension of
+        path.
+
+    Yields
+    ------
+    dict
+        The inputs of each scenario that differ from the base scenario of the
+        sweep. Empty CSV cells (and blank lines or empty documents) are left
+        out, and CSV values are converted to booleans, integers or floats
+        where they can be.
+    """
+    file_format = file_format_of(path, file_format)
+
+    with open(path, 'r', newline='' if file_format == 'csv' else None) as stream:
+        if file_format == 'csv':
+            for row in csv.DictReader(stream):
+                yield {key: _parse_csv_value(value) for key, value in row.items()
+                       if value not in (None, '')}
+
+        elif file_format == 'jsonl':
+            for line in stream:
+                if line.strip():
+                    yield json.loads(line)
+
+        else:
+            for document in yaml.safe_load_all(stream):
+                if document is not None:
+                    yield document
+
+
+def scenario_columns(path, file_format=None):
+    """
+    Returns the inputs set by the scenarios of a file: the columns of a CSV
+    file, or the keys of the first scenario of a JSON lines or YAML stream file.
+    """
+    file_format = file_format_of(path, file_format)
+    if file_format == 'csv':
+        with open(path, 'r', newline='') as stream:
+            return next(csv.reader(stream), [])
+
+    first_scenario = next(read_scenarios(path, file_format), dict())
+    return list(first_scenario)
+
+
+def output_columns(scenario_columns, result_columns):
+    """
+    Returns the columns of the rows written by stream_sweep(): the index of the
+    scenario, its inputs, its results and its error (if it failed).
+    """
+    columns = ['scenario'] + list(scenario_columns)
+    columns.extend(column for column in result_columns if column not in columns)
+    columns.append('error')
+    return columns
+
+
+def _parse_csv_value(value):
+    """
+    Returns the boolean, integer or float of a CSV cell, or the cell itself.
+    """
+    if value in ('True', 'true'):
+        return True
+    if value in ('False', 'false'):
+        return False
+    for parse in (int, float):
+        try:
+            return parse(value)
+        except ValueError:
+            pass
+    return value
+
+
+class ResultWriter:
+    """
+    Appends the rows of results of a sweep to a CSV or JSON lines file, one row
+    at a time.
+
+    The columns of a CSV file are given when it is opened (see output_columns()),
+    or else are those of the first row written. Rows may leave some of them out
+    (their cells are left empty), but may not add new ones: sweeps whose
+    scenarios set different inputs should be written to JSON lines files.
+
+    Example
+    -------
+    with ResultWriter('results.jsonl') as writer:
+        writer.write({'scenario': 0, 'hybrid_BOS_usd': 1.2e8})
+    """
+
+    def __init__(self, path, file_format=None, columns=None):
+        """
+        Parameters
+        ----------
+        path : str
+            Path of the file, which is overwritten.
+
+        file_format : str
+            'csv' or 'jsonl'. Defaults to the format of the extension of path.
+
+        columns : list of str
+            Columns of a CSV file. Defaults to the columns of the first row
+            written.
+        """
+        self.file_format = file_format_of(path, file_format)
+        if self.file_format == 'yaml':
+            raise ValueError('Results cannot be written to YAML files')
+
+        self._file = open(path, 'w', newline='' if self.file_format == 'csv' else None)
+        self._csv_writer = None
+        self.rows_written = 0
+        if self.file_format == 'csv' and columns is not None:
+            self._start_csv(columns)
+
+    def write(self, row):
+        """
+        Appends a row (a dictionary) to the file.
+        """
+        if self.file_format == 'jsonl':
+            self._file.write(json.dumps(row, default=_json_default) + '\n')
+        else:
+            if self._csv_writer is None:
+                self._start_csv(row)
+            new_columns = set(row).difference(self._csv_writer.fieldnames)
+            if new_columns:
+                raise ValueError('Columns missing from the CSV file: ' +
+                                 ', '.join(sorted(new_columns)))
+            self._csv_writer.writerow(row)
+
+        self.rows_written += 1
+
+    def _start_csv(self, columns):
+        self._csv_writer = csv.DictWriter(self._file, fieldnames=list(columns))
+        self._csv_writer.writeheader()
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _json_default(value):
+    # NumPy integers and booleans (NumPy floats are floats) are written as their
+    # Python counterparts:
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError('Object of type ' + type(value).__name__ + ' is not JSON serializable')
+
+
+def run_streaming_sweep(base_scenario, scenarios_path, output_path, max_workers=None,
+                        max_pending=None, mp_context=None, shared_memory=True,
+                        scenarios_format=None, output_format=None):
+    """
+    Runs every scenario of a scenario file in a pool of worker processes, and
+    writes their results to an output file as they complete.
+
+    Parameters
+    ----------
+    base_scenario : dict
+        Hybrid input dictionary (as read from hybrid_inputs.yaml) shared by
+        all the scenarios of the sweep.
+
+    scenarios_path : str
+        File of scenario deltas (see read_scenarios()).
+
+    output_path : str
+        CSV or JSON lines file the results are written to (see ResultWriter).
+
+    max_workers : int
+        Number of worker processes. Defaults to the number of CPUs.
+
+    max_pending : int
+        Maximum number of scenarios in flight. Defaults to 4 per worker.
+
+    mp_context : multiprocessing context
+        Context used to start the worker processes. Defaults to the platform
+        default.
+
+    shared_memory : bool
+        If True (the default), the SolarBOSSE project data is put in shared
+        memory once and shared by all the workers (see run_sweep()).
+
+    scenarios_format, output_format : str
+        Formats of the scenario and output files. Default to the formats of
+        their extensions.
+
+    Returns
+    -------
+    int
+        Number of scenarios run. Each row of the output file holds the index of
+        the scenario in the scenario file (scenario), its deltas, and its
+        flattened results (see flatten_BOS_results() in main.py), or the error
+        of the scenario (error) if it failed. Rows are written in the order the
+        scenarios complete. The columns of a CSV output file are set from the
+        inputs of the scenario file (see scenario_columns()).
+    """
+    from main import FLAT_RESULT_COLUMNS
+    from hybrids_shared_infrastructure.run_sweep import sweep_executor
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_pending is None:
+        max_pending = 4 * max_workers
+
+    # The columns of a CSV file are written before any scenario completes:
+    columns = None
+    if file_format_of(output_path, output_format) == 'csv':
+        columns = output_columns(scenario_columns(scenarios_path, scenarios_format),
+                                 FLAT_RESULT_COLUMNS)
+
+    with sweep_executor(base_scenario, max_workers, mp_context, shared_memory) as executor, \
+            ResultWriter(output_path, output_format, columns) as writer:
+        return stream_sweep(read_scenarios(scenarios_path, scenarios_format), writer,
+                            executor, max_pending)
+
+
+def stream_sweep(scenario_deltas, writer, executor, max_pending, run=None):
+    """
+    Runs the scenario deltas in executor, with at most max_pending of them in
+    flight, and writes their results with writer as they complete.
+
+    scenario_deltas is only advanced when fewer than max_pending scenarios are
+    in flight. run is called by the workers with each scenario delta, and
+    returns the flattened results of the scenario along with the stats of the
+    stages it ran (added to pipeline_stats). It defaults to the scenario runner
+    of the workers of run_sweep() (see sweep_executor()). The row of a scenario that raises holds its
+    error instead of its results. Returns the number of scenarios run.
+    """
+    if max_pending < 1:
+        raise ValueError('max_pending must be at least 1, not ' + str(max_pending))
+
+    if run is None:
+        from hybrids_shared_infrastructure.run_sweep import run_scenario_delta_with_stats
+        run = run_scenario_delta_with_stats
+
+    pending = dict()
+    num_scenarios = 0
+
+    def write_completed():
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            index, scenario_delta = pending.pop(future)
+            row = {'scenario': index}
+            row.update(scenario_delta)
+            try:
+                results, worker_stats = future.result()
+            except Exception as error:
+                row['error'] = type(error).__name__ + ': ' + str(error)
+            else:
+                pipeline_stats.merge(worker_stats)
+                row.update((key, value) for key, value in results.items()
+                           if key not in row)
+            writer.write(row)
+        writer.flush()
+
+    for index, scenario_delta in enumerate(scenario_deltas):
+        pending[executor.submit(run, scenario_delta)] = (index, scenario_delta)
+        num_scenarios += 1
+        # The next scenario is not read until one of those in flight completes:
+        if len(pending) >= max_pending:
+            write_completed()
+
+    while pending:
+        write_completed()
+
+    return num_scenarios
@@ -1,39 +1,73 @@
 import yaml
 import os
-from hybrids_shared_infrastructure.run_BOSSEs import run_BOSSEs
-from hybrids_shared_infrastructure.PostSimulationProcessing import PostSimulationProcessing
+import math
+import logging
+from hybrids_shared_infrastructure.run_BOSSEs import run_BOSSEs, wind_leg_input_dict, \
+    solar_leg_input_dict, run_wind_leg, run_solar_leg
+from hybrids_shared_infrastructure.PostSimulationProcessing import PostSimulationProcessing, \
+    ColumnarPostSimulationProcessing
+from SolarBOSSE.Dual import Dual
+from SolarBOSSE.PipelineStats import pipeline_stats
+from SolarBOSSE.ScalarEngine import ScalarEngine
+from SolarBOSSE.SolarBOSSEPipeline import SolarBOSSEPipeline
+from SolarBOSSE.TraceHooks import trace_hooks, LoggingSink
+import numpy as np
 import pandas as pd
 
 
 # Main API method to run a Hybrid BOS model:
-def run_hybrid_BOS(hybrids_input_dict):
+@pipeline_stats.timed('hybrid.run_hybrid_BOS')
+def run_hybrid_BOS(hybrids_input_dict, concurrency='serial', executor=None):
     """
     Returns a dictionary with detailed Shared Infrastructure BOS results.
+
+    concurrency and executor control whether the wind (LandBOSSE) and solar
+    (SolarBOSSE) legs are run one after the other or at the same time (see
+    run_BOSSEs()).
+
+    The time spent in each stage of the run is added to pipeline_stats (see
+    SolarBOSSE.PipelineStats). Stages run in worker processes (concurrency
+    'process') are timed in the stats of the workers.
+
+    The results of the legs are emitted as leg_results events to trace_hooks
+    (see SolarBOSSE.TraceHooks), instead of being printed.
+    """
+    wind_BOS, solar_BOS = run_BOSSEs(hybrids_input_dict, concurrency, executor)
+
+    if trace_hooks.enabled:
+        for leg, plant_size_MW, leg_BOS in [
+                ('wind', hybrids_input_dict['wind_plant_size_MW'], wind_BOS),
+                ('solar', hybrids_input_dict['solar_system_size_MW_DC'], solar_BOS)]:
+            # BOS of the wind only and solar only power plants:
+            bos_usd_watt = leg_BOS['total_bos_cost'] / (plant_size_MW * 1e6) \
+                if plant_size_MW > 0 else None
+            trace_hooks.emit('leg_results', leg=leg, plant_size_MW=plant_size_MW,
+                             total_bos_cost=leg_BOS['total_bos_cost'],
+                             bos_usd_watt=bos_usd_watt, results=dict(leg_BOS))
+
+    return combine_BOS_results(hybrids_input_dict, wind_BOS, solar_BOS)
+
+
+def combine_BOS_results(hybrids_input_dict, wind_BOS, solar_BOS):
+    """
+    Combines the wind only (LandBOSSE) and solar only (SolarBOSSE) BOS results of a
+    single scenario into the Shared Infrastructure BOS results returned by
+    run_hybrid_BOS().
     """
-    wind_BOS, solar_BOS = run_BOSSEs(hybrids_input_dict)
     # Store a copy of both solar only and wind only outputs dictionaries:
     wind_only_BOS = wind_BOS.copy()
     solar_only_BOS = solar_BOS.copy()
 
-    print('wind_only_BOS at ', hybrids_input_dict['wind_plant_size_MW'], ' MW: ' , wind_BOS)
-    print('solar_only_BOS ', hybrids_input_dict['solar_system_size_MW_DC'], ' MW: ' , solar_BOS)
-    if hybrids_input_dict['wind_plant_size_MW'] > 0:
-        # BOS of Wind only power plant:
-        print('Wind BOS: ', (wind_BOS['total_bos_cost'] /
-                             (hybrids_input_dict['wind_plant_size_MW'] * 1e6)))
-    else:
+    if hybrids_input_dict['wind_plant_size_MW'] <= 0:
         wind_BOS['total_management_cost'] = 0
 
-    if hybrids_input_dict['solar_system_size_MW_DC'] > 0:
-        # BOS of Solar only power plant:
-        print('Solar BOS: ', (solar_BOS['total_bos_cost'] /
-                              (hybrids_input_dict['solar_system_size_MW_DC'] * 1e6)))
-    else:
+    if hybrids_input_dict['solar_system_size_MW_DC'] <= 0:
         solar_BOS['total_management_cost'] = 0
 
     results = dict()
     results['hybrid'] = dict()
-    hybrid_BOS = PostSimulationProcessing(hybrids_input_dict, wind_BOS, solar_BOS)
+    with pipeline_stats.stage('hybrid.post_simulation_processing'):
+        hybrid_BOS = PostSimulationProcessing(hybrids_input_dict, wind_BOS, solar_BOS)
     results['hybrid']['hybrid_BOS_usd'] = hybrid_BOS.hybrid_BOS_usd
     results['hybrid']['hybrid_BOS_usd_watt'] = hybrid_BOS.hybrid_BOS_usd_watt
     results['hybrid']['hybrid_gridconnection_usd'] = hybrid_BOS.hybrid_gridconnection_usd
@@ -48,6 +82,362 @@ def run_hybrid_BOS(hybrids_input_dict):
     return results, wind_only_BOS, solar_only_BOS
 
 
+def run_hybrid_BOS_batch(scenarios, use_scalar_engine=False):
+    """
+    Columnar counterpart of run_hybrid_BOS() for sweeps over many scenarios.
+
+    Parameters
+    ----------
+    scenarios : pandas.DataFrame
+        One row per scenario. Columns are the keys of hybrids_input_dict in
+        hybrid_inputs.yaml. Optional keys (e.g. override_total_management_cost) may
+        be left out, or left empty (NaN) for the scenarios that do not use them.
+
+    use_scalar_engine : bool
+        If True, the solar legs are computed with ScalarEngine instead of
+        SolarBOSSE (see run_solar_leg_on_engine()).
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row of flattened results (see flatten_BOS_results()) per scenario,
+        indexed like scenarios, followed by an error column. The results of a
+        scenario whose wind or solar leg failed are NaN, and its error holds the
+        errors of the leg (see legs_error()). The error of the other scenarios
+        is None.
+
+    The derived fields computed by read_hybrid_scenario() are computed column-wise,
+    and the LandBOSSE and SolarBOSSE legs are only run once for each distinct set of
+    leg inputs in the batch. Sweeps that vary e.g. the shared interconnection
+    inputs, or combine a handful of wind and solar plants, therefore only pay for
+    the distinct wind and solar plants. The legs are then combined for all the
+    scenarios at once by ColumnarPostSimulationProcessing.
+    """
+    scenarios = derive_hybrid_fields(scenarios.copy())
+
+    leg_results = dict()
+    wind_keys = []
+    solar_keys = []
+    errors = []
+    for scenario in scenarios.to_dict('records'):
+        hybrids_input_dict = {key: value for key, value in scenario.items()
+                              if not _is_missing(value)}
+        wind_key, solar_key = run_legs_once(hybrids_input_dict, leg_results,
+                                            use_scalar_engine)
+        wind_keys.append(wind_key)
+        solar_keys.append(solar_key)
+        errors.append(legs_error(leg_results[wind_key], leg_results[solar_key]))
+
+    wind_BOS = _leg_results_frame(leg_results, wind_keys, scenarios.index)
+    solar_BOS = _leg_results_frame(leg_results, solar_keys, scenarios.index)
+
+    leg_array = ColumnarPostSimulationProcessing.input_array
+    batch_results = pd.DataFrame(index=scenarios.index)
+
+    # Same as combine_BOS_results(), legs of size 0 have no management cost:
+    wind_management_usd = np.where(scenarios['wind_plant_size_MW'] <= 0, 0,
+                                   leg_array(wind_BOS, 'total_management_cost'))
+    solar_management_usd = np.where(scenarios['solar_system_size_MW_DC'] <= 0, 0,
+                                    leg_array(solar_BOS, 'total_management_cost'))
+
+    with pipeline_stats.stage('hybrid.post_simulation_processing_batch'):
+        hybrid_BOS = ColumnarPostSimulationProcessing(
+            scenarios,
+            wind_BOS.assign(total_management_cost=wind_management_usd),
+            solar_BOS.assign(total_management_cost=solar_management_usd))
+
+    batch_results['hybrid_BOS_usd'] = hybrid_BOS.hybrid_BOS_usd
+    batch_results['hybrid_BOS_usd_watt'] = hybrid_BOS.hybrid_BOS_usd_watt
+    batch_results['hybrid_gridconnection_usd'] = hybrid_BOS.hybrid_gridconnection_usd
+    batch_results['hybrid_substation_usd'] = hybrid_BOS.hybrid_substation_usd
+    batch_results['hybrid_management_development_usd'] = \
+        hybrid_BOS.hybrid_management_development_usd
+
+    legs_BOS = {'wind': wind_BOS, 'solar': solar_BOS}
+    for column, leg, key in _ONLY_BOS_COLUMNS:
+        batch_results[column] = leg_array(legs_BOS[leg], key)
+
+    # The costs missing from failed legs were taken to be 0:
+    failed = np.array([error is not None for error in errors], dtype=bool)
+    batch_results.loc[failed, FLAT_RESULT_COLUMNS] = np.nan
+    batch_results['error'] = errors
+
+    return batch_results
+
+
+def run_hybrid_BOS_flat(hybrids_input_dict, leg_results=None):
+    """
+    Runs a single scenario (with derived fields already computed) and returns its
+    flattened results (see flatten_BOS_results()).
+
+    leg_results is an optional dictionary holding the LandBOSSE and SolarBOSSE
+    results of legs that have already been run (see run_legs_once()).
+
+    Raises ValueError with the errors of the legs if a leg failed.
+    """
+    if leg_results is None:
+        leg_results = dict()
+
+    wind_key, solar_key = run_legs_once(hybrids_input_dict, leg_results)
+    error = legs_error(leg_results[wind_key], leg_results[solar_key])
+    if error is not None:
+        raise ValueError(error)
+
+    # BOS results of each leg are mutated while being combined, so every
+    # scenario gets its own copy of the (shared) leg results:
+    results, wind_only, solar_only = \
+        combine_BOS_results(hybrids_input_dict,
+                            leg_results[wind_key].copy(),
+                            leg_results[solar_key].copy())
+
+    return flatten_BOS_results(results, wind_only, solar_only)
+
+
+# Inputs of a scenario that hybrid_BOS_derivatives() differentiates with respect
+# to:
+DIFFERENTIABLE_INPUTS = ('solar_system_size_MW_DC', 'solar_construction_time_months',
+                         'wind_construction_time_months', 'solar_dist_interconnect_mi',
+                         'distance_to_interconnect_mi', 'interconnect_voltage_kV',
+                         'grid_interconnection_rating_MW', 'hybrid_substation_rating_MW',
+                         'dc_ac_ratio')
+
+# ScalarEngine of each project list, compiled the first time it is used (see
+# scalar_engine()):
+_scalar_engines = dict()
+
+
+def hybrid_BOS_derivatives(hybrids_input_dict, wrt, wind_BOS=None, engine=None):
+    """
+    Returns the hybrid results of a scenario (see combine_BOS_results()) along
+    with their partial derivatives with respect to the inputs named in wrt, in
+    a single pass.
+
+    The inputs named in wrt are replaced by dual numbers (see SolarBOSSE.Dual),
+    and the scenario is run through derive_hybrid_fields(),
+    solar_leg_input_dict(), ScalarEngine.totals() (instead of SolarBOSSE) and
+    combine_BOS_results(). The partials are those of the branches the scenario
+    takes: at a breakpoint of a piecewise cost (e.g. a grid interconnection
+    rating of exactly 15 MW), they are the one-sided derivatives from the side
+    the breakpoint belongs to. Costs that are step functions of the inputs
+    (e.g. numbers of crews) have partials of 0.
+
+    The wind leg is not differentiable (LandBOSSE is run on floats), and its
+    results are held constant. The partials with respect to the inputs that
+    are also inputs of LandBOSSE (interconnect_voltage_kV,
+    grid_interconnection_rating_MW and hybrid_substation_rating_MW) leave out
+    the change of the wind only costs, and are exact for plants without wind.
+
+    Parameters
+    ----------
+    hybrids_input_dict : dict
+        Scenario, as returned by read_hybrid_scenario().
+
+    wrt : list of str
+        Inputs to differentiate with respect to, among DIFFERENTIABLE_INPUTS.
+
+    wind_BOS : dict, optional
+        LandBOSSE results of the wind leg of the scenario. By default, the wind
+        leg is run.
+
+    engine : ScalarEngine, optional
+        Engine computing the solar leg. By default, the engine of the project
+        list of the solar leg (compiled once per process).
+
+    Returns
+    -------
+    dict
+        The dual number of each hybrid result (e.g.
+        result['hybrid_BOS_usd'].partial('solar_system_size_MW_DC')).
+    """
+    for name in wrt:
+        if name not in DIFFERENTIABLE_INPUTS:
+            raise ValueError('Cannot differentiate with respect to ' + str(name) +
+                             '. Inputs must be among ' + ', '.join(DIFFERENTIABLE_INPUTS))
+
+    scenario = dict(hybrids_input_dict)
+    for name in wrt:
+        scenario[name] = Dual.variable(hybrids_input_dict[name], name)
+    derive_hybrid_fields(scenario)
+
+    if wind_BOS is None:
+        wind_BOS = run_wind_leg(wind_leg_input_dict(hybrids_input_dict))
+
+    solar_BOS = run_solar_leg_on_engine(solar_leg_input_dict(scenario), engine)
+
+    results, _, _ = combine_BOS_results(scenario, dict(wind_BOS), solar_BOS)
+    return {key: Dual.lift(value) for key, value in results['hybrid'].items()}
+
+
+def run_solar_leg_on_engine(solar_input_dict, engine=None):
+    """
+    Counterpart of run_solar_leg() computing the results of the solar leg with
+    a ScalarEngine instead of SolarBOSSE (a few hundred times faster, to
+    rounding error). The inputs of the leg may be dual numbers.
+
+    engine defaults to the engine of the project list of the leg (see
+    scalar_engine()).
+    """
+    solar_input_dict = dict(solar_input_dict)
+    project_list = solar_input_dict.pop('project_list')
+    if solar_input_dict['system_size_MW_DC'] < 1:
+        SolarBOSSE_results = dict()
+        SolarBOSSE_results['total_bos_cost'] = 0
+        return SolarBOSSE_results
+
+    if engine is None:
+        engine = scalar_engine(project_list)
+
+    return SolarBOSSEPipeline.results({'error': dict()}, engine.totals(**solar_input_dict))
+
+
+def scalar_engine(project_list):
+    """
+    Returns the ScalarEngine of a project list, compiled the first time it is
+    used in the process.
+    """
+    if project_list not in _scalar_engines:
+        _scalar_engines[project_list] = ScalarEngine.compile(project_list)
+    return _scalar_engines[project_list]
+
+
+def run_legs_once(hybrids_input_dict, leg_results, use_scalar_engine=False):
+    """
+    Runs the wind (LandBOSSE) and solar (SolarBOSSE) legs of a scenario, unless
+    they are already in leg_results.
+
+    leg_results is a dictionary holding the results of legs that have already
+    been run. Legs that are run get added to it. Pass the same dictionary for all
+    the scenarios of a sweep to run each distinct leg only once.
+
+    If use_scalar_engine is True, the solar leg is computed with ScalarEngine
+    instead of SolarBOSSE (see run_solar_leg_on_engine()).
+
+    Returns the keys of the wind and solar leg results in leg_results.
+    """
+    wind_input_dict = wind_leg_input_dict(hybrids_input_dict)
+    wind_key = ('wind',) + tuple(sorted(wind_input_dict.items()))
+    if wind_key not in leg_results:
+        leg_results[wind_key] = run_wind_leg(wind_input_dict)
+
+    solar_input_dict = solar_leg_input_dict(hybrids_input_dict)
+    solar_key = ('solar',) + tuple(sorted(solar_input_dict.items()))
+    if solar_key not in leg_results:
+        if use_scalar_engine:
+            leg_results[solar_key] = run_solar_leg_on_engine(solar_input_dict)
+        else:
+            leg_results[solar_key] = run_solar_leg(solar_input_dict)
+
+    return wind_key, solar_key
+
+
+def legs_error(wind_BOS, solar_BOS):
+    """
+    Returns the errors of the wind and solar legs of a scenario, as a single
+    message, or None if both legs succeeded. A failed LandBOSSE or SolarBOSSE
+    run returns the list of its errors (and no costs) under 'errors'.
+    """
+    messages = [leg + ' leg: ' + str(error)
+                for leg, leg_BOS in [('wind', wind_BOS), ('solar', solar_BOS)]
+                for error in leg_BOS.get('errors') or []]
+    return '; '.join(messages) if messages else None
+
+
+def _leg_results_frame(leg_results, leg_keys, index):
+    """
+    Returns a DataFrame with the results of leg leg_keys[i] in row i. Each
+    distinct leg is only converted once.
+    """
+    distinct_keys = list(dict.fromkeys(leg_keys))
+    position = {leg_key: i for i, leg_key in enumerate(distinct_keys)}
+
+    distinct_legs = pd.DataFrame([leg_results[leg_key] for leg_key in distinct_keys])
+    legs = distinct_legs.iloc[[position[leg_key] for leg_key in leg_keys]]
+    legs.index = index
+    return legs
+
+
+# Flattened wind only and solar only results (see flatten_BOS_results()), as
+# (column, leg, key of the leg results):
+_ONLY_BOS_COLUMNS = [
+    ('wind_only_BOS_usd', 'wind', 'total_bos_cost'),
+    ('wind_only_gridconnection_usd', 'wind', 'total_gridconnection_cost'),
+    ('wind_only_substation_usd', 'wind', 'total_substation_cost'),
+    ('wind_only_management_usd', 'wind', 'total_management_cost'),
+    ('solar_only_BOS_usd', 'solar', 'total_bos_cost'),
+    ('solar_only_gridconnection_usd', 'solar', 'total_transdist_cost'),
+    ('solar_only_substation_usd', 'solar', 'substation_cost'),
+    ('solar_only_management_usd', 'solar', 'total_management_cost'),
+]
+
+# Columns of the flattened results of a scenario (see flatten_BOS_results()):
+FLAT_RESULT_COLUMNS = ['hybrid_BOS_usd', 'hybrid_BOS_usd_watt', 'hybrid_gridconnection_usd',
+                       'hybrid_substation_usd', 'hybrid_management_development_usd'] + \
+    [column for column, _, _ in _ONLY_BOS_COLUMNS]
+
+
+def flatten_BOS_results(hybrid_dict, wind_only_dict, solar_only_dict):
+    """
+    Flattens the results returned by run_hybrid_BOS() into a single dictionary of
+    hybrid, wind only and solar only cost buckets (in USD, except for
+    hybrid_BOS_usd_watt).
+    """
+    flat_results = dict(hybrid_dict['hybrid'])
+
+    flat_results['wind_only_BOS_usd'] = wind_only_dict['total_bos_cost']
+    flat_results['wind_only_gridconnection_usd'] = \
+        wind_only_dict.get('total_gridconnection_cost', 0)
+    flat_results['wind_only_substation_usd'] = wind_only_dict.get('total_substation_cost', 0)
+    flat_results['wind_only_management_usd'] = wind_only_dict.get('total_management_cost', 0)
+
+    flat_results['solar_only_BOS_usd'] = solar_only_dict['total_bos_cost']
+    flat_results['solar_only_gridconnection_usd'] = \
+        solar_only_dict.get('total_transdist_cost', 0)
+    flat_results['solar_only_substation_usd'] = solar_only_dict.get('substation_cost', 0)
+    flat_results['solar_only_management_usd'] = \
+        solar_only_dict.get('total_management_cost', 0)
+
+    return flat_results
+
+
+def _is_missing(value):
+    """
+    True for the empty (None or NaN) cells of a scenarios DataFrame.
+    """
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def derive_hybrid_fields(hybrids_scenario):
+    """
+    Adds the fields derived from the user inputs (wind_plant_size_MW,
+    hybrid_plant_size_MW and hybrid_construction_months) to a scenario.
+
+    hybrids_scenario can either be a single scenario dictionary, or a DataFrame
+    with one scenario per row, in which case the fields are computed column-wise.
+    The scenario is updated in place and returned.
+    """
+    if isinstance(hybrids_scenario, pd.DataFrame):
+        hybrids_scenario['num_turbines'] = \
+            hybrids_scenario['num_turbines'].fillna(0).astype(int)
+
+    elif hybrids_scenario['num_turbines'] is None or \
+        hybrids_scenario['num_turbines'] == 0:
+
+        hybrids_scenario['num_turbines'] = 0
+
+    hybrids_scenario['wind_plant_size_MW'] = hybrids_scenario['num_turbines'] * \
+                                             hybrids_scenario['turbine_rating_MW']
+
+    hybrids_scenario['hybrid_plant_size_MW'] = hybrids_scenario['wind_plant_size_MW'] + \
+                                               hybrids_scenario['solar_system_size_MW_DC']
+
+    hybrids_scenario['hybrid_construction_months'] = \
+        hybrids_scenario['wind_construction_time_months'] + \
+        hybrids_scenario['solar_construction_time_months']
+
+    return hybrids_scenario
+
+
+@pipeline_stats.timed('hybrid.read_yaml')
 def read_hybrid_scenario(file_path):
     """
     [Optional method]
@@ -67,22 +457,7 @@ def read_hybrid_scenario(file_path):
 
     hybrids_scenario_dict = data_loaded['hybrids_input_dict']
 
-    if hybrids_scenario_dict['num_turbines'] is None or \
-        hybrids_scenario_dict['num_turbines'] == 0:
-
-        hybrids_scenario_dict['num_turbines'] = 0
-
-    hybrids_scenario_dict['wind_plant_size_MW'] = hybrids_scenario_dict['num_turbines'] * \
-                                                  hybrids_scenario_dict['turbine_rating_MW']
-
-    hybrids_scenario_dict['hybrid_plant_size_MW'] = hybrids_scenario_dict['wind_plant_size_MW'] + \
-                                                    hybrids_scenario_dict['solar_system_size_MW_DC']
-
-    hybrids_scenario_dict['hybrid_construction_months'] = \
-        hybrids_scenario_dict['wind_construction_time_months'] + \
-        hybrids_scenario_dict['solar_construction_time_months']
-
-    return hybrids_scenario_dict
+    return derive_hybrid_fields(hybrids_scenario_dict)
 
 
 yaml_file_path = dict()
@@ -246,7 +621,10 @@ def display_results(hybrid_dict, wind_only_dict, solar_only_dict):
     return hybrids_df, hybrids_solar_df, hybrids_wind_df, solar_only_bos, wind_only_bos
 
 
-hybrids_scenario_dict = read_hybrid_scenario(yaml_file_path)
-hybrid_results, wind_only, solar_only = run_hybrid_BOS(hybrids_scenario_dict)
-print(hybrid_results)
-display_results(hybrid_results, wind_only_dict=wind_only, solar_only_dict=solar_only)
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    trace_hooks.add_sink(LoggingSink())
+    hybrids_scenario_dict = read_hybrid_scenario(yaml_file_path)
+    hybrid_results, wind_only, solar_only = run_hybrid_BOS(hybrids_scenario_dict)
+    print(hybrid_results)
+    display_results(hybrid_results, wind_only_dict=wind_only, solar_only_dict=solar_only)
@@ -0,0 +1,222 @@
+"""Shared fixtures for the SolarBOSSE and hybrid tests."""
+
+import os
+
+import pandas as pd
+import pytest
+
+
+PROJECT_DATA_XLSX = os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                                 'SolarBOSSE', 'project_data',
+                                 'project_data_defaults.xlsx')
+
+# Project list (of a 50 MW DC project, reading project_data_defaults.xlsx) shared
+# with the benchmarks:
+PROJECT_LIST_CSV = os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                                'benchmarks', 'fixtures', 'project_list_benchmark.csv')
+
+
+@pytest.fixture(scope='session')
+def project_data_xlsx():
+    """
+    Path of the default SolarBOSSE project data workbook.
+    """
+    return PROJECT_DATA_XLSX
+
+
+@pytest.fixture(scope='session')
+def project_data_sheets():
+    """
+    Sheets of the default SolarBOSSE project data workbook.
+    """
+    xlsx = pd.ExcelFile(PROJECT_DATA_XLSX)
+    return {sheet_name: xlsx.parse(sheet_name) for sheet_name in xlsx.sheet_names}
+
+
+@pytest.fixture
+def solar_project_list(monkeypatch):
+    """
+    Installs the project list fixture in an empty XlsxDataframeCache, under the
+    name of the project list of the solar leg of the hybrid runs
+    ('project_list_50MW'), and returns that name.
+    """
+    from SolarBOSSE import main as solarbosse_main
+    from SolarBOSSE.excelio.XlsxDataframeCache import XlsxDataframeCache
+
+    monkeypatch.setattr(XlsxDataframeCache, '_cache', dict())
+    monkeypatch.setattr(XlsxDataframeCache, 'disk_cache', False)
+    monkeypatch.setattr(solarbosse_main, '_compiled_pipelines', dict())
+
+    XlsxDataframeCache.cache_all_sheets('project_list_50MW',
+                                        {'Project list': pd.read_csv(PROJECT_LIST_CSV)})
+    return 'project_list_50MW'
+
+
+@pytest.fixture
+def solar_input_dict(project_data_sheets):
+    """
+    Returns a function that makes a SolarBOSSE master input dictionary, for a
+    system of the given size (in MW DC), from the default project data. Keyword
+    arguments override entries of the dictionary.
+    """
+    def make_solar_input_dict(system_size_MW_DC=50, **overrides):
+        sheets = {sheet_name: sheet.copy()
+                  for sheet_name, sheet in project_data_sheets.items()}
+
+        input_dict = {
+            'error': dict(),
+            'project_id': 'test',
+            'labor_cost_multiplier': 1,
+            'construction_estimator': sheets['construction_estimator'],
+            'solar_BOM': sheets['balance_of_material_1MW'],
+            'site_facility_building_area_df': sheets['site_facility_building_area'],
+            'material_price': sheets['material_price'],
+            'crew': sheets['crew'],
+            'crew_cost': sheets['crew_price'],
+            'equip_price': sheets['equip_price'],
+            'pv_wire_DC_specs': sheets['pv_wire_DC_specs'],
+            'power_cable_specs_MV_AC': sheets['power_cable_specs'],
+            'construction_estimator_per_diem': 0,
+            'fuel_cost': 1.5,
+            'hour_day': 10,
+            'construction_time_months': 12,
+            'system_size_MW_DC': system_size_MW_DC,
+            'dc_ac_ratio': 1.2,
+            'module_rating_W': 350,
+            'module_width_m': 1,
+            'module_length_m': 1.98,
+            'module_V_oc': 52,
+            'module_I_SC_DC': 9.3,
+            'inverter_rating_kW': 1000,
+            'inverter_max_mppt_V_DC': 820,
+            'modules_per_string': 18,
+            'max_strings_combiner_box': 24,
+            'concrete_pad_length_inches': 240,
+            'concrete_pad_width_inches': 120,
+            'concrete_pad_depth_inches': 12,
+            'concrete_pad_excavation_depth_inches': 24,
+            'foundation_hole_ft': 8,
+            'line_freq_hz': 60,
+            'dist_interconnect_mi': 2,
+            'interconnect_voltage_kV': 34.5,
+            'switchyard_y_n': 'y',
+            'site_prep_area_acres_mw_ac': 5,
+            'fraction_new_roads': 0.33,
+            'road_width_ft': 16,
+            'road_thickness_in': 8,
+            'crane_width': 12.2,
+            'num_access_roads': 2,
+            'overtime_multiplier': 1.4,
+            'markup_contingency': 0.03,
+            'markup_warranty_mgmt': 0.0002,
+            'markup_sales_tax': 0.05,
+            'markup_overhead': 0.05,
+            'markup_profit_margin': 0.05,
+            'grid_system_size_MW_DC': system_size_MW_DC,
+            'grid_size_MW_AC': system_size_MW_DC / 1.2,
+        }
+        input_dict.update(overrides)
+        return input_dict
+
+    return make_solar_input_dict
+
+
+@pytest.fixture
+def hybrid_scenario():
+    """
+    Returns a hybrid input dictionary (as read from hybrid_inputs.yaml, without
+    the derived fields).
+    """
+    return {'shared_interconnection': True, 'distance_to_interconnect_mi': 1.5,
+            'new_switchyard': True, 'grid_interconnection_rating_MW': 40,
+            'interconnect_voltage_kV': 34.5, 'shared_substation': True,
+            'hybrid_substation_rating_MW': 40, 'wind_dist_interconnect_mi': 0,
+            'num_turbines': 10, 'turbine_rating_MW': 2,
+            'wind_construction_time_months': 8, 'project_id': 'test',
+            'path_to_project_list': 'project_list_path',
+            'name_of_project_list': 'project_list', 'solar_system_size_MW_DC': 20,
+            'dc_ac_ratio': 1.2, 'solar_construction_time_months': 9,
+            'solar_dist_interconnect_mi': 2}
+
+
+# Input dictionaries the fake legs were called with (in this process):
+leg_calls = {'wind': [], 'solar': []}
+
+
+def wind_leg_results(wind_input_dict):
+    """
+    Stands in for run_wind_leg() (LandBOSSE): made up results, that depend on
+    the size, distance to interconnect and substation rating of the wind leg.
+    """
+    leg_calls['wind'].append(wind_input_dict)
+    size_MW = wind_input_dict['num_turbines'] * wind_input_dict['turbine_rating_MW']
+    if size_MW < 1:
+        return {'total_bos_cost': 0}
+
+    results = {'total_gridconnection_cost': 5e5 + 2e5 * wind_input_dict[
+                   'distance_to_interconnect_mi'],
+               'total_substation_cost': 3e4 * wind_input_dict['substation_rating_MW'],
+               'total_management_cost': 8e4 * size_MW, 'site_facility_usd': 3e5,
+               'markup_contingency_usd': 1e4 * size_MW, 'insurance_usd': 2e3 * size_MW,
+               'construction_permitting_usd': 1e3 * size_MW,
+               'project_management_usd': 4e3 * size_MW, 'bonding_usd': 3e3 * size_MW,
+               'engineering_usd': 5e3 * size_MW, 'total_collection_cost': 1e5 * size_MW}
+    results['total_bos_cost'] = 9e5 * size_MW + results['total_gridconnection_cost'] + \
+        results['total_substation_cost'] + results['total_management_cost']
+    return results
+
+
+def solar_leg_results(solar_input_dict):
+    """
+    Stands in for run_solar_leg() (SolarBOSSE): made up results, that depend on
+    every input of the solar leg.
+    """
+    leg_calls['solar'].append(solar_input_dict)
+    size_MW = solar_input_dict['system_size_MW_DC']
+    if size_MW < 1:
+        return {'total_bos_cost': 0}
+
+    results = {'total_transdist_cost': 1e5 + 3e5 * solar_input_dict['dist_interconnect_mi'] +
+               1e3 * solar_input_dict['interconnect_voltage_kV'] +
+               2e3 * solar_input_dict['grid_size_MW_AC'],
+               'substation_cost': 2e4 * solar_input_dict['substation_rating_MW'],
+               'total_management_cost': 6e4 * size_MW +
+               1e4 * solar_input_dict['construction_time_months'],
+               'epc_developer_profit': 2e4 * size_MW, 'bonding_usd': 1e3 * size_MW,
+               'development_overhead_cost': 3e4 * size_MW,
+               'total_sales_tax': 5e3 * size_MW, 'total_racking_cost': 1e5 * size_MW}
+    results['total_bos_cost'] = 7e5 * size_MW + results['total_transdist_cost'] + \
+        results['substation_cost'] + results['total_management_cost']
+    return results
+
+
+def _replace_leg(monkeypatch, name, fake_leg):
+    main = pytest.importorskip('main')
+    from hybrids_shared_infrastructure import run_BOSSEs as run_BOSSEs_module
+    from hybrids_shared_infrastructure import run_sweep as run_sweep_module
+
+    for module in (main, run_BOSSEs_module, run_sweep_module):
+        if hasattr(module, name):
+            monkeypatch.setattr(module, name, fake_leg)
+
+
+@pytest.fixture
+def fake_wind_leg(monkeypatch):
+    """
+    Runs the wind legs of the hybrid runs with wind_leg_results() instead of
+    LandBOSSE. Returns the wind input dictionaries it is called with.
+    """
+    _replace_leg(monkeypatch, 'run_wind_leg', wind_leg_results)
+    leg_calls['wind'].clear()
+    return leg_calls['wind']
+
+
+@pytest.fixture
+def fake_solar_leg(monkeypatch):
+    """
+    Runs the solar legs of the hybrid runs with solar_leg_results() instead of
+    SolarBOSSE. Returns the solar input dictionaries it is called with.
+    """
+    _replace_leg(monkeypatch, 'run_solar_leg', solar_leg_results)
+    leg_calls['solar'].clear()
+    return leg_calls['solar']
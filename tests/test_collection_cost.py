@@ -0,0 +1,101 @@
+"""Tests for `SolarBOSSE.model.CollectionCost`."""
+
+import numpy as np
+import pytest
+
+from SolarBOSSE.model.CollectionCost import CollectionCost, distance_to_combiner_box
+
+
+def distance_to_combiner_box_loop(number_of_strings, module_width_m,
+                                  number_modules_per_string):
+    """
+    Loop formerly used by CollectionCost.distance_to_combiner_box().
+    """
+    distance = 0
+    for i in range(int(number_of_strings / 2)):
+        if 0 == i:
+            distance = (i + 1) * module_width_m * number_modules_per_string
+            adder = distance + module_width_m
+        else:
+            distance += adder + ((i + 1) * module_width_m * number_modules_per_string)
+            adder = ((i + 1) * module_width_m * number_modules_per_string) + \
+                module_width_m
+    return distance
+
+
+@pytest.mark.parametrize('module_width_m, number_modules_per_string', [
+    (0.992 + 0.0254, 18),
+    (1.046 + 0.0254, 24),
+    (2.0, 1),
+])
+def test_distance_to_combiner_box_matches_loop(module_width_m,
+                                               number_modules_per_string):
+    number_of_strings = np.arange(0, 4001)
+
+    expected = [distance_to_combiner_box_loop(strings, module_width_m,
+                                              number_modules_per_string)
+                for strings in number_of_strings]
+
+    distances = distance_to_combiner_box(number_of_strings, module_width_m,
+                                         number_modules_per_string)
+
+    np.testing.assert_allclose(distances, expected, rtol=1e-12)
+
+    for strings in [0, 1, 2, 3, 57, 3999]:
+        distance = distance_to_combiner_box(strings, module_width_m,
+                                            number_modules_per_string)
+        assert isinstance(distance, float)
+        assert distance == pytest.approx(expected[strings], rel=1e-12)
+
+
+def test_distance_to_combiner_box_broadcasts():
+    number_of_strings = np.array([[10], [40]])
+    module_width_m = np.array([0.9, 1.0, 1.1])
+
+    distances = distance_to_combiner_box(number_of_strings, module_width_m, 20)
+
+    assert distances.shape == (2, 3)
+    for i, strings in enumerate([10, 40]):
+        for j, width in enumerate(module_width_m):
+            assert distances[i, j] == pytest.approx(
+                distance_to_combiner_box_loop(strings, width, 20), rel=1e-12)
+
+
+@pytest.mark.parametrize('system_size_MW_DC, expected_acres_run', [
+    (100, ['original']),
+    (300, [750]),
+    (3000, [750]),
+    (3075, [750, 375]),
+])
+def test_run_module_runs_each_distinct_region_once(system_size_MW_DC,
+                                                   expected_acres_run):
+    collection_cost = CollectionCost.__new__(CollectionCost)
+    collection_cost.project_name = 'test'
+    collection_cost.input_dict = {'system_size_MW_DC': system_size_MW_DC,
+                                  'site_prep_area_acres_mw_ac': 5,
+                                  'site_prep_area_acres': 'original',
+                                  'error': dict()}
+    collection_cost.output_dict = dict()
+
+    acres_run = []
+
+    def run_module_for_150_MW():
+        # Collection cost of 1000 USD per acre, or 1000 USD for plants that are
+        # not split into regions:
+        acres = collection_cost.input_dict['site_prep_area_acres']
+        acres_run.append(acres)
+        collection_cost.output_dict['total_collection_cost'] = \
+            1000.0 if acres == 'original' else 1000.0 * acres
+
+    collection_cost.run_module_for_150_MW = run_module_for_150_MW
+
+    assert collection_cost.run_module() == (0, 0)
+    assert acres_run == expected_acres_run
+
+    if system_size_MW_DC > 150:
+        expected_cost = 1000.0 * 5 * system_size_MW_DC
+    else:
+        expected_cost = 1000.0
+    assert collection_cost.output_dict['total_collection_cost'] == \
+        pytest.approx(expected_cost)
+    assert collection_cost.input_dict['site_prep_area_acres'] == 'original'
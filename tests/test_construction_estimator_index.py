@@ -0,0 +1,67 @@
+"""Tests for `SolarBOSSE.excelio.ConstructionEstimatorIndex`."""
+
+import pandas as pd
+import pytest
+
+from SolarBOSSE.excelio.ConstructionEstimatorIndex import ConstructionEstimatorIndex
+from SolarBOSSE.model.SitePreparationCost import SitePreparationCost
+
+
+@pytest.fixture
+def construction_estimator(project_data_sheets):
+    return project_data_sheets['construction_estimator'].copy()
+
+
+def test_operations_match_where_dropna(construction_estimator):
+    index = ConstructionEstimatorIndex(construction_estimator)
+
+    for module in construction_estimator['Module'].dropna().unique():
+        expected = construction_estimator.where(
+            construction_estimator['Module'] == module).dropna(thresh=4)
+        pd.testing.assert_frame_equal(index.operations(module), expected)
+
+
+def test_rows_match_masks(construction_estimator):
+    index = ConstructionEstimatorIndex(construction_estimator)
+    is_collection = construction_estimator['Module'] == 'Collection'
+
+    for type_of_cost in ['Labor', 'Equipment']:
+        expected = construction_estimator[
+            is_collection & (construction_estimator['Type of cost'] == type_of_cost)]
+        pd.testing.assert_frame_equal(
+            index.rows('Collection', type_of_cost=type_of_cost), expected)
+
+    daily_output = index.column('Daily output', 'Source circuit wiring',
+                                operation_id='Source circuit wiring')
+    expected = construction_estimator.loc[
+        construction_estimator['Operation ID'] == 'Source circuit wiring',
+        'Daily output']
+    assert list(daily_output) == list(expected)
+    assert not daily_output.flags.writeable
+
+    assert len(index.rows('No such module')) == 0
+
+
+def test_blocks_are_cached_and_copied(construction_estimator):
+    index = ConstructionEstimatorIndex(construction_estimator)
+
+    assert index.rows('Collection') is index.rows('Collection')
+    assert index.operations('Collection') is index.operations('Collection')
+
+    operations = index.operations('Collection', copy=True)
+    operations['Number of crews'] = 1
+    assert 'Number of crews' not in index.operations('Collection').columns
+
+
+def test_cost_module_rebuilds_stale_index(solar_input_dict):
+    input_dict = solar_input_dict(50)
+    module = SitePreparationCost(input_dict, dict(), 'test')
+
+    index = module.construction_estimator_index()
+    assert input_dict['construction_estimator_index'] is index
+    assert module.construction_estimator_index() is index
+
+    input_dict['construction_estimator'] = input_dict['construction_estimator'].copy()
+    rebuilt_index = module.construction_estimator_index()
+    assert rebuilt_index is not index
+    assert rebuilt_index.construction_estimator is input_dict['construction_estimator']
@@ -0,0 +1,45 @@
+"""Tests for `SolarBOSSE.model.CostLedger`."""
+
+import math
+
+import pytest
+
+from SolarBOSSE.model.CostLedger import CostLedger
+from SolarBOSSE.model.Manager import Manager
+
+
+def test_cost_ledger():
+    ledger = CostLedger()
+    assert ledger.total() == 0
+    assert len(ledger.to_df()) == 0
+
+    ledger.add('Labor', 100.5, 'Foundation')
+    ledger.add('Materials', float('nan'), 'Foundation')
+    ledger.add('Mobilization', 20, 'Foundation')
+
+    assert len(ledger) == 3
+    assert ledger.total() == 120.5
+
+    df = ledger.to_df()
+    assert list(df.columns) == ['Type of cost', 'Cost USD', 'Phase of construction']
+    assert list(df['Type of cost']) == ['Labor', 'Materials', 'Mobilization']
+    assert df['Cost USD'].sum() == ledger.total()
+    assert math.isnan(df['Cost USD'][1])
+
+
+def test_ledgers_match_module_totals(solar_input_dict):
+    input_dict = solar_input_dict(50)
+    output_dict = dict()
+    Manager(input_dict, output_dict).execute_solarbosse()
+    assert not input_dict['error']
+
+    for ledger_key, total_key in [('total_road_cost_ledger', 'total_road_cost'),
+                                  ('total_racking_cost_ledger', 'total_racking_cost_USD'),
+                                  ('total_collection_cost_ledger', 'total_collection_cost'),
+                                  ('total_foundation_cost_ledger', 'total_foundation_cost'),
+                                  ('total_erection_cost_ledger', 'total_erection_cost'),
+                                  ('total_substation_cost_ledger', 'total_substation_cost'),
+                                  ('trans_dist_usd_ledger', 'total_transdist_cost')]:
+        ledger = output_dict[ledger_key]
+        assert isinstance(ledger, CostLedger)
+        assert ledger.to_df()['Cost USD'].sum() == pytest.approx(output_dict[total_key])
@@ -0,0 +1,48 @@
+"""Tests for `SolarBOSSE.model.CostModule`."""
+
+import pytest
+
+from SolarBOSSE.model.CostModule import PhaseResults, run_once
+from SolarBOSSE.model.SitePreparationCost import SitePreparationCost
+from SolarBOSSE.model.RackingSystemInstallation import RackingSystemInstallation
+
+
+def test_phase_results_runs_each_phase_once():
+    class Module:
+        def __init__(self):
+            self.phase_results = PhaseResults()
+            self.calls = 0
+
+        @run_once
+        def phase(self):
+            self.calls += 1
+            return object()
+
+    module = Module()
+    first = module.phase()
+    assert module.phase() is first
+    assert module.calls == 1
+    assert module.phase_results.run_counts['phase'] == 1
+
+    # A new instance (i.e. a new module run) runs the phase again:
+    assert Module().phase() is not first
+
+    module.phase_results.clear()
+    assert module.phase() is not first
+    assert module.phase_results.run_counts['phase'] == 2
+
+
+@pytest.mark.parametrize('cost_module', [SitePreparationCost,
+                                         RackingSystemInstallation])
+def test_estimate_construction_time_runs_once(solar_input_dict, cost_module):
+    input_dict = solar_input_dict(50)
+    output_dict = dict()
+
+    module = cost_module(input_dict=input_dict, output_dict=output_dict,
+                         project_name='test')
+    module.run_module()
+
+    assert not input_dict['error']
+    assert module.phase_results.run_counts == {'estimate_construction_time': 1}
+    assert output_dict['operation_data'] is \
+        module.phase_results.results['estimate_construction_time']
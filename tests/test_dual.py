@@ -0,0 +1,125 @@
+"""Tests for `SolarBOSSE.Dual`, and for the cost models run on dual numbers."""
+
+import numpy as np
+import pytest
+
+from SolarBOSSE.Dual import Dual
+from SolarBOSSE.ScalarEngine import ScalarEngine
+from hybrids_shared_infrastructure.GridConnectionCost import hybrid_gridconnection
+from hybrids_shared_infrastructure.ManagementCost import site_facility, \
+    epc_developer_profit_discount, development_overhead_cost_discount
+
+
+def central_difference(function, x, relative_step=1e-6):
+    step = relative_step * max(abs(x), 1)
+    return (function(x + step) - function(x - step)) / (2 * step)
+
+
+def test_arithmetic():
+    x = Dual.variable(3.0, 'x')
+    y = Dual.variable(2.0, 'y')
+
+    z = (x * y + 1) / (x - y) ** 2 - 4 / x + 2 ** y + np.power(x, 0.5)
+
+    assert z.value == pytest.approx(3 * 2 + 1 - 4 / 3 + 4 + 3 ** 0.5)
+    assert z.partial('x') == pytest.approx(2 - 2 * 7 + 4 / 9 + 0.5 * 3 ** -0.5)
+    assert z.partial('y') == pytest.approx(3 + 2 * 7 + np.log(2) * 4)
+    assert z.partial('other') == 0
+
+
+def test_branches_and_steps():
+    x = Dual.variable(np.array([1.0, 2.5, 4.0]), 'x')
+
+    y = Dual.where(x > 2, x * x, 3 * x) + np.ceil(x) + np.maximum(x, 2.5)
+
+    np.testing.assert_allclose(y.value, [3 + 1 + 2.5, 6.25 + 3 + 2.5, 16 + 4 + 4])
+    # At x = 2.5, np.maximum() takes the branch of x:
+    np.testing.assert_allclose(y.partial('x'), [3, 6, 9])
+
+
+@pytest.mark.parametrize('system_size_MW', [5, 20, 100])
+def test_kernels(system_size_MW):
+    def gridconnection(dist_interconnect_mi):
+        return hybrid_gridconnection({'system_size_MW': system_size_MW,
+                                      'dist_interconnect_mi': dist_interconnect_mi,
+                                      'interconnect_voltage_kV': 34.5,
+                                      'new_switchyard': True})
+
+    def management(hybrid_plant_size_MW):
+        return site_facility(hybrid_plant_size_MW, 12, 40) + \
+            epc_developer_profit_discount(hybrid_plant_size_MW, 10) + \
+            development_overhead_cost_discount(hybrid_plant_size_MW, 10)
+
+    for function, x in [(gridconnection, 2.0), (management, system_size_MW + 0.5)]:
+        assert Dual.lift(function(Dual.variable(x, 'x'))).partial('x') == \
+            pytest.approx(central_difference(function, x), rel=1e-5)
+
+
+def test_breakpoints_are_one_sided():
+    def gridconnection(system_size_MW):
+        return Dual.lift(hybrid_gridconnection({'system_size_MW': system_size_MW,
+                                                'dist_interconnect_mi': 2,
+                                                'interconnect_voltage_kV': 34.5,
+                                                'new_switchyard': True}))
+
+    # At 15 MW, the distributed model is used, so the derivative is the one of
+    # the distributed model (from below):
+    step = 1e-6
+    derivative = gridconnection(Dual.variable(15.0, 'size')).partial('size')
+    from_below = (gridconnection(15.0).value - gridconnection(15.0 - step).value) / step
+
+    assert derivative == pytest.approx(from_below, rel=1e-5)
+
+
+@pytest.mark.parametrize('system_size_MW_DC', [3.3, 16.3, 50.3, 151.3, 700.3])
+def test_scalar_engine_partials(solar_input_dict, system_size_MW_DC):
+    engine = ScalarEngine(solar_input_dict(50))
+    inputs = dict(system_size_MW_DC=system_size_MW_DC, dist_interconnect_mi=2.0,
+                  interconnect_voltage_kV=34.5, construction_time_months=12.3)
+
+    totals = engine.totals(**{name: Dual.variable(value, name)
+                              for name, value in inputs.items()})
+    assert totals['total_bos_cost'].value == \
+        pytest.approx(engine.totals(**inputs)['total_bos_cost'], rel=1e-12)
+
+    for name, value in inputs.items():
+        def total_bos_cost(x):
+            return engine.totals(**dict(inputs, **{name: x}))['total_bos_cost']
+
+        assert totals['total_bos_cost'].partial(name) == \
+            pytest.approx(central_difference(total_bos_cost, value), rel=1e-5, abs=1e-3)
+
+
+def test_hybrid_BOS_derivatives(solar_input_dict):
+    main = pytest.importorskip('main')
+
+    engine = ScalarEngine(solar_input_dict(50))
+    wind_BOS = {'total_bos_cost': 3e7, 'total_management_cost': 4e6,
+                'total_gridconnection_cost': 1e6, 'total_substation_cost': 2e6,
+                'markup_contingency_usd': 5e5, 'site_facility_usd': 6e5,
+                'insurance_usd': 1e5, 'construction_permitting_usd': 1e5,
+                'project_management_usd': 1e5, 'bonding_usd': 1e5, 'engineering_usd': 1e5}
+    scenario = {'shared_interconnection': True, 'distance_to_interconnect_mi': 1.5,
+                'new_switchyard': True, 'grid_interconnection_rating_MW': 40.3,
+                'interconnect_voltage_kV': 34.5, 'shared_substation': True,
+                'hybrid_substation_rating_MW': 40.3, 'num_turbines': 10,
+                'turbine_rating_MW': 2, 'wind_construction_time_months': 8,
+                'solar_system_size_MW_DC': 30.3, 'dc_ac_ratio': 1.2,
+                'solar_construction_time_months': 9, 'solar_dist_interconnect_mi': 2}
+
+    results = main.hybrid_BOS_derivatives(scenario, main.DIFFERENTIABLE_INPUTS,
+                                          wind_BOS=wind_BOS, engine=engine)
+
+    for name in main.DIFFERENTIABLE_INPUTS:
+        def hybrid_BOS_usd(x):
+            return main.hybrid_BOS_derivatives(dict(scenario, **{name: x}), [],
+                                               wind_BOS=wind_BOS,
+                                               engine=engine)['hybrid_BOS_usd'].value
+
+        assert results['hybrid_BOS_usd'].partial(name) == \
+            pytest.approx(central_difference(hybrid_BOS_usd, scenario[name]),
+                          rel=1e-5, abs=1e-3), name
+
+    with pytest.raises(ValueError):
+        main.hybrid_BOS_derivatives(scenario, ['num_turbines'], wind_BOS=wind_BOS,
+                                    engine=engine)
@@ -0,0 +1,167 @@
+"""Tests for `hybrids_shared_infrastructure.HybridResultCache`."""
+
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from hybrids_shared_infrastructure import HybridResultCache as result_cache_module
+from hybrids_shared_infrastructure.HybridResultCache import HybridResultCache
+
+
+SCENARIO = {'num_turbines': 5, 'turbine_rating_MW': 1.5, 'solar_system_size_MW_DC': 7.5,
+            'shared_interconnection': True, 'project_id': 'test'}
+
+
+class CountingRun:
+    """
+    Stands in for run_hybrid_BOS(), counting the scenarios it runs.
+    """
+
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self, hybrids_input_dict, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        total = hybrids_input_dict['solar_system_size_MW_DC'] * 1e6
+        return {'hybrid': {'hybrid_BOS_usd': total}}, {'total_bos_cost': 0}, \
+            {'total_bos_cost': total}
+
+
+def test_key_is_canonical():
+    cache = HybridResultCache(run=CountingRun(), code_version='test')
+
+    reordered = dict(reversed(list(SCENARIO.items())))
+    retyped = dict(SCENARIO, num_turbines=np.int64(5), solar_system_size_MW_DC=7.50)
+
+    assert cache.key(reordered) == cache.key(SCENARIO)
+    assert cache.key(retyped) == cache.key(SCENARIO)
+    assert cache.key(dict(SCENARIO, num_turbines=6)) != cache.key(SCENARIO)
+    assert cache.key(dict(SCENARIO, shared_interconnection=1)) != cache.key(SCENARIO)
+    assert HybridResultCache(run=CountingRun(), code_version='other').key(SCENARIO) != \
+        cache.key(SCENARIO)
+
+
+def test_repeat_scenarios_are_cached():
+    run = CountingRun()
+    cache = HybridResultCache(run=run, code_version='test')
+
+    first = cache.run_hybrid_BOS(SCENARIO)
+    first[0]['hybrid']['hybrid_BOS_usd'] = 0    # callers may modify their results
+    second = cache.run_hybrid_BOS(dict(SCENARIO))
+
+    assert run.calls == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert second[0]['hybrid']['hybrid_BOS_usd'] == 7.5e6
+    assert pickle.dumps(second) == pickle.dumps(cache.run_hybrid_BOS(SCENARIO))
+
+
+def test_least_recently_used_results_are_evicted():
+    run = CountingRun()
+    cache = HybridResultCache(run=run, max_entries=2, code_version='test')
+
+    for size in [1, 2, 1, 3, 1, 2]:
+        cache.run_hybrid_BOS(dict(SCENARIO, solar_system_size_MW_DC=size))
+
+    # 2 is evicted by 3, since 1 was used more recently:
+    assert run.calls == 4
+
+
+def test_disk_store(tmp_path):
+    run = CountingRun()
+    HybridResultCache(run=run, directory=str(tmp_path),
+                      code_version='test').run_hybrid_BOS(SCENARIO)
+
+    results = HybridResultCache(run=run, directory=str(tmp_path),
+                                code_version='test').run_hybrid_BOS(SCENARIO)
+
+    assert run.calls == 1
+    assert results[2]['total_bos_cost'] == 7.5e6
+    assert [path.suffix for path in tmp_path.iterdir()] == ['.pickle']
+
+
+def test_concurrent_identical_requests_run_once():
+    run = CountingRun(delay=0.2)
+    cache = HybridResultCache(run=run, code_version='test')
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: cache.run_hybrid_BOS(SCENARIO), range(8)))
+
+    assert run.calls == 1
+    assert len({pickle.dumps(result) for result in results}) == 1
+
+
+def test_errors_are_not_cached():
+    attempts = []
+
+    def failing_run(hybrids_input_dict, **kwargs):
+        attempts.append(threading.get_ident())
+        raise RuntimeError('LandBOSSE failed')
+
+    cache = HybridResultCache(run=failing_run, code_version='test')
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            cache.run_hybrid_BOS(SCENARIO)
+
+    assert len(attempts) == 2
+
+
+def test_key_hashes_landbosse_inputs(tmp_path):
+    (tmp_path / 'project_data').mkdir()
+    (tmp_path / 'project_list_.xlsx').write_bytes(b'project list')
+    (tmp_path / 'project_data' / 'ge15_public.xlsx').write_bytes(b'project data')
+    scenario = dict(SCENARIO, path_to_project_list=str(tmp_path),
+                    name_of_project_list='project_list_')
+    cache = HybridResultCache(run=CountingRun(), code_version='test', check_interval=0)
+
+    data_files = cache.landbosse_data_files(scenario)
+    assert data_files[0] == str(tmp_path / 'project_list_.xlsx')
+    assert str(tmp_path / 'project_data' / 'ge15_public.xlsx') in data_files
+    # Without a project list, LandBOSSE reads the project list of its API:
+    assert cache.landbosse_data_files(SCENARIO)[0].endswith(
+        os.path.join('landbosse_api', 'project_list.xlsx'))
+
+    keys = [cache.key(scenario)]
+    (tmp_path / 'project_data' / 'ge15_public.xlsx').write_bytes(b'edited project data')
+    keys.append(cache.key(scenario))
+    (tmp_path / 'project_list_.xlsx').write_bytes(b'edited project list')
+    keys.append(cache.key(scenario))
+
+    assert len(set(keys)) == 3
+
+
+def test_data_files_checked_once_per_interval(tmp_path, monkeypatch):
+    (tmp_path / 'project_list_.xlsx').write_bytes(b'project list')
+    scenario = dict(SCENARIO, path_to_project_list=str(tmp_path),
+                    name_of_project_list='project_list_')
+    now = [1000.0]
+    monkeypatch.setattr(result_cache_module.time, 'monotonic', lambda: now[0])
+    cache = HybridResultCache(run=CountingRun(), code_version='test', check_interval=10)
+
+    key = cache.key(scenario)
+    (tmp_path / 'project_list_.xlsx').write_bytes(b'edited project list')
+    now[0] += 5
+    assert cache.key(scenario) == key
+
+    now[0] += 5
+    edited_key = cache.key(scenario)
+    assert edited_key != key
+
+    # clear() makes the next lookup check the data files:
+    (tmp_path / 'project_list_.xlsx').write_bytes(b'project list')
+    cache.clear()
+    assert cache.key(scenario) == key
+
+
+def test_source_version_includes_landbosse_version(monkeypatch):
+    monkeypatch.setattr(result_cache_module, '_landbosse_version', lambda: '2.3.0')
+    version = HybridResultCache.source_version()
+    monkeypatch.setattr(result_cache_module, '_landbosse_version', lambda: '2.4.0')
+
+    assert HybridResultCache.source_version() != version
@@ -0,0 +1,38 @@
+"""Tests for XlsxReader.labor_cost_view()."""
+
+import pandas as pd
+
+from SolarBOSSE.excelio.create_master_input_dict import XlsxReader
+
+
+def reference_labor_rates(construction_estimator, labor_cost_multiplier):
+    # Row by row mapping of the labor rates, as formerly done with an apply():
+    return [row['Rate USD per unit'] * labor_cost_multiplier
+            if row['Type of cost'] == 'Labor' else row['Rate USD per unit']
+            for _, row in construction_estimator.iterrows()]
+
+
+def test_labor_cost_view(project_data_sheets):
+    project_data = {sheet_name: sheet.copy()
+                    for sheet_name, sheet in project_data_sheets.items()}
+    xlsx_reader = XlsxReader()
+
+    view = xlsx_reader.labor_cost_view(project_data, 1.3)
+
+    pd.testing.assert_series_equal(
+        view['construction_estimator']['Rate USD per unit'],
+        pd.Series(reference_labor_rates(project_data['construction_estimator'], 1.3),
+                  name='Rate USD per unit'),
+        check_dtype=False)
+    pd.testing.assert_series_equal(
+        view['crew_price']['Hourly rate USD per hour'],
+        project_data['crew_price']['Hourly rate USD per hour'] * 1.3)
+
+    # The project data is not modified, and the other sheets are shared:
+    for sheet_name, sheet in project_data_sheets.items():
+        pd.testing.assert_frame_equal(project_data[sheet_name], sheet)
+    assert view['material_price'] is project_data['material_price']
+
+    # Without a multiplier, no sheet is copied:
+    assert xlsx_reader.labor_cost_view(project_data, 1)['construction_estimator'] \
+        is project_data['construction_estimator']
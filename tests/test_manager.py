@@ -0,0 +1,112 @@
+"""Tests for the dependency graph of `SolarBOSSE.model.Manager`."""
+
+import pytest
+
+from SolarBOSSE.model.CostModule import CostModule
+from SolarBOSSE.model.Manager import Manager
+
+
+class FencingCost(CostModule):
+    """
+    A custom cost module: fencing around the perimeter of the site.
+    """
+
+    input_keys = CostModule.input_keys + ('fence_usd_per_m',)
+    output_keys = ('total_fencing_cost',)
+    total_cost_key = 'total_fencing_cost'
+
+    def run_module(self):
+        try:
+            perimeter_m = 4 * self.input_dict['site_prep_area_m2'] ** 0.5
+            self.output_dict['total_fencing_cost'] = \
+                perimeter_m * self.input_dict['fence_usd_per_m']
+            return 0, 0
+        except Exception as error:
+            self.record_error(error)
+            return 1, error
+
+
+def test_dependency_graph():
+    graph = Manager(dict(), dict()).dependency_graph()
+
+    assert list(graph)[:7] == ['SitePreparationCost', 'RackingSystemInstallation',
+                               'CollectionCost', 'FoundationCost',
+                               'InverterTransformerErection', 'SubstationCost',
+                               'GridConnectionCost']
+    assert graph['SubstationCost'] == []
+    assert graph['GridConnectionCost'] == []
+    assert graph['InverterTransformerErection'] == ['FoundationCost']
+    assert graph['ManagementCost'] == ['total_bos_cost_before_mgmt']
+    assert list(graph)[-3:] == ['total_bos_cost_before_mgmt', 'ManagementCost',
+                                'total_bos_cost']
+
+
+def test_thread_concurrency_matches_serial(solar_input_dict):
+    serial_output = Manager(solar_input_dict(50), dict()).execute_solarbosse()
+    thread_output = Manager(solar_input_dict(50), dict(),
+                            concurrency='thread').execute_solarbosse()
+
+    assert set(thread_output) == set(serial_output)
+    for key in ['total_bos_cost', 'total_erection_cost', 'total_management_cost',
+                'managament_crew_cost_before_wind_delay', 'management_crew_cost']:
+        assert thread_output[key] == serial_output[key]
+
+
+def test_outputs_prune_steps(solar_input_dict):
+    output_dict = Manager(solar_input_dict(50), dict()).execute_solarbosse(
+        outputs=['total_erection_cost'])
+
+    assert 'total_erection_cost' in output_dict
+    assert 'total_foundation_cost' in output_dict
+    assert 'total_collection_cost' not in output_dict
+    assert 'total_bos_cost' not in output_dict
+
+    with pytest.raises(ValueError):
+        Manager(solar_input_dict(50), dict()).execute_solarbosse(outputs=['no_such_key'])
+
+
+def test_custom_cost_module(solar_input_dict):
+    default_output = Manager(solar_input_dict(50), dict()).execute_solarbosse()
+
+    input_dict = solar_input_dict(50, fence_usd_per_m=20)
+    manager = Manager(input_dict, dict(),
+                      cost_modules=Manager.default_cost_modules + [FencingCost])
+    output_dict = manager.execute_solarbosse()
+
+    assert manager.dependency_graph()['FencingCost'] == []
+    assert 'FencingCost' in manager.dependency_graph()['total_bos_cost_before_mgmt']
+    assert output_dict['total_bos_cost_before_mgmt'] == pytest.approx(
+        default_output['total_bos_cost_before_mgmt'] + output_dict['total_fencing_cost'])
+
+
+def test_invalid_concurrency():
+    with pytest.raises(ValueError):
+        Manager(dict(), dict(), concurrency='process')
+
+    with pytest.raises(ValueError):
+        Manager(dict(), dict(), concurrency='thread', incremental=True)
+
+
+def test_incremental_reruns_changed_steps(solar_input_dict):
+    # The input dictionary holds no construction estimator index to start with:
+    input_dict = solar_input_dict(50)
+    input_dict.pop('construction_estimator_index', None)
+    manager = Manager(input_dict, dict(), incremental=True)
+
+    manager.execute_solarbosse()
+    assert manager.executed_steps == list(manager.dependency_graph())
+
+    manager.execute_solarbosse()
+    assert manager.executed_steps == []
+
+    input_dict['dist_interconnect_mi'] = 5
+    output_dict = manager.execute_solarbosse()
+    assert manager.executed_steps == ['GridConnectionCost',
+                                      'total_bos_cost_before_mgmt',
+                                      'ManagementCost', 'total_bos_cost']
+
+    full_output = Manager(solar_input_dict(50, dist_interconnect_mi=5),
+                          dict()).execute_solarbosse()
+    for key in ['total_transdist_cost', 'total_bos_cost_before_mgmt',
+                'total_management_cost', 'total_bos_cost', 'total_erection_cost']:
+        assert output_dict[key] == full_output[key]
@@ -0,0 +1,104 @@
+"""Tests for `hybrids_shared_infrastructure.monte_carlo`."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from SolarBOSSE.ScalarEngine import ScalarEngine
+from hybrids_shared_infrastructure.monte_carlo import draw_samples, triangular_ppf, \
+    quantile_table, run_monte_carlo, RESULT_COLUMNS
+
+
+DISTRIBUTIONS = [(0.9, 1.0, 1.3), (0.8, 0.8, 1.5), (1.0, 1.0, 1.0)]
+
+SCENARIO = {'shared_interconnection': True, 'distance_to_interconnect_mi': 1.5,
+            'new_switchyard': True, 'grid_interconnection_rating_MW': 40.3,
+            'interconnect_voltage_kV': 34.5, 'shared_substation': True,
+            'hybrid_substation_rating_MW': 40.3, 'num_turbines': 10,
+            'turbine_rating_MW': 2, 'wind_construction_time_months': 8,
+            'solar_system_size_MW_DC': 30.3, 'dc_ac_ratio': 1.2,
+            'solar_construction_time_months': 9, 'solar_dist_interconnect_mi': 2}
+
+WIND_BOS = {'total_bos_cost': 3e7, 'total_management_cost': 4e6,
+            'total_gridconnection_cost': 1e6, 'total_substation_cost': 2e6,
+            'markup_contingency_usd': 5e5, 'site_facility_usd': 6e5,
+            'insurance_usd': 1e5, 'construction_permitting_usd': 1e5,
+            'project_management_usd': 1e5, 'bonding_usd': 1e5, 'engineering_usd': 1e5}
+
+
+def test_triangular_ppf():
+    low, mode, high = 1.0, 2.0, 4.0
+
+    np.testing.assert_allclose(triangular_ppf(np.array([0, 1 / 3, 1]), low, mode, high),
+                               [1, 2, 4])
+    # The cumulative distribution function at 3 is 1 - 1 ** 2 / (3 * 2):
+    assert triangular_ppf(5 / 6, low, mode, high) == pytest.approx(3)
+    # Degenerate distributions always return their mode:
+    assert triangular_ppf(0.3, 2.0, 2.0, 2.0) == 2
+
+
+@pytest.mark.parametrize('latin_hypercube', [False, True])
+def test_draw_samples(latin_hypercube):
+    samples = draw_samples(np.random.default_rng(0), 20000, DISTRIBUTIONS, latin_hypercube)
+
+    assert samples.shape == (20000, 3)
+    for column, (low, mode, high) in zip(samples.T, DISTRIBUTIONS):
+        assert column.min() >= low and column.max() <= high
+        assert column.mean() == pytest.approx((low + mode + high) / 3, rel=5e-3)
+
+
+def test_latin_hypercube_strata():
+    samples = draw_samples(np.random.default_rng(0), 10, [(0, 0, 1), (0, 1, 1)],
+                           latin_hypercube=True)
+
+    # One sample in each tenth of the probability of each distribution:
+    probabilities = np.column_stack([1 - (1 - samples[:, 0]) ** 2, samples[:, 1] ** 2])
+    for column in probabilities.T:
+        assert sorted(np.floor(column * 10)) == list(range(10))
+
+
+def test_quantile_table():
+    samples = pd.DataFrame({column: np.arange(101.0) for column in RESULT_COLUMNS})
+
+    table = quantile_table(samples, (0.1, 0.5, 0.9))
+
+    assert list(table.index) == ['P10', 'P50', 'P90']
+    np.testing.assert_allclose(table['hybrid_BOS_usd'], [10, 50, 90])
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        run_monte_carlo(SCENARIO, 10, concurrency='process')
+    with pytest.raises(ValueError):
+        run_monte_carlo(SCENARIO, 10, uncertainties={'num_turbines': (0.9, 1, 1.1)})
+
+
+def test_run_monte_carlo(solar_input_dict):
+    main = pytest.importorskip('main')
+
+    engine = ScalarEngine(solar_input_dict(50))
+    uncertainties = {'labor_rate_scale': (0.9, 1.0, 1.3),
+                     'distance_to_interconnect_mi': (0.5, 1.0, 2.0),
+                     'solar_construction_time_months': (0.8, 1.0, 1.2)}
+
+    quantiles, samples = run_monte_carlo(SCENARIO, 50, uncertainties, seed=1, block_size=16,
+                                         wind_BOS=WIND_BOS, engine=engine)
+    _, threaded_samples = run_monte_carlo(SCENARIO, 50, uncertainties, seed=1, block_size=16,
+                                          concurrency='thread', max_workers=3,
+                                          wind_BOS=WIND_BOS, engine=engine)
+
+    assert len(samples) == 50
+    pd.testing.assert_frame_equal(samples, threaded_samples)
+    assert (quantiles['hybrid_BOS_usd'].diff().dropna() >= 0).all()
+
+    # Each sample matches its scenario run on its own:
+    for sample in samples.head(3).to_dict('records'):
+        scenario = dict(SCENARIO, **{name: sample[name] for name in uncertainties
+                                     if name in SCENARIO})
+        solar_input_dict = main.solar_leg_input_dict(main.derive_hybrid_fields(scenario))
+        solar_input_dict['labor_rate_scale'] = sample['labor_rate_scale']
+        solar_BOS = main.run_solar_leg_on_engine(solar_input_dict, engine)
+        results, _, _ = main.combine_BOS_results(scenario, dict(WIND_BOS), solar_BOS)
+
+        assert sample['hybrid_BOS_usd'] == \
+            pytest.approx(results['hybrid']['hybrid_BOS_usd'], rel=1e-12)
@@ -0,0 +1,71 @@
+"""Tests for `hybrids_shared_infrastructure.optimize_split`."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from hybrids_shared_infrastructure.optimize_split import optimize_capacity_split
+
+
+BASE_SCENARIO = {'shared_interconnection': True, 'grid_interconnection_rating_MW': 100,
+                 'num_turbines': 20, 'turbine_rating_MW': 2.5,
+                 'solar_system_size_MW_DC': 50}
+
+
+def piecewise_usd_watt(wind_plant_size_MW, solar_system_size_MW_DC):
+    """
+    Cost per watt that is smooth (and unimodal) between the breakpoints of the
+    cost curves, with jumps at 15 and 50 MW.
+    """
+    return 1 + 1e-4 * (wind_plant_size_MW - 62) ** 2 + \
+        np.where(wind_plant_size_MW > 15, -0.05, 0) + \
+        np.where(solar_system_size_MW_DC > 50, 0.08, 0)
+
+
+class Evaluator:
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, scenarios):
+        self.batches.append(len(scenarios))
+        wind_plant_size_MW = scenarios['num_turbines'] * scenarios['turbine_rating_MW']
+        return pd.DataFrame({'hybrid_BOS_usd_watt': piecewise_usd_watt(
+            wind_plant_size_MW, scenarios['solar_system_size_MW_DC'])},
+            index=scenarios.index)
+
+
+def test_optimum_matches_exhaustive_search():
+    evaluate = Evaluator()
+    optimum, frontier = optimize_capacity_split(BASE_SCENARIO, evaluate=evaluate)
+
+    num_turbines = np.arange(0, 41)
+    expected = piecewise_usd_watt(num_turbines * 2.5, 100 - num_turbines * 2.5)
+    assert optimum['num_turbines'] == num_turbines[np.argmin(expected)]
+    assert optimum['wind_plant_size_MW'] + optimum['solar_system_size_MW_DC'] == 100
+    assert optimum['hybrid_BOS_usd_watt'] == pytest.approx(expected.min())
+
+    # The search evaluates fewer splits than an exhaustive search, each once, in
+    # a few batches:
+    assert len(frontier) < len(num_turbines)
+    assert frontier['num_turbines'].is_unique
+    assert list(frontier['num_turbines']) == sorted(frontier['num_turbines'])
+    assert sum(evaluate.batches) == len(frontier)
+    assert len(evaluate.batches) <= 5
+
+
+def test_bounds_on_turbines():
+    optimum, frontier = optimize_capacity_split(BASE_SCENARIO, hybrid_plant_size_MW=60,
+                                                min_turbines=5, max_turbines=100,
+                                                evaluate=Evaluator())
+
+    assert frontier['num_turbines'].min() == 5
+    assert frontier['num_turbines'].max() == 24
+    assert optimum['num_turbines'] == 24
+    assert (frontier['solar_system_size_MW_DC'] >= 0).all()
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        optimize_capacity_split(BASE_SCENARIO, points_per_piece=3, evaluate=Evaluator())
+    with pytest.raises(ValueError):
+        optimize_capacity_split(BASE_SCENARIO, min_turbines=50, evaluate=Evaluator())
@@ -0,0 +1,65 @@
+"""Tests for `SolarBOSSE.PipelineStats`."""
+
+import pickle
+import time
+
+import pytest
+
+from SolarBOSSE.PipelineStats import PipelineStats, pipeline_stats
+from SolarBOSSE.model.Manager import Manager
+
+
+def test_stages_are_timed_and_counted():
+    stats = PipelineStats()
+
+    for _ in range(3):
+        with stats.stage('sleep'):
+            time.sleep(0.01)
+
+    with pytest.raises(RuntimeError):
+        with stats.stage('fail'):
+            raise RuntimeError
+
+    totals = stats.as_dict()
+    assert totals['sleep']['calls'] == 3
+    assert totals['sleep']['wall_time_s'] >= 0.03
+    assert totals['sleep']['cpu_time_s'] < totals['sleep']['wall_time_s']
+    assert totals['fail']['calls'] == 1
+
+
+def test_timed_decorator():
+    stats = PipelineStats()
+
+    @stats.timed('double')
+    def double(x):
+        return 2 * x
+
+    assert [double(x) for x in range(4)] == [0, 2, 4, 6]
+    assert stats.as_dataframe().loc['double', 'calls'] == 4
+
+
+def test_merge_worker_stats():
+    stats = PipelineStats()
+    stats.record('solarbosse.run', 1.0, 0.5)
+
+    worker = PipelineStats()
+    worker.record('solarbosse.run', 2.0, 1.5, calls=2)
+    worker.record('hybrid.wind_leg', 3.0, 3.0)
+
+    stats.merge(pickle.loads(pickle.dumps(worker.as_dict())))
+    stats.merge(worker)
+
+    totals = stats.as_dict()
+    assert totals['solarbosse.run'] == {'calls': 5, 'wall_time_s': 5.0, 'cpu_time_s': 3.5}
+    assert totals['hybrid.wind_leg']['calls'] == 2
+
+
+def test_manager_times_each_cost_module(solar_input_dict):
+    pipeline_stats.reset()
+    Manager(solar_input_dict(50), dict()).execute_solarbosse()
+
+    stages = pipeline_stats.as_dataframe()
+    cost_module_stages = ['solarbosse.module.' + cost_module.__name__
+                          for cost_module in Manager.default_cost_modules]
+    assert list(stages.loc[cost_module_stages, 'calls']) == [1] * 8
+    assert (stages['wall_time_s'] > 0).all()
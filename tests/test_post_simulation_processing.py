@@ -0,0 +1,179 @@
+"""Tests for the columnar (vectorized) shared-infrastructure kernels."""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from hybrids_shared_infrastructure.GridConnectionCost import hybrid_gridconnection, \
+    hybrid_gridconnection_array
+from hybrids_shared_infrastructure.SubstationCost import hybrid_substation, \
+    hybrid_substation_array
+from hybrids_shared_infrastructure.ManagementCost import site_facility, \
+    site_facility_array, epc_developer_profit_discount, \
+    epc_developer_profit_discount_array, development_overhead_cost_discount, \
+    development_overhead_cost_discount_array
+from hybrids_shared_infrastructure.PostSimulationProcessing import \
+    PostSimulationProcessing, ColumnarPostSimulationProcessing
+
+
+SIZES_MW = [1, 5, 9.99, 10, 10.01, 12, 15, 15.01, 20, 50, 100, 400]
+
+
+def test_gridconnection_array():
+    cases = list(itertools.product(SIZES_MW, [0, 0.5, 1, 10], [34.5, 138],
+                                   [True, False]))
+    size, dist, kV, switchyard = (np.array(column) for column in zip(*cases))
+
+    expected = [hybrid_gridconnection({'system_size_MW': case[0],
+                                       'dist_interconnect_mi': case[1],
+                                       'interconnect_voltage_kV': case[2],
+                                       'new_switchyard': case[3]})
+                for case in cases]
+
+    np.testing.assert_allclose(
+        hybrid_gridconnection_array(size, dist, kV, switchyard), expected,
+        rtol=1e-12)
+
+
+def test_substation_array():
+    cases = list(itertools.product(SIZES_MW, [34.5, 138]))
+    rating, kV = (np.array(column) for column in zip(*cases))
+
+    expected = [hybrid_substation({'hybrid_substation_rating_MW': case[0],
+                                   'interconnect_voltage_kV': case[1]})
+                for case in cases]
+
+    np.testing.assert_allclose(hybrid_substation_array(rating, kV), expected,
+                               rtol=1e-12)
+
+
+def test_site_facility_array():
+    cases = list(itertools.product(SIZES_MW, [6, 24],
+                                   [0, 10, 29, 30, 50, 70, 99, 100, 130, 250]))
+    size, months, turbines = (np.array(column) for column in zip(*cases))
+
+    expected = [site_facility(*case) for case in cases]
+
+    np.testing.assert_allclose(site_facility_array(size, months, turbines),
+                               expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize('scalar, array', [
+    (epc_developer_profit_discount, epc_developer_profit_discount_array),
+    (development_overhead_cost_discount, development_overhead_cost_discount_array),
+])
+def test_discount_arrays(scalar, array):
+    cases = [(hybrid, technology) for hybrid in SIZES_MW
+             for technology in [0] + SIZES_MW if technology <= hybrid]
+    hybrid, technology = (np.array(column) for column in zip(*cases))
+
+    expected = [scalar(*case) for case in cases]
+
+    np.testing.assert_allclose(array(hybrid, technology), expected,
+                               rtol=1e-12, atol=1e-15)
+
+
+def wind_leg(wind_plant_size_MW):
+    leg = {
+        'insurance_usd': 4000 * wind_plant_size_MW,
+        'construction_permitting_usd': 3000 * wind_plant_size_MW,
+        'project_management_usd': 5000 * wind_plant_size_MW,
+        'bonding_usd': 2000 * wind_plant_size_MW,
+        'markup_contingency_usd': 9000 * wind_plant_size_MW,
+        'engineering_usd': 1000 * wind_plant_size_MW,
+        'site_facility_usd': 6000 * wind_plant_size_MW + 100000,
+        'total_gridconnection_cost': 20000 * wind_plant_size_MW + 500000,
+        'total_substation_cost': 15000 * wind_plant_size_MW + 1000000,
+    }
+    leg['total_management_cost'] = sum(value for key, value in leg.items()
+                                        if key.endswith('_usd'))
+    leg['total_bos_cost'] = leg['total_management_cost'] + \
+        leg['total_gridconnection_cost'] + leg['total_substation_cost'] + \
+        300000 * wind_plant_size_MW
+    return leg
+
+
+def solar_leg(solar_system_size_MW_DC):
+    leg = {
+        'epc_developer_profit': 12000 * solar_system_size_MW_DC,
+        'bonding_usd': 3000 * solar_system_size_MW_DC,
+        'development_overhead_cost': 40000 * solar_system_size_MW_DC + 800000,
+        'total_sales_tax': 40000 * solar_system_size_MW_DC + 800000,
+        'total_transdist_cost': 25000 * solar_system_size_MW_DC + 400000,
+        'substation_cost': 10000 * solar_system_size_MW_DC + 900000,
+    }
+    leg['total_management_cost'] = leg['epc_developer_profit'] + \
+        leg['bonding_usd'] + leg['development_overhead_cost']
+    leg['total_bos_cost'] = leg['total_management_cost'] + \
+        leg['total_transdist_cost'] + leg['substation_cost'] + \
+        450000 * solar_system_size_MW_DC
+    return leg
+
+
+def scenarios():
+    for num_turbines, solar_size, grid_rating, shared in itertools.product(
+            [1, 4, 25, 60, 120], [3, 8, 40, 200], [7.5, 12, 100], [True, False]):
+        wind_size = num_turbines * 2.5
+        yield {
+            'num_turbines': num_turbines,
+            'turbine_rating_MW': 2.5,
+            'wind_plant_size_MW': wind_size,
+            'solar_system_size_MW_DC': solar_size,
+            'hybrid_plant_size_MW': wind_size + solar_size,
+            'solar_construction_time_months': 12,
+            'hybrid_construction_months': 30,
+            'interconnect_voltage_kV': 138,
+            'distance_to_interconnect_mi': 5,
+            'new_switchyard': True,
+            'grid_interconnection_rating_MW': grid_rating,
+            'hybrid_substation_rating_MW': grid_rating,
+            'shared_interconnection': shared,
+            'shared_substation': shared,
+        }
+
+
+def test_columnar_post_simulation_processing():
+    hybrids_inputs = list(scenarios())
+    wind_legs = [wind_leg(scenario['wind_plant_size_MW'])
+                 for scenario in hybrids_inputs]
+    solar_legs = [solar_leg(scenario['solar_system_size_MW_DC'])
+                  for scenario in hybrids_inputs]
+
+    columnar = ColumnarPostSimulationProcessing(pd.DataFrame(hybrids_inputs),
+                                                pd.DataFrame(wind_legs),
+                                                pd.DataFrame(solar_legs))
+
+    for i, scenario in enumerate(hybrids_inputs):
+        wind_BOS = dict(wind_legs[i])
+        solar_BOS = dict(solar_legs[i])
+        scalar = PostSimulationProcessing(scenario, wind_BOS, solar_BOS)
+
+        assert columnar.hybrid_BOS_usd[i] == pytest.approx(scalar.hybrid_BOS_usd)
+        assert columnar.hybrid_BOS_usd_watt[i] == \
+            pytest.approx(scalar.hybrid_BOS_usd_watt)
+        assert columnar.hybrid_gridconnection_usd[i] == \
+            pytest.approx(scalar.hybrid_gridconnection_usd)
+        assert columnar.hybrid_substation_usd[i] == \
+            pytest.approx(scalar.hybrid_substation_usd)
+        assert columnar.hybrid_management_development_usd[i] == pytest.approx(
+            wind_BOS['total_management_cost'] + solar_BOS['total_management_cost'] +
+            scalar.site_facility_usd)
+
+
+def test_columnar_post_simulation_processing_missing_leg():
+    # A solar only scenario: the wind leg was not run, and only has a total cost.
+    scenario = next(scenarios())
+    scenario.update(num_turbines=0, wind_plant_size_MW=0,
+                    hybrid_plant_size_MW=scenario['solar_system_size_MW_DC'])
+
+    columnar = ColumnarPostSimulationProcessing(
+        pd.DataFrame([scenario]),
+        pd.DataFrame([{'total_bos_cost': 0}]),
+        pd.DataFrame([solar_leg(scenario['solar_system_size_MW_DC'])]))
+
+    solar_BOS = solar_leg(scenario['solar_system_size_MW_DC'])
+    assert columnar.hybrid_BOS_usd_watt[0] == pytest.approx(
+        columnar.solar_bos_usd[0] / (scenario['solar_system_size_MW_DC'] * 1e6))
+    assert columnar.solar_bos_usd[0] <= solar_BOS['total_bos_cost']
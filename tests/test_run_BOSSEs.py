@@ -0,0 +1,56 @@
+"""Tests for `hybrids_shared_infrastructure.run_BOSSEs`."""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+
+@pytest.fixture
+def leg_inputs(hybrid_scenario, fake_wind_leg, solar_project_list):
+    """
+    Returns the hybrid scenario, with derived fields, and its serial wind and
+    solar results.
+    """
+    main = pytest.importorskip('main')
+    scenario = main.derive_hybrid_fields(hybrid_scenario)
+    return scenario, main.run_BOSSEs(scenario)
+
+
+@pytest.mark.parametrize('concurrency', ['thread', 'process'])
+def test_concurrent_legs_match_serial_legs(leg_inputs, concurrency):
+    from hybrids_shared_infrastructure.run_BOSSEs import run_BOSSEs
+
+    # Worker processes only see the fake wind leg if they are forked:
+    if concurrency == 'process' and multiprocessing.get_start_method() != 'fork':
+        pytest.skip('worker processes are not forked')
+
+    scenario, (wind_BOS, solar_BOS) = leg_inputs
+    assert solar_BOS['total_bos_cost'] > 0
+
+    assert run_BOSSEs(scenario, concurrency) == (wind_BOS, solar_BOS)
+
+
+@pytest.mark.parametrize('executor_class', [ThreadPoolExecutor, ProcessPoolExecutor])
+def test_legs_run_in_given_executor(leg_inputs, executor_class):
+    from hybrids_shared_infrastructure.run_BOSSEs import run_BOSSEs
+
+    scenario, (wind_BOS, solar_BOS) = leg_inputs
+    kwargs = dict(mp_context=multiprocessing.get_context('fork')) \
+        if executor_class is ProcessPoolExecutor else dict()
+
+    with executor_class(max_workers=2, **kwargs) as executor:
+        # concurrency is ignored when an executor is given:
+        assert run_BOSSEs(scenario, 'serial', executor) == (wind_BOS, solar_BOS)
+        assert run_BOSSEs(scenario, 'thread', executor) == (wind_BOS, solar_BOS)
+
+
+def test_invalid_concurrency(hybrid_scenario):
+    main = pytest.importorskip('main')
+    scenario = main.derive_hybrid_fields(hybrid_scenario)
+
+    for concurrency in ['processes', None]:
+        with pytest.raises(ValueError):
+            main.run_BOSSEs(scenario, concurrency)
+        with pytest.raises(ValueError):
+            main.run_hybrid_BOS(scenario, concurrency)
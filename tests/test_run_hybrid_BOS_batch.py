@@ -0,0 +1,118 @@
+"""Tests for `run_hybrid_BOS_batch()` and the helpers it shares with `run_hybrid_BOS()`."""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tests.conftest import wind_leg_results, solar_leg_results
+
+
+def batch_scenarios(hybrid_scenario):
+    """
+    Scenarios combining two wind plants, two solar plants and two distances to
+    interconnect, with one of them overriding the wind management cost.
+    """
+    scenarios = pd.DataFrame([
+        dict(hybrid_scenario, num_turbines=num_turbines, solar_system_size_MW_DC=solar_MW,
+             distance_to_interconnect_mi=distance_mi)
+        for num_turbines, solar_MW, distance_mi in itertools.product([10, 25], [20, 60],
+                                                                     [1.5, 4])])
+    scenarios['override_total_management_cost'] = np.nan
+    scenarios.loc[7, 'override_total_management_cost'] = 1.5e6
+    return scenarios
+
+
+def test_derive_hybrid_fields_on_dataframe(hybrid_scenario):
+    main = pytest.importorskip('main')
+    scenarios = batch_scenarios(hybrid_scenario)
+    scenarios.loc[0, 'num_turbines'] = np.nan
+
+    derived = main.derive_hybrid_fields(scenarios.copy())
+
+    assert derived['num_turbines'].dtype == int
+    for (_, row), (_, derived_row) in zip(scenarios.iterrows(), derived.iterrows()):
+        scenario = row.dropna().to_dict()
+        scenario['num_turbines'] = scenario.get('num_turbines')
+        expected = main.derive_hybrid_fields(scenario)
+        for key in ['num_turbines', 'wind_plant_size_MW', 'hybrid_plant_size_MW',
+                    'hybrid_construction_months']:
+            assert derived_row[key] == expected[key]
+
+
+def test_combine_BOS_results(hybrid_scenario):
+    main = pytest.importorskip('main')
+    scenario = main.derive_hybrid_fields(hybrid_scenario)
+    wind_BOS = wind_leg_results(main.wind_leg_input_dict(scenario))
+    solar_BOS = solar_leg_results(main.solar_leg_input_dict(scenario))
+    leg_BOS = {'wind': dict(wind_BOS), 'solar': dict(solar_BOS)}
+
+    results, wind_only, solar_only = main.combine_BOS_results(scenario, wind_BOS, solar_BOS)
+
+    # The wind only and solar only results are the results of the legs, before
+    # the shared costs are removed from them:
+    assert wind_only == leg_BOS['wind']
+    assert solar_only == leg_BOS['solar']
+    assert results['hybrid']['hybrid_BOS_usd'] < \
+        leg_BOS['wind']['total_bos_cost'] + leg_BOS['solar']['total_bos_cost']
+    assert 'total_gridconnection_cost' not in results['Wind_BOS_results']
+    assert 'total_transdist_cost' not in results['Solar_BOS_results']
+
+
+def test_batch_matches_run_hybrid_BOS(hybrid_scenario, fake_wind_leg, fake_solar_leg):
+    main = pytest.importorskip('main')
+    scenarios = batch_scenarios(hybrid_scenario)
+
+    batch_results = main.run_hybrid_BOS_batch(scenarios)
+
+    # Each distinct leg is run once: the distance to interconnect is not an
+    # input of the legs, and the management cost override is a wind input:
+    assert len(fake_wind_leg) == 3
+    assert len(fake_solar_leg) == 2
+    assert list(batch_results.index) == list(scenarios.index)
+    assert list(batch_results.columns) == main.FLAT_RESULT_COLUMNS + ['error']
+    assert batch_results['error'].isna().all()
+
+    for index, row in scenarios.iterrows():
+        scenario = main.derive_hybrid_fields(row.dropna().to_dict())
+        expected = main.flatten_BOS_results(*main.run_hybrid_BOS(scenario))
+        for column in main.FLAT_RESULT_COLUMNS:
+            assert batch_results.loc[index, column] == \
+                pytest.approx(expected[column], rel=1e-12), column
+
+
+def failing_solar_leg(solar_input_dict):
+    """
+    Solar leg failing (as SolarBOSSE does) for plants larger than 50 MW DC.
+    """
+    if solar_input_dict['system_size_MW_DC'] > 50:
+        return {'errors': ['Error in SitePreparationCost: no road']}
+    return solar_leg_results(solar_input_dict)
+
+
+def test_batch_reports_failed_legs(hybrid_scenario, fake_wind_leg, monkeypatch):
+    main = pytest.importorskip('main')
+    monkeypatch.setattr(main, 'run_solar_leg', failing_solar_leg)
+    scenarios = batch_scenarios(hybrid_scenario)
+    failed = scenarios['solar_system_size_MW_DC'] > 50
+
+    batch_results = main.run_hybrid_BOS_batch(scenarios)
+
+    assert failed.any() and not failed.all()
+    assert batch_results.loc[failed, main.FLAT_RESULT_COLUMNS].isna().all().all()
+    assert (batch_results.loc[failed, 'error'] ==
+            'solar leg: Error in SitePreparationCost: no road').all()
+
+    # The other scenarios are not affected:
+    assert batch_results.loc[~failed, 'error'].isna().all()
+    for index, row in scenarios[~failed].iterrows():
+        scenario = main.derive_hybrid_fields(row.dropna().to_dict())
+        expected = main.run_hybrid_BOS_flat(scenario)
+        for column in main.FLAT_RESULT_COLUMNS:
+            assert batch_results.loc[index, column] == \
+                pytest.approx(expected[column], rel=1e-12), column
+
+    with pytest.raises(ValueError, match='no road'):
+        main.run_hybrid_BOS_flat(
+            main.derive_hybrid_fields(scenarios[failed].iloc[0].dropna().to_dict()))
@@ -0,0 +1,88 @@
+"""Tests for `hybrids_shared_infrastructure.run_sweep`."""
+
+import multiprocessing
+from multiprocessing import shared_memory
+
+import pytest
+
+
+SCENARIO_DELTAS = [{'num_turbines': 10},
+                   {'num_turbines': 25, 'distance_to_interconnect_mi': 4},
+                   {'solar_system_size_MW_DC': 60},
+                   {'solar_system_size_MW_DC': 60, 'shared_substation': False}]
+
+
+def expected_rows(hybrid_scenario, scenario_deltas):
+    """
+    Flattened results of the scenarios, run serially with run_hybrid_BOS_flat().
+    """
+    main = pytest.importorskip('main')
+    return [main.run_hybrid_BOS_flat(main.derive_hybrid_fields(dict(hybrid_scenario,
+                                                                    **scenario_delta)))
+            for scenario_delta in scenario_deltas]
+
+
+def assert_rows_equal(results, scenario_deltas, rows):
+    assert len(results) == len(rows)
+    for index, (scenario_delta, row) in enumerate(zip(scenario_deltas, rows)):
+        for key, value in scenario_delta.items():
+            assert results.loc[index, key] == value
+        for key, value in row.items():
+            assert results.loc[index, key] == pytest.approx(value, rel=1e-12), key
+
+
+@pytest.mark.parametrize('shared', [True, False])
+def test_run_sweep_matches_serial_runs(hybrid_scenario, fake_wind_leg, solar_project_list,
+                                       monkeypatch, shared):
+    from hybrids_shared_infrastructure import run_sweep as run_sweep_module
+
+    # Keep the shared project data of the sweep, to check it is unlinked:
+    shared_project_data = []
+    original_share_project_data = run_sweep_module.share_project_data
+
+    def share_project_data(project_list):
+        shared_project_data.append(original_share_project_data(project_list))
+        return shared_project_data[-1]
+
+    monkeypatch.setattr(run_sweep_module, 'share_project_data', share_project_data)
+    # The workers are forked, and clear their leg results after every scenario:
+    monkeypatch.setattr(run_sweep_module, '_max_leg_results', 0)
+
+    results = run_sweep_module.run_sweep(hybrid_scenario, SCENARIO_DELTAS, max_workers=2,
+                                         mp_context=multiprocessing.get_context('fork'),
+                                         shared_memory=shared)
+
+    assert_rows_equal(results, SCENARIO_DELTAS,
+                      expected_rows(hybrid_scenario, SCENARIO_DELTAS))
+
+    assert len(shared_project_data) == int(shared)
+    for project_data in shared_project_data:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=project_data.manifest['name'])
+
+
+def test_worker_runs_scenario_deltas(hybrid_scenario, fake_wind_leg, solar_project_list,
+                                     monkeypatch):
+    from hybrids_shared_infrastructure import run_sweep as run_sweep_module
+
+    monkeypatch.setattr(run_sweep_module, '_base_scenario', None)
+    monkeypatch.setattr(run_sweep_module, '_leg_results', {'stale leg': dict()})
+    monkeypatch.setattr(run_sweep_module, '_max_leg_results', 3)
+
+    run_sweep_module._initialize_worker(dict(hybrid_scenario))
+
+    # The initializer runs the wind leg of the base scenario once:
+    assert len(fake_wind_leg) == 1
+    assert run_sweep_module._base_scenario == hybrid_scenario
+    assert run_sweep_module._leg_results == dict()
+
+    scenario_deltas = [{'num_turbines': num_turbines, 'solar_system_size_MW_DC': 10 * i}
+                       for i, num_turbines in enumerate([5, 10, 15, 20, 25], 1)]
+    rows = []
+    for scenario_delta in scenario_deltas:
+        rows.append(run_sweep_module.run_scenario_delta(scenario_delta))
+        # Cleared once it holds more than 3 legs, before adding two more:
+        assert len(run_sweep_module._leg_results) <= 3 + 2
+
+    for row, expected_row in zip(rows, expected_rows(hybrid_scenario, scenario_deltas)):
+        assert row == pytest.approx(expected_row, rel=1e-12)
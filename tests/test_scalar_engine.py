@@ -0,0 +1,90 @@
+"""Tests for `SolarBOSSE.ScalarEngine`."""
+
+import numpy as np
+import pytest
+
+from SolarBOSSE.ScalarEngine import ScalarEngine
+from SolarBOSSE.model.Manager import Manager
+
+
+SIZES_MW_DC = [3, 10, 12, 16, 20, 50, 100, 149.5, 150, 151, 301, 450, 700, 5000]
+
+
+def manager_totals(input_dict, totals):
+    output_dict = Manager(input_dict, dict()).execute_solarbosse()
+    assert input_dict['error'] == dict()
+    return {key: output_dict[key] for key in totals}
+
+
+@pytest.mark.parametrize('overrides', [
+    dict(),
+    dict(construction_estimator_per_diem=50, construction_time_months=7,
+         dist_interconnect_mi=0, switchyard_y_n='n', substation_rating_MW=40)])
+def test_totals_match_manager(solar_input_dict, overrides):
+    engine = ScalarEngine(solar_input_dict(50, **overrides))
+
+    for system_size_MW_DC in SIZES_MW_DC:
+        grid_sizes = dict(grid_system_size_MW_DC=system_size_MW_DC,
+                          grid_size_MW_AC=system_size_MW_DC / 1.2)
+        totals = engine.totals(system_size_MW_DC=system_size_MW_DC, **grid_sizes)
+
+        expected = manager_totals(solar_input_dict(system_size_MW_DC, **overrides,
+                                                   **grid_sizes), totals)
+        for key, total in totals.items():
+            assert total == pytest.approx(expected[key], rel=1e-12), (system_size_MW_DC, key)
+
+
+def test_totals_of_arrays(solar_input_dict):
+    engine = ScalarEngine(solar_input_dict(50))
+    sizes = np.array(SIZES_MW_DC, dtype=float)
+
+    totals = engine.totals(system_size_MW_DC=sizes, grid_system_size_MW_DC=sizes,
+                           grid_size_MW_AC=sizes / 1.2)
+
+    for i, system_size_MW_DC in enumerate(SIZES_MW_DC):
+        expected = engine.totals(system_size_MW_DC=system_size_MW_DC,
+                                 grid_system_size_MW_DC=system_size_MW_DC,
+                                 grid_size_MW_AC=system_size_MW_DC / 1.2)
+        for key, total in expected.items():
+            assert totals[key][i] == pytest.approx(total, rel=1e-12)
+
+
+def test_unknown_inputs_are_rejected(solar_input_dict):
+    engine = ScalarEngine(solar_input_dict(50))
+
+    with pytest.raises(TypeError):
+        engine.totals(system_size_mw_dc=100)
+
+
+@pytest.mark.parametrize('scales', [
+    dict(labor_rate_scale=1.3),
+    dict(crew_rate_scale=1.2),
+    dict(material_price_scale=0.8),
+    dict(labor_rate_scale=1.1, crew_rate_scale=0.9, material_price_scale=1.25)])
+def test_scale_inputs_match_scaled_project_data(solar_input_dict, scales):
+    engine = ScalarEngine(solar_input_dict(50, construction_estimator_per_diem=40))
+    labor_rate_scale = scales.get('labor_rate_scale', 1)
+    crew_rate_scale = labor_rate_scale * scales.get('crew_rate_scale', 1)
+    material_price_scale = scales.get('material_price_scale', 1)
+
+    for system_size_MW_DC in [5, 50, 151, 700]:
+        grid_sizes = dict(grid_system_size_MW_DC=system_size_MW_DC,
+                          grid_size_MW_AC=system_size_MW_DC / 1.2)
+        totals = engine.totals(system_size_MW_DC=system_size_MW_DC, **grid_sizes, **scales)
+
+        input_dict = solar_input_dict(system_size_MW_DC, construction_estimator_per_diem=40,
+                                      **grid_sizes)
+        construction_estimator = input_dict['construction_estimator']
+        labor = construction_estimator['Type of cost'] == 'Labor'
+        construction_estimator.loc[labor, 'Rate USD per unit'] *= labor_rate_scale
+        crew_cost = input_dict['crew_cost']
+        for column in ['Hourly rate USD per hour', 'Per diem USD per day']:
+            crew_cost[column] = crew_cost[column] * crew_rate_scale
+        material_price = input_dict['material_price']
+        material_price['Material price USD per unit'] = \
+            [price * material_price_scale if isinstance(price, (int, float)) else price
+             for price in material_price['Material price USD per unit']]
+
+        expected = manager_totals(input_dict, totals)
+        for key, total in totals.items():
+            assert total == pytest.approx(expected[key], rel=1e-12), (system_size_MW_DC, key)
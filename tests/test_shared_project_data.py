@@ -0,0 +1,69 @@
+"""Tests for `SolarBOSSE.excelio.SharedProjectData`."""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from SolarBOSSE.excelio import SharedProjectData as shared_project_data_module
+from SolarBOSSE.excelio.SharedProjectData import SharedProjectData
+
+
+@pytest.fixture
+def shared_project_data(project_data_sheets):
+    with SharedProjectData.create({'project_data': project_data_sheets}) as shared:
+        yield shared
+
+
+def rate_sum(manifest):
+    shared = SharedProjectData.attach(manifest)
+    construction_estimator = \
+        shared.dataframes()['project_data']['construction_estimator']
+    return construction_estimator['Rate USD per unit'].sum()
+
+
+def test_attached_sheets_equal_originals(project_data_sheets, shared_project_data):
+    attached = SharedProjectData.attach(shared_project_data.manifest)
+    sheets = attached.dataframes()['project_data']
+
+    assert list(sheets) == list(project_data_sheets)
+    for sheet_name, sheet in project_data_sheets.items():
+        pd.testing.assert_frame_equal(sheets[sheet_name], sheet)
+
+
+def test_sheets_built_without_block_manager(project_data_sheets, shared_project_data,
+                                           monkeypatch):
+    # As with pandas versions whose block manager is not supported:
+    monkeypatch.setattr(shared_project_data_module, 'make_block', None)
+
+    attached = SharedProjectData.attach(shared_project_data.manifest)
+    sheets = attached.dataframes()['project_data']
+
+    for sheet_name, sheet in project_data_sheets.items():
+        pd.testing.assert_frame_equal(sheets[sheet_name], sheet)
+
+    hourly_rates = sheets['crew_price']['Hourly rate USD per hour'].to_numpy()
+    assert np.shares_memory(
+        hourly_rates, np.frombuffer(attached.shared_memory_segment.buf, dtype='u1'))
+    with pytest.raises(ValueError):
+        sheets['crew_price'].loc[0, 'Hourly rate USD per hour'] = 0
+
+
+def test_numeric_columns_are_shared_and_read_only(shared_project_data):
+    attached = SharedProjectData.attach(shared_project_data.manifest)
+    crew_price = attached.dataframes()['project_data']['crew_price']
+    hourly_rates = crew_price['Hourly rate USD per hour'].to_numpy()
+
+    assert np.shares_memory(
+        hourly_rates, np.frombuffer(attached.shared_memory_segment.buf, dtype='u1'))
+    with pytest.raises(ValueError):
+        crew_price.loc[0, 'Hourly rate USD per hour'] = 0
+
+
+def test_attach_in_worker_processes(project_data_sheets, shared_project_data):
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        sums = list(executor.map(rate_sum, [shared_project_data.manifest] * 2))
+
+    expected = project_data_sheets['construction_estimator']['Rate USD per unit'].sum()
+    assert sums == [pytest.approx(expected)] * 2
@@ -0,0 +1,28 @@
+"""Tests for `SolarBOSSE.SolarBOSSEPipeline`."""
+
+import pytest
+
+from SolarBOSSE.SolarBOSSEPipeline import SolarBOSSEPipeline
+from SolarBOSSE.model.Manager import Manager
+
+
+def test_run_layers_overrides_on_template(solar_input_dict):
+    template = solar_input_dict(50)
+    del template['grid_system_size_MW_DC'], template['grid_size_MW_AC']
+    template_keys = set(template)
+    pipeline = SolarBOSSEPipeline(template)
+
+    for system_size_MW_DC in [5, 100, 50]:
+        results, output_dict = pipeline.run({'system_size_MW_DC': system_size_MW_DC})
+        assert results['errors'] == []
+
+        input_dict = solar_input_dict(system_size_MW_DC)
+        expected = Manager(input_dict, dict()).execute_solarbosse()
+        for key in ['total_bos_cost', 'total_collection_cost', 'total_road_cost']:
+            assert output_dict[key] == pytest.approx(expected[key], rel=1e-12)
+
+    # Runs only modify their own copy of the template:
+    assert set(template) == template_keys
+    assert template['system_size_MW_DC'] == 50
+    assert template['error'] == dict()
+
@@ -0,0 +1,152 @@
+"""Tests for `hybrids_shared_infrastructure.stream_sweep`."""
+
+import json
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from hybrids_shared_infrastructure.stream_sweep import read_scenarios, ResultWriter, \
+    stream_sweep, scenario_columns, output_columns, run_streaming_sweep
+
+
+SCENARIOS = [{'num_turbines': 10, 'shared_substation': True, 'distance_to_interconnect_mi': 1.5},
+             {'num_turbines': 20, 'shared_substation': False},
+             {'num_turbines': 0, 'shared_substation': True, 'distance_to_interconnect_mi': 3}]
+
+
+def test_read_scenarios(tmp_path):
+    csv_path = tmp_path / 'scenarios.csv'
+    pd.DataFrame(SCENARIOS).to_csv(csv_path, index=False)
+
+    jsonl_path = tmp_path / 'scenarios.jsonl'
+    jsonl_path.write_text('\n'.join(json.dumps(scenario) for scenario in SCENARIOS) + '\n\n')
+
+    yaml_path = tmp_path / 'scenarios.yaml'
+    yaml_path.write_text('num_turbines: 10\nshared_substation: true\n'
+                         'distance_to_interconnect_mi: 1.5\n---\n'
+                         'num_turbines: 20\nshared_substation: false\n---\n'
+                         'num_turbines: 0\nshared_substation: true\n'
+                         'distance_to_interconnect_mi: 3\n---\n')
+
+    assert list(read_scenarios(str(jsonl_path))) == SCENARIOS
+    assert list(read_scenarios(str(yaml_path))) == SCENARIOS
+    assert list(read_scenarios(str(csv_path))) == SCENARIOS
+
+    with pytest.raises(ValueError):
+        next(read_scenarios(str(tmp_path / 'scenarios.txt')))
+
+
+def test_result_writer(tmp_path):
+    rows = [{'scenario': 0, 'num_turbines': 10, 'hybrid_BOS_usd': 1.5e8},
+            {'scenario': 1, 'hybrid_BOS_usd': 2e8}]
+
+    for file_name in ['results.csv', 'results.jsonl']:
+        with ResultWriter(str(tmp_path / file_name)) as writer:
+            for row in rows:
+                writer.write(row)
+
+        assert writer.rows_written == 2
+
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / 'results.csv'), pd.DataFrame(rows))
+    assert [json.loads(line) for line in open(tmp_path / 'results.jsonl')] == rows
+
+    with ResultWriter(str(tmp_path / 'results.csv')) as writer:
+        writer.write(rows[1])
+        with pytest.raises(ValueError):
+            writer.write(rows[0])
+
+
+class ListWriter:
+    def __init__(self):
+        self.rows = []
+
+    def write(self, row):
+        self.rows.append(row)
+
+    def flush(self):
+        pass
+
+
+def test_stream_sweep_bounds_pending_scenarios():
+    writer = ListWriter()
+    in_flight = []
+
+    def scenario_deltas():
+        for num_turbines in range(50):
+            # Scenarios read, and not yet written:
+            in_flight.append(num_turbines + 1 - len(writer.rows))
+            yield {'num_turbines': num_turbines}
+
+    def run(scenario_delta):
+        return {'hybrid_BOS_usd': 1e6 * scenario_delta['num_turbines']}, dict()
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        num_scenarios = stream_sweep(scenario_deltas(), writer, executor, max_pending=4,
+                                     run=run)
+
+        with pytest.raises(ValueError):
+            stream_sweep(scenario_deltas(), writer, executor, max_pending=0, run=run)
+
+    assert num_scenarios == 50
+    assert max(in_flight) <= 4
+    assert sorted(row['scenario'] for row in writer.rows) == list(range(50))
+    for row in writer.rows:
+        assert row['num_turbines'] == row['scenario']
+        assert row['hybrid_BOS_usd'] == 1e6 * row['scenario']
+
+
+def run_scenario(scenario_delta):
+    if scenario_delta['num_turbines'] < 0:
+        raise ValueError('negative number of turbines')
+    return {'hybrid_BOS_usd': 1e6 * scenario_delta['num_turbines']}, dict()
+
+
+def test_stream_sweep_to_csv(tmp_path):
+    scenarios_path = str(tmp_path / 'scenarios.csv')
+    with open(scenarios_path, 'w') as f:
+        f.write('num_turbines,distance_to_interconnect_mi\n5,\n-1,2\n6,3\n')
+    output_path = str(tmp_path / 'results.csv')
+
+    # The first scenario has a blank cell, and the second one fails:
+    columns = output_columns(scenario_columns(scenarios_path), ['hybrid_BOS_usd'])
+    with ThreadPoolExecutor(max_workers=1) as executor, \
+            ResultWriter(output_path, columns=columns) as writer:
+        num_scenarios = stream_sweep(read_scenarios(scenarios_path), writer, executor,
+                                     max_pending=1, run=run_scenario)
+
+    assert num_scenarios == 3
+    results = pd.read_csv(output_path)
+    assert list(results.columns) == ['scenario', 'num_turbines',
+                                     'distance_to_interconnect_mi', 'hybrid_BOS_usd',
+                                     'error']
+    assert list(results['num_turbines']) == [5, -1, 6]
+    assert results['distance_to_interconnect_mi'].isna().tolist() == [True, False, False]
+    assert results['hybrid_BOS_usd'].fillna(0).tolist() == [5e6, 0, 6e6]
+    assert results['error'].isna().tolist() == [True, False, True]
+    assert results.loc[1, 'error'] == 'ValueError: negative number of turbines'
+
+
+def test_run_streaming_sweep(tmp_path, hybrid_scenario, fake_wind_leg, solar_project_list):
+    main = pytest.importorskip('main')
+    scenarios_path = str(tmp_path / 'scenarios.jsonl')
+    scenario_deltas = [{'num_turbines': 10}, {'solar_system_size_MW_DC': 60},
+                       {'num_turbines': 25, 'distance_to_interconnect_mi': 4}]
+    with open(scenarios_path, 'w') as f:
+        f.write('\n'.join(json.dumps(scenario_delta) for scenario_delta in scenario_deltas))
+    output_path = str(tmp_path / 'results.jsonl')
+
+    # The workers are forked, to run the fake wind leg:
+    num_scenarios = run_streaming_sweep(hybrid_scenario, scenarios_path, output_path,
+                                        max_workers=2,
+                                        mp_context=multiprocessing.get_context('fork'))
+
+    assert num_scenarios == 3
+    rows = sorted((json.loads(line) for line in open(output_path)),
+                  key=lambda row: row['scenario'])
+    for row, scenario_delta in zip(rows, scenario_deltas):
+        expected = main.run_hybrid_BOS_flat(
+            main.derive_hybrid_fields(dict(hybrid_scenario, **scenario_delta)))
+        for key, value in expected.items():
+            assert row[key] == pytest.approx(value, rel=1e-12), key
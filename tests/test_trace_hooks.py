@@ -0,0 +1,64 @@
+"""Tests for `SolarBOSSE.TraceHooks`."""
+
+import io
+import json
+import logging
+
+from SolarBOSSE.PipelineStats import PipelineStats
+from SolarBOSSE.TraceHooks import TraceHooks, JsonLinesSink, LoggingSink, trace_hooks
+from SolarBOSSE.model.GridConnectionCost import GridConnectionCost
+
+
+def test_no_sinks_by_default():
+    hooks = TraceHooks()
+    assert not hooks.enabled
+    hooks.emit('stage_start', stage='unused')
+
+
+def test_json_lines_sink():
+    hooks = TraceHooks()
+    stream = io.StringIO()
+    sink = JsonLinesSink(stream)
+    hooks.add_sink(sink)
+
+    hooks.emit('derived_inputs', leg='solar', grid_size_MW_AC=25.0)
+    hooks.emit('leg_results', leg='solar', results={'ledger': object()})
+    hooks.remove_sink(sink)
+    hooks.emit('derived_inputs', leg='wind')
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [record['event'] for record in records] == ['derived_inputs', 'leg_results']
+    assert records[0]['grid_size_MW_AC'] == 25.0
+    assert isinstance(records[1]['results']['ledger'], str)
+
+
+def test_stage_events():
+    events = []
+    trace_hooks.add_sink(events.append)
+    try:
+        with PipelineStats().stage('solarbosse.run'):
+            pass
+    finally:
+        trace_hooks.remove_sink(events.append)
+
+    assert [(event['event'], event['stage']) for event in events] == \
+        [('stage_start', 'solarbosse.run'), ('stage_end', 'solarbosse.run')]
+    assert events[1]['wall_time_s'] >= 0
+
+
+def test_module_errors_are_recorded(solar_input_dict, caplog):
+    input_dict = solar_input_dict(50)
+    del input_dict['dist_interconnect_mi']
+
+    sink = LoggingSink()
+    trace_hooks.add_sink(sink)
+    try:
+        with caplog.at_level(logging.INFO, logger='SolarBOSSE.trace'):
+            status, error = GridConnectionCost(input_dict, dict(), 'test').run_module()
+    finally:
+        trace_hooks.remove_sink(sink)
+
+    assert status == 1
+    assert input_dict['error'] == {'GridConnectionCost': error}
+    assert [record.levelname for record in caplog.records] == ['ERROR']
+    assert 'dist_interconnect_mi' in caplog.records[0].getMessage()
@@ -0,0 +1,135 @@
+"""Tests for the sidecar disk cache of `SolarBOSSE.excelio.XlsxDataframeCache`."""
+
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from SolarBOSSE.excelio import XlsxDataframeCache as xlsx_dataframe_cache_module
+from SolarBOSSE.excelio.XlsxDataframeCache import XlsxDataframeCache
+
+
+@pytest.fixture
+def xlsx_path(project_data_xlsx, tmp_path, monkeypatch):
+    shutil.copy(project_data_xlsx, tmp_path / 'project_data.xlsx')
+    monkeypatch.setattr(XlsxDataframeCache, '_cache', dict())
+    return str(tmp_path)
+
+
+def forbid_parsing(monkeypatch):
+    def excel_file(*args, **kwargs):
+        raise AssertionError('.xlsx file parsed instead of read from the disk cache')
+
+    monkeypatch.setattr(xlsx_dataframe_cache_module.pd, 'ExcelFile', excel_file)
+
+
+def test_sidecar_is_read_by_later_processes(xlsx_path, monkeypatch):
+    sheets = XlsxDataframeCache.read_all_sheets_from_xlsx('project_data', xlsx_path)
+    assert os.path.exists(XlsxDataframeCache.disk_cache_filename(
+        os.path.join(xlsx_path, 'project_data.xlsx')))
+
+    # A new process only has the sidecar file:
+    XlsxDataframeCache._cache.clear()
+    forbid_parsing(monkeypatch)
+    cached_sheets = XlsxDataframeCache.read_all_sheets_from_xlsx('project_data',
+                                                                 xlsx_path)
+
+    assert list(cached_sheets) == list(sheets)
+    for sheet_name, sheet in sheets.items():
+        pd.testing.assert_frame_equal(cached_sheets[sheet_name], sheet)
+
+
+def test_sidecar_of_touched_file_is_reused(xlsx_path, monkeypatch):
+    XlsxDataframeCache.read_all_sheets_from_xlsx('project_data', xlsx_path)
+    xlsx_filename = os.path.join(xlsx_path, 'project_data.xlsx')
+    stat = os.stat(xlsx_filename)
+    os.utime(xlsx_filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    XlsxDataframeCache._cache.clear()
+    forbid_parsing(monkeypatch)
+    XlsxDataframeCache.read_all_sheets_from_xlsx('project_data', xlsx_path)
+
+
+def test_stale_sidecar_is_rebuilt(xlsx_path):
+    XlsxDataframeCache.read_all_sheets_from_xlsx('project_data', xlsx_path)
+
+    xlsx_filename = os.path.join(xlsx_path, 'project_data.xlsx')
+    with pd.ExcelWriter(xlsx_filename) as writer:
+        pd.DataFrame({'a': [1, 2]}).to_excel(writer, sheet_name='only_sheet',
+                                            index=False)
+
+    XlsxDataframeCache._cache.clear()
+    sheets = XlsxDataframeCache.read_all_sheets_from_xlsx('project_data', xlsx_path)
+    assert list(sheets) == ['only_sheet']
+
+    # The rebuilt sidecar file is valid for the new contents:
+    assert XlsxDataframeCache.read_disk_cache(xlsx_filename).keys() == sheets.keys()
+
+
+def test_disk_cache_disabled(xlsx_path, monkeypatch):
+    monkeypatch.setattr(XlsxDataframeCache, 'disk_cache', False)
+    XlsxDataframeCache.read_all_sheets_from_xlsx('project_data', xlsx_path)
+    assert not os.path.exists(os.path.join(xlsx_path,
+                                           XlsxDataframeCache.disk_cache_dirname))
+
+
+def test_views_are_read_only(xlsx_path):
+    sheets = XlsxDataframeCache.read_all_sheets_from_xlsx('project_data', xlsx_path)
+    construction_estimator = sheets['construction_estimator']
+    rate = construction_estimator.loc[0, 'Rate USD per unit']
+
+    with pytest.raises(ValueError):
+        construction_estimator.loc[0, 'Rate USD per unit'] = 0
+    with pytest.raises(ValueError):
+        construction_estimator['Rate USD per unit'].values[0] = 0
+
+    # Object columns, and whole columns, can be changed in a view only:
+    construction_estimator.loc[0, 'Type of cost'] = 'Changed'
+    construction_estimator['Rate USD per unit'] = 0
+    construction_estimator['New column'] = 0
+
+    cached = XlsxDataframeCache.read_all_sheets_from_xlsx('project_data', xlsx_path)
+    assert cached['construction_estimator'].loc[0, 'Rate USD per unit'] == rate
+    assert cached['construction_estimator'].loc[0, 'Type of cost'] != 'Changed'
+    assert 'New column' not in cached['construction_estimator'].columns
+
+    # Numeric values are shared with the cache, not copied:
+    assert np.shares_memory(
+        cached['crew_price']['Hourly rate USD per hour'].to_numpy(),
+        XlsxDataframeCache.read_all_sheets_from_xlsx(
+            'project_data', xlsx_path)['crew_price']['Hourly rate USD per hour'].to_numpy())
+
+
+def test_views_copy_on_write(xlsx_path):
+    if not hasattr(pd.options.mode, 'copy_on_write'):
+        pytest.skip('pandas has no copy-on-write')
+
+    with pd.option_context('mode.copy_on_write', True):
+        sheets = XlsxDataframeCache.read_all_sheets_from_xlsx('project_data', xlsx_path)
+        construction_estimator = sheets['construction_estimator']
+        rate = construction_estimator.loc[0, 'Rate USD per unit']
+
+        construction_estimator.loc[0, 'Rate USD per unit'] = 0
+        construction_estimator.loc[0, 'Type of cost'] = 'Changed'
+
+        cached = XlsxDataframeCache.read_all_sheets_from_xlsx('project_data', xlsx_path)
+        assert construction_estimator.loc[0, 'Rate USD per unit'] == 0
+        assert cached['construction_estimator'].loc[0, 'Rate USD per unit'] == rate
+        assert cached['construction_estimator'].loc[0, 'Type of cost'] != 'Changed'
+
+        # Object columns are not copied for each view:
+        assert np.shares_memory(
+            cached['crew_price']['Labor type ID'].to_numpy(),
+            XlsxDataframeCache.read_all_sheets_from_xlsx(
+                'project_data', xlsx_path)['crew_price']['Labor type ID'].to_numpy())
+
+
+def test_copies_are_writable(xlsx_path):
+    sheets = XlsxDataframeCache.read_all_sheets_from_xlsx('project_data', xlsx_path,
+                                                          copy=True)
+    sheets['construction_estimator'].loc[0, 'Rate USD per unit'] = -1
+
+    cached = XlsxDataframeCache.read_all_sheets_from_xlsx('project_data', xlsx_path)
+    assert cached['construction_estimator'].loc[0, 'Rate USD per unit'] != -1